@@ -1,5 +1,13 @@
 import sqlite3
-import re
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+# Módulos compartilhados ficam na raiz do projeto
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from leitor_txt import ler_arquivo
 
 # ---------- 1. Criação do banco de dados ----------
 conn = sqlite3.connect("questoesEspecificas.db")
@@ -18,59 +26,39 @@ cursor.execute('''
         gabarito TEXT
     )
 ''')
+cursor.execute('CREATE INDEX IF NOT EXISTS idx_questoes_numero_fonte ON questoes(numero, fonte)')
 
 # ---------- 2. Função de leitura do arquivo ----------
-def parse_questoes(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        linhas = file.readlines()
-
-    questoes = []
-    i = 0
-    while i < len(linhas):
-        # Número da questão
-        numero = linhas[i].strip()
-        i += 1
-
-        # Enunciado (até encontrar a alternativa "a)")
-        enunciado = ""
-        while i < len(linhas) and not linhas[i].strip().lower().startswith("a)"):
-            enunciado += linhas[i].strip() + " "
-            i += 1
+TAMANHO_LOTE = 1000
 
-        # Alternativas
-        alternativa_a = linhas[i].strip()[3:].strip()
-        i += 1
-        alternativa_b = linhas[i].strip()[3:].strip()
-        i += 1
-        alternativa_c = linhas[i].strip()[3:].strip()
-        i += 1
-        alternativa_d = linhas[i].strip()[3:].strip()
-        i += 1
-
-        # Fonte
-        fonte = linhas[i].strip()
-        i += 1
-
-        # Gabarito
-        gabarito_match = re.search(r'Gabarito:\s*[“"]?([a-dA-D])', linhas[i])
-        gabarito = gabarito_match.group(1).lower() if gabarito_match else ""
-        i += 1
-
-        questoes.append((
-            numero, enunciado.strip(), alternativa_a, alternativa_b, alternativa_c, alternativa_d, fonte, gabarito
-        ))
-
-    return questoes
+def parse_questoes(file_path):
+    # Uma questão por vez, do parser compartilhado: aceita "Gabarito: b" e "Resposta: C", com a fonte antes ou depois
+    erros = []
+    yield from ler_arquivo(file_path, erros)
+    for numero_linha, motivo in erros:
+        print(f"Linha {numero_linha}: {motivo}, ignorada")
 
-# ---------- 3. Leitura e inserção ----------
+# ---------- 3. Leitura e inserção em lotes ----------
 questoes = parse_questoes("TGE APP 2025 ESPECÍFICAS.txt")
 
-cursor.executemany('''
-    INSERT INTO questoes (numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, fonte, gabarito)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-''', questoes)
+inicio = time.perf_counter()
+total = 0
+while True:
+    lote = list(islice(questoes, TAMANHO_LOTE))
+    if not lote:
+        break
+    # Só insere questões que ainda não estão no banco, para não duplicar ao rodar de novo
+    cursor.executemany('''
+        INSERT INTO questoes (numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, gabarito, fonte)
+        SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8
+        WHERE NOT EXISTS (
+            SELECT 1 FROM questoes WHERE numero = ?1 AND fonte = ?8 AND enunciado = ?2
+        )
+    ''', lote)
+    total += cursor.rowcount
 
 conn.commit()
 conn.close()
 
-print("Importação concluída!")
\ No newline at end of file
+duracao = time.perf_counter() - inicio
+print(f"Importação concluída! {total} questões em {duracao:.2f}s ({total / max(duracao, 1e-9):.0f} linhas/s)")
\ No newline at end of file
@@ -1,92 +1,50 @@
 import sqlite3
-import re
+import sys
+from pathlib import Path
 
-# ---------- 1. Criação do banco de dados ----------
-conn = sqlite3.connect("questoesEspecificas.db")
-cursor = conn.cursor()
+# Módulos compartilhados ficam na raiz do projeto
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS questoes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        numero TEXT,
-        enunciado TEXT,
-        alternativa_a TEXT,
-        alternativa_b TEXT,
-        alternativa_c TEXT,
-        alternativa_d TEXT,
-        fonte TEXT,
-        gabarito TEXT
-    )
-''')
+from leitor_txt import ler_arquivo
 
-# ---------- Função para remover blocos entre === ----------
-def remover_blocos_entre_iguais(texto):
-    padrao = r"(={3,})(.|\n)*?\1"
-    return re.sub(padrao, '', texto)
+# ---------- 1. Criação do banco de dados ----------
+def criar_banco(caminho="questoesEspecificas.db"):
+    conn = sqlite3.connect(caminho)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS questoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            numero TEXT,
+            enunciado TEXT,
+            alternativa_a TEXT,
+            alternativa_b TEXT,
+            alternativa_c TEXT,
+            alternativa_d TEXT,
+            fonte TEXT,
+            gabarito TEXT
+        )
+    ''')
+    return conn, cursor
 
 # ---------- 2. Função de leitura do arquivo ----------
 def parse_questoes(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        conteudo = file.read()
-
-    # Remove os blocos entre ===
-    conteudo_limpo = remover_blocos_entre_iguais(conteudo)
-
-    # Divide por linhas novamente
-    linhas = conteudo_limpo.splitlines()
-
-    questoes = []
-    i = 0
-    while i < len(linhas):
-        # Ignora linhas em branco
-        if not linhas[i].strip():
-            i += 1
-            continue
-
-        # Número da questão
-        numero = linhas[i].strip()
-        i += 1
-
-        # Enunciado (até encontrar a alternativa "a)")
-        enunciado = ""
-        while i < len(linhas) and not linhas[i].strip().lower().startswith("a)"):
-            enunciado += linhas[i].strip() + " "
-            i += 1
-
-        # Alternativas
-        alternativa_a = linhas[i].strip()[3:].strip()
-        i += 1
-        alternativa_b = linhas[i].strip()[3:].strip()
-        i += 1
-        alternativa_c = linhas[i].strip()[3:].strip()
-        i += 1
-        alternativa_d = linhas[i].strip()[3:].strip()
-        i += 1
-
-        # Fonte
-        fonte = linhas[i].strip()
-        i += 1
-
-        # Gabarito
-        gabarito_match = re.search(r'Gabarito:\s*[“"]?([a-dA-D])', linhas[i])
-        gabarito = gabarito_match.group(1).lower() if gabarito_match else ""
-        i += 1
-
-        questoes.append((
-            numero, enunciado.strip(), alternativa_a, alternativa_b, alternativa_c, alternativa_d, fonte, gabarito
-        ))
-
-    return questoes
+    # Parser compartilhado com as questões gerais: fonte antes ou depois do gabarito, "Gabarito:" ou "Resposta:"
+    erros = []
+    yield from ler_arquivo(file_path, erros)
+    for numero_linha, motivo in erros:
+        print(f"Linha {numero_linha}: {motivo}, ignorada")
 
 # ---------- 3. Leitura e inserção ----------
-questoes = parse_questoes("TGE APP 2025 ESPECÍFICAS.txt")
+if __name__ == "__main__":
+    conn, cursor = criar_banco()
 
-cursor.executemany('''
-    INSERT INTO questoes (numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, fonte, gabarito)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-''', questoes)
+    cursor.executemany('''
+        INSERT INTO questoes (numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, gabarito, fonte)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', parse_questoes("TGE APP 2025 ESPECÍFICAS.txt"))
 
-conn.commit()
-conn.close()
+    conn.commit()
+    conn.close()
 
-print("Importação concluída!")
+    print("Importação concluída!")
@@ -1,13 +1,60 @@
+import argparse
+import glob
+import hashlib
+import os
 import sqlite3
-import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterable, Iterator, List, NamedTuple, Tuple, Optional
 import logging
+import sys
+
+# Módulos compartilhados ficam na raiz do projeto
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from busca import garantir_indice_texto
+from fontes import atualizar_fontes, garantir_gatilhos_fontes
+from intercambio import hash_questao, tem_chave_numero_fonte
+from leitor_txt import LINHA, dividir_arquivo, ler_arquivo, ler_linhas, ler_questoes
+from rastreio import rastreado, trecho
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bytes de arquivo por tarefa do pool na importação paralela
+TAMANHO_TRECHO = 1 << 20
+
+COLUNAS_GRAVADAS = ('numero', 'enunciado', 'alternativa_a', 'alternativa_b', 'alternativa_c', 'alternativa_d',
+                    'gabarito', 'fonte', 'hash', 'arquivo')
+_colunas = ', '.join(COLUNAS_GRAVADAS)
+_marcadores = ', '.join('?' * len(COLUNAS_GRAVADAS))
+
+# Uma questão com o (numero, fonte) de outra só substitui a antiga se ela for do mesmo arquivo
+# (ou de antes do manifesto); a questão de outro arquivo fica e a nova vira conflito
+SQL_GRAVAR_DO_ARQUIVO = f'''
+    INSERT INTO questoes ({_colunas}) VALUES ({_marcadores})
+    ON CONFLICT (numero, fonte) DO UPDATE SET
+        {', '.join(f'{coluna} = excluded.{coluna}' for coluna in COLUNAS_GRAVADAS[1:])}
+    WHERE questoes.arquivo IS NULL OR questoes.arquivo = excluded.arquivo
+'''
+# Bancos antigos sem UNIQUE(numero, fonte): não há o que substituir
+SQL_GRAVAR_SEM_CHAVE = f'INSERT INTO questoes ({_colunas}) VALUES ({_marcadores})'
+
+
+class Sincronizacao(NamedTuple):
+    """Resultado de sincronizar um arquivo com o banco"""
+    inseridas: int
+    alteradas: int      # mesmo (numero, fonte) de uma questão do arquivo, conteúdo novo: atualizada no lugar
+    mantidas: int
+    removidas: int
+    conflitos: int = 0  # (numero, fonte) já usado por uma questão de outro arquivo
+
+
 class DatabaseManager:
     """Gerenciador de banco de dados para questões."""
     
@@ -17,26 +64,30 @@ class DatabaseManager:
         
     def __enter__(self):
         self.conn = sqlite3.connect(self.db_path)
+        # INSERT OR REPLACE só dispara os gatilhos de exclusão (que limpam o FTS) com isto ligado
+        self.conn.execute('PRAGMA recursive_triggers = ON')
         self.create_table()
         return self.conn.cursor()
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.conn:
             if exc_type is None:
-                self.conn.commit()
+                with trecho('importador.commit'):
+                    self.conn.commit()
                 logger.info("Transação commitada com sucesso")
             else:
                 self.conn.rollback()
                 logger.error(f"Erro na transação: {exc_val}")
             self.conn.close()
     
+    @rastreado('importador.esquema')
     def create_table(self):
         """Cria a tabela de questões se não existir."""
         cursor = self.conn.cursor()
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS questoes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                numero TEXT NOT NULL,
+                numero TEXT,                -- NULL nas questões sem número vindas de JSONL/CSV
                 enunciado TEXT NOT NULL,
                 alternativa_a TEXT NOT NULL,
                 alternativa_b TEXT NOT NULL,
@@ -44,44 +95,56 @@ class DatabaseManager:
                 alternativa_d TEXT NOT NULL,
                 gabarito TEXT NOT NULL,
                 fonte TEXT,
+                hash TEXT,
+                arquivo TEXT,
                 UNIQUE(numero, fonte)
             )
         ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS arquivos_importados (
+                caminho TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                digest TEXT NOT NULL
+            )
+        ''')
+        self._migrar_hash(cursor)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_questoes_hash ON questoes(hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_questoes_arquivo ON questoes(arquivo)')
+        # Índice da busca por categoria; o repositório abre o banco só para leitura e não o cria
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_questoes_fonte ON questoes(fonte)')
+        if not garantir_indice_texto(self.conn):
+            logger.warning("SQLite sem FTS5: a busca por tema usará LIKE")
+        garantir_gatilhos_fontes(self.conn)
         logger.info("Tabela de questões criada/verificada")
 
+    @staticmethod
+    def _migrar_hash(cursor: sqlite3.Cursor):
+        """Acrescenta as colunas hash/arquivo em bancos antigos e calcula os hashes que faltam."""
+        colunas = {linha[1] for linha in cursor.execute('PRAGMA table_info(questoes)')}
+        for coluna in ('hash', 'arquivo'):
+            if coluna not in colunas:
+                cursor.execute(f'ALTER TABLE questoes ADD COLUMN {coluna} TEXT')
+        
+        sem_hash = cursor.execute('''
+            SELECT id, numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, gabarito, fonte
+            FROM questoes WHERE hash IS NULL
+        ''').fetchall()
+        if sem_hash:
+            cursor.executemany(
+                'UPDATE questoes SET hash = ? WHERE id = ?',
+                [(hash_questao(linha[1:]), linha[0]) for linha in sem_hash]
+            )
+            logger.info(f"Calculado hash de {len(sem_hash)} questões já existentes")
 
-def _remover_secoes_separadores(linhas: List[str]) -> List[str]:
-    """
-    Remove todas as seções entre separadores ========== do arquivo.
-
-    Args:
-        linhas: Lista de linhas do arquivo original
 
-    Returns:
-        Lista de linhas sem as seções entre separadores
-    """
-    linhas_limpas = []
-    i = 0
-
-    while i < len(linhas):
-        linha = linhas[i].strip()
-
-        # Verifica se é uma linha separadora
-        if linha.startswith('=========='):
-            # Pula até encontrar a próxima linha separadora ou fim do arquivo
-            i += 1
-            while i < len(linhas) and not linhas[i].strip().startswith('=========='):
-                i += 1
-            # Pula também a linha de fechamento se encontrou
-            if i < len(linhas):
-                i += 1
-        else:
-            # Linha normal, mantém
-            linhas_limpas.append(linhas[i])
-            i += 1
-
-    logger.info(f"Removidas {len(linhas) - len(linhas_limpas)} linhas de seções separadoras")
-    return linhas_limpas
+def _digest_arquivo(file_path: str) -> str:
+    """Digest do conteúdo do arquivo, lido em blocos."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        for bloco in iter(lambda: file.read(1 << 20), b''):
+            digest.update(bloco)
+    return digest.hexdigest()
 
 
 class QuestaoParser:
@@ -89,20 +152,9 @@ class QuestaoParser:
     
     @staticmethod
     def extrair_gabarito(linha: str) -> str:
-        """Extrai o gabarito de uma linha usando regex."""
-        padroes = [
-            r'Gabarito:\s*["""]?([a-dA-D])["""]?',
-            r'Gabarito:\s*([a-dA-D])',
-            r'([a-dA-D])\s*$'
-        ]
-        
-        for padrao in padroes:
-            match = re.search(padrao, linha)
-            if match:
-                return match.group(1).lower()
-        
-        logger.warning(f"Gabarito não encontrado na linha: {linha.strip()}")
-        return ""
+        """Extrai o gabarito de uma linha "Gabarito: x" ou "Resposta: X" (vazio se não for uma)."""
+        match = LINHA.match(linha.strip())
+        return match.group('gabarito').lower() if match and match.lastgroup == 'gabarito' else ""
     
     @staticmethod
     def validar_questao(questao: Tuple) -> bool:
@@ -131,136 +183,61 @@ class QuestaoParser:
         Returns:
             Lista de tuplas com dados das questões
         """
-        arquivo = Path(file_path)
-        
-        if not arquivo.exists():
-            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-        
-        logger.info(f"Iniciando parse do arquivo: {file_path}")
-        
-        try:
-            with open(arquivo, 'r', encoding='utf-8') as file:
-                linhas = [linha.rstrip('\n\r') for linha in file.readlines()]
-        except UnicodeDecodeError:
-            # Tenta com encoding alternativo
-            with open(arquivo, 'r', encoding='latin-1') as file:
-                linhas = [linha.rstrip('\n\r') for linha in file.readlines()]
-        
-        # Remove seções entre separadores antes de processar
-        linhas_limpas = _remover_secoes_separadores(linhas)
-        
-        questoes = []
-        i = 0
-        questao_atual = 1
-        
-        while i < len(linhas_limpas):
-            try:
-                questao = self._parse_questao_individual(linhas_limpas, i)
-                if questao:
-                    questao_data, linhas_processadas = questao
-                    
-                    if self.validar_questao(questao_data):
-                        questoes.append(questao_data)
-                        logger.debug(f"Questão {questao_atual} processada com sucesso")
-                    else:
-                        logger.warning(f"Questão {questao_atual} inválida, ignorada")
-                    
-                    i += linhas_processadas
-                    questao_atual += 1
-                else:
-                    i += 1
-            except Exception as e:
-                logger.error(f"Erro ao processar questão {questao_atual}: {e}")
-                i += 1
-        
-        logger.info(f"Parse concluído: {len(questoes)} questões válidas encontradas")
-        return questoes
+        return list(self.iter_questoes(file_path))
 
-    def _parse_questao_individual(self, linhas: List[str], inicio: int) -> Optional[Tuple]:
+    def iter_questoes(self, file_path: str) -> Iterator[Tuple]:
         """
-        Processa uma questão individual a partir de uma posição específica.
+        Extrai questões do arquivo sob demanda, uma por vez.
+
+        Usa o leitor_txt: uma passada só, gabarito antes ou depois da fonte e
+        blocos malformados descartados (e registrados no log) sem desalinhar
+        as questões seguintes.
         
         Args:
-            linhas: Lista de linhas do arquivo
-            inicio: Índice da linha inicial
+            file_path: Caminho para o arquivo de texto
             
-        Returns:
-            Tupla com (dados_questao, linhas_processadas) ou None se inválida
+        Yields:
+            Tuplas válidas com dados das questões
         """
-        i = inicio
-        
-        # Pula linhas vazias
-        while i < len(linhas) and not linhas[i].strip():
-            i += 1
-        
-        if i >= len(linhas):
-            return None
-        
-        # Número da questão
-        numero = linhas[i].strip()
-        if not numero:
-            return None
-        i += 1
-        
-        # Enunciado (até encontrar alternativa "a)")
-        enunciado_partes = []
-        while i < len(linhas) and not self._is_alternativa_a(linhas[i]):
-            if linhas[i].strip():
-                enunciado_partes.append(linhas[i].strip())
-            i += 1
-        
-        if not enunciado_partes:
-            return None
-        
-        enunciado = " ".join(enunciado_partes)
-        
-        # Alternativas
-        alternativas = []
-        for letra in ['a)', 'b)', 'c)', 'd)']:
-            if i >= len(linhas):
-                return None
-            
-            linha = linhas[i].strip()
-            if not linha.lower().startswith(letra):
-                logger.warning(f"Esperada alternativa {letra}, encontrada: {linha}")
-                return None
-            
-            alternativas.append(linha[2:].strip())
-            i += 1
+        arquivo = Path(file_path)
         
-        # Gabarito
-        if i >= len(linhas):
-            return None
+        if not arquivo.exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
         
-        gabarito = self.extrair_gabarito(linhas[i])
-        i += 1
+        logger.info(f"Iniciando parse do arquivo: {file_path}")
         
-        # Fonte (opcional)
-        fonte = ""
-        if i < len(linhas) and linhas[i].strip():
-            fonte = linhas[i].strip()
-            i += 1
+        validas = 0
+        questao_atual = 0
+        erros: List[Tuple[int, str]] = []
         
-        questao_data = (numero, enunciado, *alternativas, gabarito, fonte)
-        linhas_processadas = i - inicio
+        for questao_data in ler_arquivo(file_path, erros):
+            questao_atual += 1
+            if self.validar_questao(questao_data):
+                validas += 1
+                yield questao_data
+            else:
+                logger.warning(f"Questão {questao_atual} inválida, ignorada")
         
-        return questao_data, linhas_processadas
-    
-    @staticmethod
-    def _is_alternativa_a(linha: str) -> bool:
-        """Verifica se a linha é uma alternativa 'a)'."""
-        return linha.strip().lower().startswith("a)")
+        for numero_linha, motivo in erros:
+            logger.warning(f"{arquivo.name}:{numero_linha}: {motivo}, ignorada")
+        logger.info(f"Parse concluído: {validas} questões válidas encontradas, {len(erros)} linhas com problema")
 
 class QuestaoImporter:
     """Importador principal de questões."""
     
-    def __init__(self, db_path: str = "questoesGerais.db"):
+    def __init__(self, db_path: str = "questoesGerais.db", tamanho_lote: int = 1000):
         self.db_manager = DatabaseManager(db_path)
         self.parser = QuestaoParser()
+        self.tamanho_lote = tamanho_lote
     
+    @rastreado('importador.arquivo')
     def importar_arquivo(self, file_path: str) -> bool:
         """
         Importa questões de um arquivo para o banco de dados.
+
+        Arquivos sem mudança desde a última importação (tamanho, mtime e
+        digest no manifesto) são ignorados. Nos demais, só as questões
+        novas, alteradas ou removidas tocam o banco.
         
         Args:
             file_path: Caminho para o arquivo de texto
@@ -269,35 +246,370 @@ class QuestaoImporter:
             True se importação foi bem-sucedida
         """
         try:
-            questoes = self.parser.parse_questoes(file_path)
+            inicio = time.perf_counter()
+            
+            with self.db_manager as cursor:
+                manifesto = verificar_manifesto(cursor, file_path)
+                if manifesto is None:
+                    logger.info(f"{file_path}: sem alterações desde a última importação")
+                    return True
+                
+                resultado = self.sincronizar_arquivo(cursor, file_path, self.parser.iter_questoes(file_path))
+                registrar_manifesto(cursor, file_path, manifesto)
+                if resultado.inseridas or resultado.alteradas or resultado.mantidas:
+                    # Arquivo vazio ou ilegível não apaga nada
+                    self.descartar_legados(cursor)
+                self.indexar_fontes(cursor)
             
-            if not questoes:
+            if not any(resultado):
                 logger.warning("Nenhuma questão válida encontrada no arquivo")
                 return False
             
-            with self.db_manager as cursor:
-                cursor.executemany('''
-                    INSERT OR REPLACE INTO questoes 
-                    (numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, gabarito, fonte)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', questoes)
-                
-                logger.info(f"Importadas {len(questoes)} questões com sucesso")
-                return True
+            duracao = time.perf_counter() - inicio
+            taxa = (resultado.inseridas + resultado.alteradas + resultado.mantidas) / duracao if duracao > 0 else float('inf')
+            logger.info(
+                f"Importação concluída em {duracao:.2f}s ({taxa:.0f} linhas/s): "
+                f"{resultado.inseridas} novas, {resultado.alteradas} alteradas, "
+                f"{resultado.mantidas} inalteradas, {resultado.removidas} removidas"
+            )
+            return True
                 
         except Exception as e:
             logger.error(f"Erro na importação: {e}")
             return False
 
-def main():
+    @rastreado('importador.sincronizar')
+    def sincronizar_arquivo(self, cursor: sqlite3.Cursor, file_path: str,
+                            questoes: Iterable[Tuple]) -> Sincronizacao:
+        """
+        Aplica no banco apenas a diferença entre o arquivo e o que já foi importado dele.
+
+        Questões com o mesmo hash ficam intactas; as alteradas (mesmo numero e fonte de uma
+        questão do arquivo) são atualizadas no lugar, mantendo o id, nos bancos com
+        UNIQUE(numero, fonte), e nos demais entram como linha nova no lugar da antiga, que sai;
+        as novas são inseridas e as que sumiram do arquivo são removidas. Linhas antigas sem
+        arquivo de origem são reaproveitadas quando o hash bate (as que sobram saem em
+        descartar_legados, no fim da importação).
+        
+        Args:
+            cursor: Cursor da transação aberta pelo DatabaseManager
+            file_path: Arquivo de origem das questões
+            questoes: Questões no formato devolvido pelo QuestaoParser
+            
+        Returns:
+            Sincronizacao com as contagens
+        """
+        arquivo = chave_arquivo(file_path)
+        conn = cursor.connection
+        existentes = {}
+        por_chave = {}
+        for numero, fonte, hash_, id_ in conn.execute(
+                'SELECT numero, fonte, hash, id FROM questoes WHERE arquivo = ?', (arquivo,)):
+            existentes[hash_] = id_
+            por_chave[numero, fonte] = hash_
+        # Hashes das linhas sem arquivo de origem, lidos uma vez; cada uma é reaproveitada no máximo uma vez
+        legados = dict(conn.execute(
+            'SELECT hash, MIN(id) FROM questoes WHERE arquivo IS NULL AND hash IS NOT NULL GROUP BY hash'
+        ))
+        vistos = set()
+        substituidos = set()
+        mantidas = alteradas = enviadas = 0
+        
+        def novas() -> Iterator[Tuple]:
+            nonlocal mantidas, alteradas, enviadas
+            for questao in questoes:
+                hash_atual = hash_questao(questao)
+                if hash_atual in vistos:
+                    continue
+                vistos.add(hash_atual)
+                
+                if hash_atual in existentes:
+                    mantidas += 1
+                    continue
+                
+                legado = legados.pop(hash_atual, None)
+                if legado is not None:
+                    conn.execute('UPDATE questoes SET arquivo = ? WHERE id = ?', (arquivo, legado))
+                    mantidas += 1
+                    continue
+                
+                anterior = por_chave.get((questao[0], questao[7]))
+                if anterior is not None and anterior not in vistos and anterior not in substituidos:
+                    # A gravação cai no conflito com a linha antiga do próprio arquivo e a atualiza
+                    substituidos.add(anterior)
+                    alteradas += 1
+                enviadas += 1
+                yield questao
+        
+        chave_unica = tem_chave_numero_fonte(conn)
+        sql = SQL_GRAVAR_DO_ARQUIVO if chave_unica else SQL_GRAVAR_SEM_CHAVE
+        gravadas = gravar_em_lotes(cursor, novas(), self.tamanho_lote, arquivo, sql)
+        
+        # Só o UPSERT atualiza a linha antiga no lugar; sem a chave a alterada entrou como linha
+        # nova e a antiga sai junto com as removidas
+        if chave_unica:
+            saem = [id_ for hash_, id_ in existentes.items() if hash_ not in vistos and hash_ not in substituidos]
+            removidas = len(saem)
+        else:
+            saem = [id_ for hash_, id_ in existentes.items() if hash_ not in vistos]
+            removidas = len(saem) - len(substituidos - vistos)
+        cursor.executemany('DELETE FROM questoes WHERE id = ?', [(id_,) for id_ in saem])
+        
+        conflitos = enviadas - gravadas
+        if conflitos:
+            logger.warning(f"{file_path}: {conflitos} questões com (numero, fonte) de outro arquivo não foram gravadas")
+        return Sincronizacao(gravadas - alteradas, alteradas, mantidas, removidas, conflitos)
+
+    @staticmethod
+    def descartar_legados(cursor: sqlite3.Cursor) -> int:
+        """
+        Remove as linhas de antes do manifesto (sem arquivo de origem) que nenhum arquivo da
+        importação reaproveitou: são versões antigas das mesmas questões, e deixá-las dobraria
+        o banco na primeira sincronização.
+
+        Returns:
+            Quantidade de linhas removidas
+        """
+        cursor.execute('DELETE FROM questoes WHERE arquivo IS NULL')
+        if cursor.rowcount:
+            logger.info(f"{cursor.rowcount} questões de importações sem manifesto substituídas pelos arquivos")
+        return cursor.rowcount
+
+    @staticmethod
+    @rastreado('importador.fontes')
+    def indexar_fontes(cursor: sqlite3.Cursor):
+        """Aplica no índice (documento, artigo) as questões que a importação mudou, na mesma transação."""
+        quantidades = atualizar_fontes(cursor.connection)
+        logger.info(f"Índice de fontes: {sum(quantidades.values())} questões em {len(quantidades)} documentos")
+
+    def importar_arquivos(self, arquivos: List[str], processos: Optional[int] = None,
+                          tamanho_trecho: int = TAMANHO_TRECHO) -> int:
+        """
+        Importa vários arquivos, fazendo o parse em paralelo.
+
+        Os arquivos são divididos em trechos de cerca de tamanho_trecho bytes
+        (dividir_arquivo), e cada trecho é lido por um processo do pool; o
+        processo principal é o único que escreve no banco e grava os lotes na
+        ordem do arquivo assim que chegam, com no máximo processos*2 trechos
+        em andamento: a memória depende do tamanho do trecho, não do arquivo.
+        O resultado é idêntico ao de importá-los um a um. Arquivos inalterados
+        segundo o manifesto nem chegam ao pool.
+        
+        Args:
+            arquivos: Caminhos dos arquivos de texto, na ordem de gravação
+            processos: Tamanho do pool (padrão: número de CPUs)
+            tamanho_trecho: Bytes de arquivo lidos por tarefa do pool
+            
+        Returns:
+            Total de questões inseridas
+        """
+        processos = processos or os.cpu_count() or 1
+        inicio = time.perf_counter()
+        total = lidas = 0
+        
+        with ProcessPoolExecutor(max_workers=processos) as pool, self.db_manager as cursor:
+            alterados = []
+            for arquivo in arquivos:
+                manifesto = verificar_manifesto(cursor, arquivo)
+                if manifesto is None:
+                    logger.info(f"{arquivo}: sem alterações desde a última importação")
+                else:
+                    alterados.append((arquivo, manifesto))
+            
+            manifestos = dict(alterados)
+            trechos = (
+                (arquivo, inicio, fim)
+                for arquivo, _ in alterados
+                for inicio, fim in dividir_arquivo(arquivo, tamanho_trecho)
+            )
+            lotes = _parse_em_paralelo(pool, trechos, processos * 2)
+            
+            # Cada arquivo é sincronizado enquanto os lotes dele chegam, sem juntá-los antes
+            for arquivo, grupo in groupby(lotes, key=itemgetter(0)):
+                questoes = (questao for _, lote in grupo for questao in lote)
+                resultado = self.sincronizar_arquivo(cursor, arquivo, questoes)
+                registrar_manifesto(cursor, arquivo, manifestos[arquivo])
+                logger.info(f"{arquivo}: {resultado.inseridas} novas, {resultado.alteradas} alteradas, "
+                            f"{resultado.mantidas} inalteradas, {resultado.removidas} removidas")
+                total += resultado.inseridas
+                lidas += resultado.inseridas + resultado.alteradas + resultado.mantidas
+            
+            if alterados:
+                if lidas:
+                    self.descartar_legados(cursor)
+                self.indexar_fontes(cursor)
+        
+        duracao = time.perf_counter() - inicio
+        logger.info(
+            f"Importados {len(arquivos)} arquivos ({len(alterados)} alterados), "
+            f"{total} questões novas em {duracao:.2f}s ({processos} processos)"
+        )
+        return total
+
+
+def gravar_em_lotes(cursor: sqlite3.Cursor, questoes: Iterable[Tuple], tamanho_lote: int,
+                    arquivo: Optional[str] = None, sql: str = SQL_GRAVAR_DO_ARQUIVO) -> int:
+    """
+    Grava as questões com executemany em lotes de tamanho fixo.
+    
+    Args:
+        cursor: Cursor da transação aberta pelo DatabaseManager
+        questoes: Questões no formato devolvido pelo QuestaoParser
+        tamanho_lote: Quantidade de linhas por executemany
+        arquivo: Chave do arquivo de origem, guardada junto com o hash
+        sql: Comando de gravação de cada linha (colunas de COLUNAS_GRAVADAS)
+        
+    Returns:
+        Total de questões gravadas (as recusadas pelo conflito de chave ficam de fora)
+    """
+    total = 0
+    iterador = iter(questoes)
+    
+    while True:
+        # Leitura: parse e hash das questões do lote (o parser é um gerador consumido aqui)
+        with trecho('importador.leitura'):
+            lote = [(*questao, hash_questao(questao), arquivo) for questao in islice(iterador, tamanho_lote)]
+        if not lote:
+            break
+        with trecho('importador.gravacao'):
+            total += cursor.executemany(sql, lote).rowcount
+        logger.debug(f"Lote gravado: {total} questões até agora")
+    
+    return total
+
+
+def chave_arquivo(file_path: str) -> str:
+    """Chave estável de um arquivo de origem no banco (caminho absoluto)."""
+    return str(Path(file_path).resolve())
+
+
+@rastreado('importador.manifesto')
+def verificar_manifesto(cursor: sqlite3.Cursor, file_path: str) -> Optional[Tuple[int, float, str]]:
+    """
+    Compara o arquivo com o manifesto da última importação.
+    
+    Args:
+        cursor: Cursor da transação aberta pelo DatabaseManager
+        file_path: Arquivo de texto a importar
+        
+    Returns:
+        None se o arquivo não mudou; senão (tamanho, mtime, digest) atuais
+    """
+    arquivo = chave_arquivo(file_path)
+    info = os.stat(file_path)
+    anterior = cursor.execute(
+        'SELECT tamanho, mtime, digest FROM arquivos_importados WHERE caminho = ?', (arquivo,)
+    ).fetchone()
+    
+    if anterior and anterior[0] == info.st_size and anterior[1] == info.st_mtime:
+        return None
+    
+    digest = _digest_arquivo(file_path)
+    if anterior and anterior[2] == digest:
+        # Só o mtime mudou (ex.: arquivo copiado): atualiza o manifesto e segue
+        registrar_manifesto(cursor, file_path, (info.st_size, info.st_mtime, digest))
+        return None
+    
+    return info.st_size, info.st_mtime, digest
+
+
+def registrar_manifesto(cursor: sqlite3.Cursor, file_path: str, manifesto: Tuple[int, float, str]):
+    """Guarda tamanho, mtime e digest do arquivo importado."""
+    cursor.execute(
+        'INSERT OR REPLACE INTO arquivos_importados (caminho, tamanho, mtime, digest) VALUES (?, ?, ?, ?)',
+        (chave_arquivo(file_path), *manifesto)
+    )
+
+
+def _parse_trecho(file_path: str, inicio: int, fim: int) -> List[Tuple]:
+    """Questões válidas de um trecho do arquivo; executado nos processos do pool."""
+    parser = QuestaoParser()
+    erros: List[Tuple[int, str]] = []
+    questoes = [questao for questao in ler_questoes(ler_linhas(file_path, inicio, fim), erros)
+                if parser.validar_questao(questao)]
+    nome = Path(file_path).name
+    for numero_linha, motivo in erros:
+        # Linha contada a partir do início do trecho
+        logger.warning(f"{nome} (byte {inicio}) +{numero_linha}: {motivo}, ignorada")
+    return questoes
+
+
+def _parse_em_paralelo(pool: ProcessPoolExecutor, trechos: Iterable[Tuple[str, int, int]],
+                       janela: int) -> Iterator[Tuple[str, List[Tuple]]]:
+    """
+    (arquivo, questões do trecho) na ordem dos trechos, com no máximo `janela` trechos
+    em andamento no pool para não acumular resultados na memória.
+    """
+    pendentes = deque()
+    fila = iter(trechos)
+    for arquivo, inicio, fim in islice(fila, janela):
+        pendentes.append((arquivo, pool.submit(_parse_trecho, arquivo, inicio, fim)))
+    
+    while pendentes:
+        arquivo, futuro = pendentes.popleft()
+        with trecho('importador.espera_parse'):
+            questoes = futuro.result()
+        proximo = next(fila, None)
+        if proximo is not None:
+            pendentes.append((proximo[0], pool.submit(_parse_trecho, *proximo)))
+        yield arquivo, questoes
+
+
+def listar_arquivos(entradas: Iterable[str]) -> List[str]:
+    """
+    Expande diretórios e padrões glob em uma lista ordenada de arquivos.
+    
+    Args:
+        entradas: Diretórios (todos os .txt dentro), padrões glob ou arquivos
+        
+    Returns:
+        Caminhos sem repetição, em ordem alfabética dentro de cada entrada
+    """
+    arquivos: List[str] = []
+    vistos = set()
+    for entrada in entradas:
+        if Path(entrada).is_dir():
+            encontrados = sorted(str(p) for p in Path(entrada).glob('*.txt'))
+        else:
+            encontrados = sorted(glob.glob(entrada))
+        for arquivo in encontrados:
+            if arquivo not in vistos:
+                vistos.add(arquivo)
+                arquivos.append(arquivo)
+    return arquivos
+
+
+def main(argv: Optional[List[str]] = None):
     """Função principal."""
+    parser = argparse.ArgumentParser(description="Importa questões de arquivos TXT para o banco SQLite.")
+    parser.add_argument('entradas', nargs='*', help="Arquivos, diretórios ou padrões glob (ex.: 'dumps/*.txt')")
+    parser.add_argument('--banco', default="questoesGerais.db", help="Banco de destino")
+    parser.add_argument('--processos', type=int, default=None, help="Processos para o parse (padrão: CPUs)")
+    parser.add_argument('--lote', type=int, default=1000, help="Questões por executemany")
+    args = parser.parse_args(argv)
+    
+    importer = QuestaoImporter(args.banco, tamanho_lote=args.lote)
+    
+    if args.entradas:
+        arquivos = listar_arquivos(args.entradas)
+        if not arquivos:
+            logger.error("Nenhum arquivo encontrado nas entradas informadas")
+            print("❌ Nenhum arquivo encontrado")
+            return
+        
+        try:
+            total = importer.importar_arquivos(arquivos, args.processos)
+            print(f"✅ Importação de {len(arquivos)} arquivos concluída: {total} questões")
+        except Exception as e:
+            logger.error(f"Erro na importação: {e}")
+            print("❌ Erro na importação")
+        return
+    
     arquivos = [
         "TXT ORIGINAL/TGE APP 2025 GERAIS.txt",
         "TGE APP 2025 GERAIS.txt"
     ]
     
-    importer = QuestaoImporter()
-    
     for arquivo in arquivos:
         if Path(arquivo).exists():
             logger.info(f"Processando arquivo: {arquivo}")
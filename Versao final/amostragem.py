@@ -0,0 +1,99 @@
+"""
+Amostragem de questões direto no SQLite
+Sorteia ids pelo intervalo da chave primária e busca apenas as linhas sorteadas
+"""
+
+import random
+import sqlite3
+from typing import Iterator, List, Sequence, Tuple
+
+
+COLUNAS_QUESTAO = (
+    'id, numero, enunciado, alternativa_a, alternativa_b, '
+    'alternativa_c, alternativa_d, fonte, gabarito'
+)
+
+# Proporção de questões específicas em cada quiz
+PROPORCAO_ESPECIFICAS = 0.6
+
+# Quantas rodadas de sorteio tentar antes de desistir dos buracos no intervalo de ids
+MAX_RODADAS = 8
+
+# Parâmetros por consulta IN (...): abaixo do limite de variáveis de qualquer versão do SQLite (999)
+LIMITE_PARAMETROS = 500
+
+
+def em_partes(valores: Sequence, tamanho: int = LIMITE_PARAMETROS) -> Iterator[Sequence]:
+    """Fatias de até `tamanho` valores, para listas IN maiores que o limite de parâmetros"""
+    for inicio in range(0, len(valores), tamanho):
+        yield valores[inicio:inicio + tamanho]
+
+
+def sortear_ids(conn: sqlite3.Connection, k: int, rng: random.Random) -> List[int]:
+    """
+    Sorteia até k ids distintos usando MIN/MAX da chave primária.
+
+    Ids sorteados que caem em buracos (linhas apagadas) são descartados e
+    sorteados de novo. Se o banco for esparso demais, completa com os ids
+    restantes lidos do índice da chave primária.
+    """
+    if k <= 0:
+        return []
+
+    min_id, max_id = conn.execute('SELECT MIN(id), MAX(id) FROM questoes').fetchone()
+    if min_id is None:
+        return []
+
+    intervalo = max_id - min_id + 1
+    escolhidos: List[int] = []
+    vistos = set()
+
+    for _ in range(MAX_RODADAS):
+        faltam = k - len(escolhidos)
+        if faltam <= 0 or len(vistos) >= intervalo:
+            break
+
+        candidatos = []
+        for _ in range(min(faltam * 2, intervalo - len(vistos))):
+            candidato = rng.randint(min_id, max_id)
+            while candidato in vistos:
+                candidato = rng.randint(min_id, max_id)
+            vistos.add(candidato)
+            candidatos.append(candidato)
+
+        marcadores = ','.join('?' * len(candidatos))
+        existentes = {
+            linha[0] for linha in conn.execute(
+                f'SELECT id FROM questoes WHERE id IN ({marcadores})', candidatos
+            )
+        }
+        for candidato in candidatos:
+            if candidato in existentes and len(escolhidos) < k:
+                escolhidos.append(candidato)
+
+    if len(escolhidos) < k:
+        # Banco menor que k ou cheio de buracos: completa a partir do índice
+        ja_escolhidos = set(escolhidos)
+        restantes = [
+            linha[0] for linha in conn.execute('SELECT id FROM questoes ORDER BY id')
+            if linha[0] not in ja_escolhidos
+        ]
+        rng.shuffle(restantes)
+        escolhidos.extend(restantes[:k - len(escolhidos)])
+
+    return escolhidos
+
+
+def buscar_por_ids(conn: sqlite3.Connection, ids: Sequence[int]) -> List[Tuple]:
+    """Busca as questões dos ids informados, preservando a ordem recebida."""
+    if not ids:
+        return []
+
+    por_id = {}
+    for parte in em_partes(ids):
+        marcadores = ','.join('?' * len(parte))
+        for linha in conn.execute(
+            f'SELECT {COLUNAS_QUESTAO} FROM questoes WHERE id IN ({marcadores})', list(parte)
+        ):
+            por_id[linha[0]] = linha
+    return [por_id[i] for i in ids if i in por_id]
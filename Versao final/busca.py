@@ -0,0 +1,67 @@
+"""
+Busca por tema
+Índice FTS5 sobre o enunciado e as alternativas, sem diferenciar acentos, mantido por gatilhos
+"""
+
+import sqlite3
+
+TABELA_FTS = 'questoes_fts'
+COLUNAS_TEXTO = ('enunciado', 'alternativa_a', 'alternativa_b', 'alternativa_c', 'alternativa_d')
+
+_colunas = ', '.join(COLUNAS_TEXTO)
+_novos = ', '.join(f'new.{coluna}' for coluna in COLUNAS_TEXTO)
+_antigos = ', '.join(f'old.{coluna}' for coluna in COLUNAS_TEXTO)
+
+# Tabela de conteúdo externo: o texto fica só em questoes, o FTS guarda apenas o índice
+SQL_CRIAR_FTS = (
+    f"CREATE VIRTUAL TABLE {TABELA_FTS} USING fts5({_colunas}, "
+    f"content='questoes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+)
+
+GATILHOS = (
+    f'''CREATE TRIGGER IF NOT EXISTS questoes_fts_ai AFTER INSERT ON questoes BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, {_colunas}) VALUES (new.id, {_novos});
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS questoes_fts_ad AFTER DELETE ON questoes BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, {_colunas}) VALUES ('delete', old.id, {_antigos});
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS questoes_fts_au AFTER UPDATE OF {_colunas} ON questoes BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, {_colunas}) VALUES ('delete', old.id, {_antigos});
+        INSERT INTO {TABELA_FTS}(rowid, {_colunas}) VALUES (new.id, {_novos});
+    END''',
+)
+
+SQL_IDS_FTS = f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH ? ORDER BY rank'
+# Sem FTS5 disponível a busca cai para LIKE (varre a tabela e diferencia acentos)
+SQL_IDS_LIKE = 'SELECT id FROM questoes WHERE ' + ' OR '.join(f'{coluna} LIKE ?' for coluna in COLUNAS_TEXTO)
+
+
+def garantir_indice_texto(conn: sqlite3.Connection) -> bool:
+    """
+    Cria o índice FTS5 e os gatilhos que o mantêm em dia, indexando as questões existentes.
+
+    Devolve True se o banco tem o índice pronto para consulta.
+    """
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABELA_FTS,)
+    ).fetchone() is not None
+    try:
+        if not existe:
+            conn.execute(SQL_CRIAR_FTS)
+            conn.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+        for gatilho in GATILHOS:
+            conn.execute(gatilho)
+    except sqlite3.OperationalError:
+        # SQLite sem FTS5 ou banco somente leitura
+        return existe
+    return True
+
+
+def expressao_busca(tema: str) -> str:
+    """
+    Converte o texto digitado numa frase FTS5 com prefixo na última palavra.
+
+    "Classe D" casa com "classe d...", "separação" com "separacao" e "espera" com "esperar".
+    """
+    frase = ' '.join(tema.split()).replace('"', '""')
+    return f'"{frase}"*'
@@ -0,0 +1,124 @@
+"""
+Pré-carga dos bancos
+Enquanto a tela inicial está visível, uma thread importa o motor do quiz e abre os bancos;
+o resultado chega à thread do Tk por uma fila consultada com after
+"""
+
+import importlib
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+# Referência para os marcos da sonda: o import deste módulo é um dos primeiros das telas
+_INICIO = time.perf_counter()
+
+# Módulos que a tela inicial não usa e que o primeiro quiz precisa
+MODULOS_QUIZ = ('repositorio', 'eventos', 'sessao')
+
+INTERVALO_VERIFICACAO_MS = 50
+
+
+class SondaInicializacao:
+    """
+    Marcos de tempo desde a abertura do programa.
+
+    Com a variável de ambiente QUIZ_SONDA definida, cada marco é impresso em stderr;
+    o mais importante é o intervalo entre o clique em "Iniciar Quiz" e a primeira questão.
+    """
+
+    def __init__(self, inicio: float = _INICIO):
+        self.inicio = inicio
+        self.marcos: Dict[str, float] = {}
+        self.ativa = bool(os.environ.get('QUIZ_SONDA'))
+
+    def marcar(self, nome: str, desde: Optional[str] = None) -> float:
+        """Registra o marco (ms desde o início) e, com `desde`, mostra também o intervalo até ele"""
+        agora = (time.perf_counter() - self.inicio) * 1000
+        self.marcos[nome] = agora
+        if self.ativa:
+            intervalo = self.intervalo(desde, nome) if desde else None
+            extra = f" ({intervalo:.1f} ms desde {desde})" if intervalo is not None else ""
+            print(f"[sonda] {nome}: {agora:.1f} ms{extra}", file=sys.stderr)
+        return agora
+
+    def intervalo(self, de: str, ate: str) -> Optional[float]:
+        if de not in self.marcos or ate not in self.marcos:
+            return None
+        return self.marcos[ate] - self.marcos[de]
+
+
+sonda = SondaInicializacao()
+
+
+class BankPreloader:
+    """Importa o motor e abre os repositórios e o log numa thread, avisando o Tk ao terminar"""
+
+    def __init__(self, root, bancos: Sequence[str],
+                 ao_concluir: Optional[Callable[[Dict[str, Exception]], None]] = None,
+                 intervalo_ms: int = INTERVALO_VERIFICACAO_MS):
+        self.root = root
+        self.bancos = tuple(bancos)
+        self.ao_concluir = ao_concluir
+        self.intervalo_ms = intervalo_ms
+        self.pronto = False
+        self.erros: Dict[str, Exception] = {}
+        self.tempos: Dict[str, float] = {}
+        self._fila: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._trabalhar, name='precarga-bancos', daemon=True)
+        self._thread.start()
+        self.root.after(self.intervalo_ms, self._verificar)
+
+    # --------------------- Thread de pré-carga ---------------------
+    def _trabalhar(self):
+        try:
+            inicio = time.perf_counter()
+            modulos = {nome: importlib.import_module(nome) for nome in MODULOS_QUIZ}
+            self._fila.put(('modulos', None, time.perf_counter() - inicio))
+
+            for banco in self.bancos:
+                inicio = time.perf_counter()
+                try:
+                    # Abre a conexão somente leitura, aplica os pragmas e aquece o cache de páginas
+                    modulos['repositorio'].abrir_repositorio(banco).contar()
+                except Exception as e:
+                    self._fila.put(('erro', banco, e))
+                else:
+                    self._fila.put(('banco', banco, time.perf_counter() - inicio))
+
+            inicio = time.perf_counter()
+            modulos['eventos'].abrir_log()
+            self._fila.put(('log', None, time.perf_counter() - inicio))
+        except Exception as e:
+            self._fila.put(('erro', None, e))
+        finally:
+            self._fila.put(('fim', None, None))
+
+    # --------------------- Thread do Tk ---------------------
+    def _verificar(self):
+        """Consome as mensagens da thread sem bloquear; reagenda até a pré-carga terminar"""
+        while True:
+            try:
+                tipo, banco, valor = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == 'erro':
+                self.erros[banco or ''] = valor
+            elif tipo == 'fim':
+                self.pronto = True
+            else:
+                self.tempos[banco or tipo] = valor
+
+        if not self.pronto:
+            self.root.after(self.intervalo_ms, self._verificar)
+            return
+        sonda.marcar('bancos_prontos')
+        if self.ao_concluir is not None:
+            self.ao_concluir(self.erros)
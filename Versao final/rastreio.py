@@ -0,0 +1,212 @@
+"""
+Rastreio dos caminhos quentes
+Trechos nomeados (carga dos bancos, montagem da tela, desenho da questão, resposta, etapas do importador)
+guardados num buffer circular; exportados como trace do Chrome e resumidos em p50/p95/p99
+
+Desligado, trecho() devolve um contexto vazio e @rastreado só consulta uma flag.
+Com a variável de ambiente QUIZ_RASTREIO definida o rastreio liga na importação deste módulo;
+se o valor terminar em .json, o trace é gravado nesse arquivo ao sair e o resumo vai para stderr.
+
+    QUIZ_RASTREIO=trace.json python quizTGEv2.py
+    python rastreio.py trace.json          # resumo de um trace recebido
+"""
+
+import argparse
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+# Trechos guardados; os mais antigos são descartados quando o buffer enche
+CAPACIDADE = 65_536
+PERCENTIS = (50, 95, 99)
+
+
+class Trecho(NamedTuple):
+    nome: str
+    inicio_ns: int
+    duracao_ns: int
+    thread: int
+
+
+class _TrechoVazio:
+    """Contexto devolvido com o rastreio desligado: não mede nada"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+
+_VAZIO = _TrechoVazio()
+
+
+class _TrechoAberto:
+    __slots__ = ('rastreador', 'nome', 'inicio')
+
+    def __init__(self, rastreador: 'SpanTracer', nome: str):
+        self.rastreador = rastreador
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *excecao):
+        self.rastreador.registrar(self.nome, self.inicio, time.perf_counter_ns() - self.inicio)
+        return False
+
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Percentil pelo posto mais próximo numa lista já ordenada"""
+    posto = max(1, -(-len(ordenados) * p // 100))
+    return ordenados[int(posto) - 1]
+
+
+def resumir(duracoes: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """Contagem, total, p50/p95/p99 e máximo (ms) de cada trecho"""
+    resumo = {}
+    for nome, valores in duracoes.items():
+        valores = sorted(valores)
+        resumo[nome] = {
+            'n': len(valores),
+            'total_ms': sum(valores),
+            **{f'p{p}_ms': percentil(valores, p) for p in PERCENTIS},
+            'max_ms': valores[-1],
+        }
+    return resumo
+
+
+def formatar_resumo(resumo: Dict[str, Dict[str, float]]) -> str:
+    linhas = [f"{'trecho':<28}{'n':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'máx ms':>11}"]
+    for nome, estatisticas in sorted(resumo.items(), key=lambda item: -item[1]['total_ms']):
+        linhas.append(
+            f"{nome:<28}{estatisticas['n']:>7}{estatisticas['p50_ms']:>11.3f}{estatisticas['p95_ms']:>11.3f}"
+            f"{estatisticas['p99_ms']:>11.3f}{estatisticas['max_ms']:>11.3f}"
+        )
+    return '\n'.join(linhas)
+
+
+class SpanTracer:
+    """Buffer circular de trechos; append em deque com maxlen é seguro entre threads"""
+
+    def __init__(self, capacidade: int = CAPACIDADE):
+        self.ativo = False
+        self.trechos: deque = deque(maxlen=capacidade)
+        self.origem_ns = time.perf_counter_ns()
+
+    def ativar(self, capacidade: Optional[int] = None):
+        if capacidade is not None and capacidade != self.trechos.maxlen:
+            self.trechos = deque(self.trechos, maxlen=capacidade)
+        self.ativo = True
+
+    def desativar(self):
+        self.ativo = False
+
+    def limpar(self):
+        self.trechos.clear()
+
+    def trecho(self, nome: str):
+        """Contexto que mede o bloco com o nome dado (ou não faz nada, se desligado)"""
+        if not self.ativo:
+            return _VAZIO
+        return _TrechoAberto(self, nome)
+
+    def registrar(self, nome: str, inicio_ns: int, duracao_ns: int):
+        self.trechos.append(Trecho(nome, inicio_ns, duracao_ns, threading.get_ident()))
+
+    def duracoes(self) -> Dict[str, List[float]]:
+        por_nome: Dict[str, List[float]] = {}
+        for trecho in list(self.trechos):
+            por_nome.setdefault(trecho.nome, []).append(trecho.duracao_ns / 1e6)
+        return por_nome
+
+    def resumo(self) -> Dict[str, Dict[str, float]]:
+        return resumir(self.duracoes())
+
+    def chrome_trace(self) -> dict:
+        """Eventos completos ("ph": "X") em microssegundos, como o chrome://tracing e o Perfetto esperam"""
+        pid = os.getpid()
+        trechos = list(self.trechos)
+        nomes_threads = {thread.ident: thread.name for thread in threading.enumerate()}
+        eventos = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+             'args': {'name': nomes_threads.get(tid, f'thread-{tid}')}}
+            for tid in sorted({trecho.thread for trecho in trechos})
+        ]
+        eventos.extend(
+            {'name': trecho.nome, 'cat': trecho.nome.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': trecho.thread,
+             'ts': (trecho.inicio_ns - self.origem_ns) / 1000, 'dur': trecho.duracao_ns / 1000}
+            for trecho in trechos
+        )
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms', 'otherData': {'resumo': self.resumo()}}
+
+    def exportar(self, caminho: str):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.chrome_trace(), arquivo, ensure_ascii=False)
+
+
+rastreador = SpanTracer()
+
+
+def trecho(nome: str):
+    return rastreador.trecho(nome)
+
+
+def rastreado(nome: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorador: cada chamada da função vira um trecho (por padrão com o nome qualificado dela)"""
+    def decorar(funcao: Callable) -> Callable:
+        rotulo = nome or funcao.__qualname__
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not rastreador.ativo:
+                return funcao(*args, **kwargs)
+            with _TrechoAberto(rastreador, rotulo):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorar
+
+
+def duracoes_do_trace(eventos: Iterable[dict]) -> Dict[str, List[float]]:
+    """Durações (ms) por nome a partir dos eventos de um trace exportado"""
+    por_nome: Dict[str, List[float]] = {}
+    for evento in eventos:
+        if evento.get('ph') == 'X':
+            por_nome.setdefault(evento['name'], []).append(evento['dur'] / 1000)
+    return por_nome
+
+
+def _exportar_ao_sair(caminho: str):
+    rastreador.exportar(caminho)
+    print(formatar_resumo(rastreador.resumo()), file=sys.stderr)
+    print(f"Trace gravado em {caminho} ({len(rastreador.trechos)} trechos)", file=sys.stderr)
+
+
+_destino = os.environ.get('QUIZ_RASTREIO')
+if _destino:
+    rastreador.ativar()
+    if _destino.endswith('.json'):
+        atexit.register(_exportar_ao_sair, _destino)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume um trace exportado pelo quiz (p50/p95/p99 por trecho).")
+    parser.add_argument('trace')
+    args = parser.parse_args(argv)
+
+    with open(args.trace, encoding='utf-8') as arquivo:
+        dados = json.load(arquivo)
+    print(formatar_resumo(resumir(duracoes_do_trace(dados.get('traceEvents', [])))))
+
+
+if __name__ == "__main__":
+    main()
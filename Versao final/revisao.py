@@ -0,0 +1,315 @@
+"""
+Repetição espaçada (SM-2)
+Estado de revisão de cada usuário num banco próprio, separado dos bancos de questões e indexado pelo
+hash do conteúdo (os ids mudam quando o banco é reimportado), e fila de questões vencidas
+"""
+
+import heapq
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Collection, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from amostragem import MAX_RODADAS, PROPORCAO_ESPECIFICAS, em_partes, sortear_ids
+from eventos import AnswerLog
+from repositorio import QuestionRepository, Questao
+
+SEGUNDOS_POR_DIA = 86400
+
+# Agenda de cada usuário: um arquivo por usuário, ao lado do log de respostas
+BANCO_REVISOES = 'revisoes_{usuario}.db'
+
+# Parâmetros do SM-2
+FACILIDADE_INICIAL = 2.5
+FACILIDADE_MINIMA = 1.3
+# Qualidade da resposta (0 a 5) atribuída a acerto e erro, já que o quiz só sabe certo/errado
+QUALIDADE_ACERTO = 4
+QUALIDADE_ERRO = 1
+
+
+@dataclass(frozen=True)
+class EstadoRevisao:
+    """Situação de uma questão na agenda de um usuário"""
+    hash: str                   # hash_questao do conteúdo
+    repeticoes: int = 0
+    intervalo: float = 0.0      # em dias
+    facilidade: float = FACILIDADE_INICIAL
+    vencimento: float = 0.0     # epoch em segundos
+
+
+def banco_revisoes(usuario: str) -> str:
+    """Arquivo da agenda do usuário, com o nome reduzido a caracteres seguros"""
+    return BANCO_REVISOES.format(usuario=re.sub(r'[^\w-]', '_', usuario))
+
+
+def atualizar_sm2(estado: EstadoRevisao, correta: bool, agora: float) -> EstadoRevisao:
+    """Aplica uma resposta ao estado e calcula o próximo vencimento"""
+    qualidade = QUALIDADE_ACERTO if correta else QUALIDADE_ERRO
+
+    if qualidade < 3:
+        repeticoes, intervalo = 0, 1.0
+    else:
+        repeticoes = estado.repeticoes + 1
+        if repeticoes == 1:
+            intervalo = 1.0
+        elif repeticoes == 2:
+            intervalo = 6.0
+        else:
+            intervalo = round(estado.intervalo * estado.facilidade)
+
+    erro = 5 - qualidade
+    facilidade = max(FACILIDADE_MINIMA, estado.facilidade + 0.1 - erro * (0.08 + erro * 0.02))
+
+    return replace(
+        estado,
+        repeticoes=repeticoes,
+        intervalo=intervalo,
+        facilidade=facilidade,
+        vencimento=agora + intervalo * SEGUNDOS_POR_DIA
+    )
+
+
+class ReviewScheduler:
+    """Agenda SM-2 de um usuário sobre um banco de questões"""
+
+    SQL_CRIAR = '''
+        CREATE TABLE IF NOT EXISTS revisoes (
+            banco TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            repeticoes INTEGER NOT NULL,
+            intervalo REAL NOT NULL,
+            facilidade REAL NOT NULL,
+            vencimento REAL NOT NULL,
+            PRIMARY KEY (banco, hash)
+        ) WITHOUT ROWID
+    '''
+    # A fila de vencidas sai ordenada direto do índice, sem ordenar a tabela
+    SQL_INDICE = 'CREATE INDEX IF NOT EXISTS idx_revisoes_vencimento ON revisoes(banco, vencimento)'
+    SQL_VENCIDAS = '''
+        SELECT vencimento, hash FROM revisoes
+        WHERE banco = ? AND vencimento <= ?
+        ORDER BY vencimento LIMIT ?
+    '''
+    SQL_ESTADO = '''
+        SELECT hash, repeticoes, intervalo, facilidade, vencimento
+        FROM revisoes WHERE banco = ? AND hash = ?
+    '''
+    SQL_GRAVAR = '''
+        INSERT INTO revisoes (banco, hash, repeticoes, intervalo, facilidade, vencimento)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (banco, hash) DO UPDATE SET
+            repeticoes = excluded.repeticoes,
+            intervalo = excluded.intervalo,
+            facilidade = excluded.facilidade,
+            vencimento = excluded.vencimento
+    '''
+
+    def __init__(self, repositorio: QuestionRepository, usuario: str,
+                 registro: Optional[AnswerLog] = None, banco: Optional[str] = None):
+        """
+        Args:
+            repositorio: Banco de questões (só lido)
+            usuario: Dono da agenda
+            registro: Log cuja thread grava as respostas; sem ele, cada resposta é gravada na hora
+            banco: Arquivo da agenda (padrão: banco_revisoes(usuario))
+        """
+        self.repositorio = repositorio
+        self.usuario = usuario
+        self.registro = registro
+        self.banco = banco or banco_revisoes(usuario)
+        # O banco de questões entra na agenda pelo nome do arquivo, que não depende da pasta
+        self.chave = os.path.basename(repositorio.banco)
+        self._agenda = _abrir_agenda(self.banco)
+        # Estados ainda na fila do log, para a sessão enxergar as próprias respostas
+        self._pendentes: Dict[str, EstadoRevisao] = {}
+        self._hashes: Dict[int, str] = {}
+
+    def vencidas(self, limite: int, agora: float) -> List[Tuple[float, str]]:
+        """Até `limite` pares (vencimento, hash) vencidos, os mais atrasados primeiro"""
+        with self._agenda.lock:
+            return self._agenda.conn.execute(self.SQL_VENCIDAS, (self.chave, agora, limite)).fetchall()
+
+    def hashes(self, ids: Iterable[int]) -> Dict[int, str]:
+        """Hash de cada id, guardando os já vistos para a hora de registrar a resposta"""
+        faltam = [questao_id for questao_id in ids if questao_id not in self._hashes]
+        if faltam:
+            self._hashes.update(self.repositorio.hashes_por_ids(faltam))
+        return self._hashes
+
+    def ids(self, hashes: Collection[str]) -> Dict[str, int]:
+        """Id atual de cada hash; os que sumiram do banco ficam de fora"""
+        por_hash = self.repositorio.ids_por_hashes(list(hashes))
+        self._hashes.update((questao_id, hash_) for hash_, questao_id in por_hash.items())
+        return por_hash
+
+    def novas(self, k: int, rng: random.Random) -> List[int]:
+        """Sorteia até k questões que o usuário ainda não viu"""
+        if k <= 0:
+            return []
+        escolhidas: List[int] = []
+        vistas = set()
+        for _ in range(MAX_RODADAS):
+            faltam = k - len(escolhidas)
+            if faltam <= 0:
+                break
+            with self.repositorio.conexao() as conn:
+                candidatas = [i for i in sortear_ids(conn, faltam * 2, rng) if i not in vistas]
+            if not candidatas:
+                break
+            vistas.update(candidatas)
+            hashes = self.hashes(candidatas)
+            revisadas = self._revisadas([hashes[i] for i in candidatas if i in hashes])
+            escolhidas.extend(i for i in candidatas if i in hashes and hashes[i] not in revisadas)
+            del escolhidas[k:]
+
+        if len(escolhidas) < k:
+            # Usuário já viu quase todo o banco: busca as que faltam pela tabela inteira
+            ja_escolhidas = set(escolhidas)
+            with self.repositorio.conexao() as conn:
+                todas = [linha[0] for linha in conn.execute('SELECT id FROM questoes ORDER BY id')]
+            hashes = self.repositorio.hashes_por_ids(todas)
+            revisadas = self._todas_revisadas()
+            restantes = [
+                questao_id for questao_id in todas
+                if questao_id not in ja_escolhidas and hashes.get(questao_id) not in revisadas
+            ]
+            rng.shuffle(restantes)
+            escolhidas.extend(restantes[:k - len(escolhidas)])
+        return escolhidas
+
+    def _revisadas(self, hashes: List[str]) -> Set[str]:
+        revisadas = {hash_ for hash_ in hashes if hash_ in self._pendentes}
+        with self._agenda.lock:
+            for parte in em_partes(hashes):
+                marcadores = ','.join('?' * len(parte))
+                revisadas.update(linha[0] for linha in self._agenda.conn.execute(
+                    f'SELECT hash FROM revisoes WHERE banco = ? AND hash IN ({marcadores})',
+                    [self.chave, *parte]
+                ))
+        return revisadas
+
+    def _todas_revisadas(self) -> Set[str]:
+        with self._agenda.lock:
+            revisadas = {linha[0] for linha in self._agenda.conn.execute(
+                'SELECT hash FROM revisoes WHERE banco = ?', (self.chave,)
+            )}
+        return revisadas | self._pendentes.keys()
+
+    def estado(self, hash_: str) -> EstadoRevisao:
+        if hash_ in self._pendentes:
+            return self._pendentes[hash_]
+        with self._agenda.lock:
+            linha = self._agenda.conn.execute(self.SQL_ESTADO, (self.chave, hash_)).fetchone()
+        return EstadoRevisao(*linha) if linha else EstadoRevisao(hash_)
+
+    def registrar(self, questao_id: int, correta: bool, agora: Optional[float] = None) -> EstadoRevisao:
+        """
+        Atualiza a agenda da questão com a resposta dada.
+
+        Com um log, a gravação vai para a fila da thread dele e a tela não espera o commit.
+        """
+        agora = time.time() if agora is None else agora
+        hash_ = self.hashes((questao_id,)).get(questao_id)
+        if hash_ is None:
+            raise LookupError(f"A questão {questao_id} não existe mais em {self.repositorio.banco}")
+        novo = atualizar_sm2(self.estado(hash_), correta, agora)
+        parametros = (self.chave, novo.hash, novo.repeticoes, novo.intervalo, novo.facilidade, novo.vencimento)
+        if self.registro is not None:
+            self._pendentes[hash_] = novo
+            self.registro.escrever(self.banco, self.SQL_GRAVAR, parametros)
+        else:
+            with self._agenda.lock:
+                self._agenda.conn.execute(self.SQL_GRAVAR, parametros)
+                self._agenda.conn.commit()
+        return novo
+
+
+# --------------------- Agendas compartilhadas ---------------------
+class _Agenda(NamedTuple):
+    conn: sqlite3.Connection
+    lock: threading.Lock
+
+
+_agendas: Dict[str, _Agenda] = {}
+_agendas_lock = threading.Lock()
+
+
+def _abrir_agenda(banco: str) -> _Agenda:
+    """Conexão de leitura da agenda, criando as tabelas só na primeira vez"""
+    with _agendas_lock:
+        agenda = _agendas.get(banco)
+        if agenda is None:
+            conn = sqlite3.connect(banco, check_same_thread=False)
+            # WAL: a tela lê a agenda enquanto a thread do log grava
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(ReviewScheduler.SQL_CRIAR)
+            conn.execute(ReviewScheduler.SQL_INDICE)
+            conn.commit()
+            agenda = _agendas[banco] = _Agenda(conn, threading.Lock())
+        return agenda
+
+
+def fechar_agendas():
+    """Fecha as conexões de todas as agendas abertas pelo processo"""
+    with _agendas_lock:
+        for agenda in _agendas.values():
+            with agenda.lock:
+                agenda.conn.close()
+        _agendas.clear()
+
+
+def _vencidas_marcadas(agendador: ReviewScheduler, limite: int,
+                       agora: float) -> Iterator[Tuple[float, str, ReviewScheduler]]:
+    for vencimento, hash_ in agendador.vencidas(limite, agora):
+        yield vencimento, hash_, agendador
+
+
+def montar_deck(total_questoes: int, especificas: ReviewScheduler, gerais: ReviewScheduler,
+                agora: Optional[float] = None,
+                rng: Optional[random.Random] = None) -> List[Tuple[Questao, ReviewScheduler]]:
+    """
+    Monta o deck da sessão: primeiro as vencidas dos dois bancos, das mais atrasadas para
+    as menos, depois questões nunca vistas (60% específicas / 40% gerais) embaralhadas.
+    """
+    agora = time.time() if agora is None else agora
+    rng = rng or random.Random()
+    agendadores = (especificas, gerais)
+
+    # Cada fila já sai ordenada do índice; o heap só intercala as duas até completar o deck
+    filas = [_vencidas_marcadas(agendador, total_questoes, agora) for agendador in agendadores]
+    vencidas = list(islice(heapq.merge(*filas, key=lambda item: item[0]), total_questoes))
+
+    faltam = total_questoes - len(vencidas)
+    num_especificas = int(faltam * PROPORCAO_ESPECIFICAS)
+    novas = {
+        especificas: especificas.novas(num_especificas, rng),
+        gerais: gerais.novas(faltam - num_especificas, rng),
+    }
+
+    questoes = {}
+    ids_vencidas = {}
+    for agendador in agendadores:
+        # A agenda guarda hashes: cada um volta ao id que a questão tem hoje no banco
+        ids_vencidas[agendador] = agendador.ids([hash_ for _, hash_, dono in vencidas if dono is agendador])
+        ids = list(ids_vencidas[agendador].values()) + novas[agendador]
+        for questao in agendador.repositorio.por_ids(ids):
+            questoes[agendador, questao.id] = questao
+
+    # Questões apagadas ou alteradas no banco depois de revisadas ficam de fora
+    deck = [
+        (questoes[agendador, ids_vencidas[agendador][hash_]], agendador)
+        for _, hash_, agendador in vencidas
+        if (agendador, ids_vencidas[agendador].get(hash_)) in questoes
+    ]
+    deck_novas = [
+        (questoes[agendador, questao_id], agendador)
+        for agendador in agendadores for questao_id in novas[agendador]
+        if (agendador, questao_id) in questoes
+    ]
+    rng.shuffle(deck_novas)
+    return deck + deck_novas
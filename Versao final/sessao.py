@@ -0,0 +1,269 @@
+"""
+Motor do quiz sem interface gráfica
+Guarda o estado de uma sessão (questões, posição, acertos) para qualquer front-end
+"""
+
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+
+from adaptativo import ALVO_ACERTO, DifficultyIndex, abrir_indice, atualizar_habilidade
+from amostragem import PROPORCAO_ESPECIFICAS
+from eventos import BANCO_EVENTOS, AnswerLog, EventoResposta
+from rastreio import rastreado, trecho
+from repositorio import (BANCO_ESPECIFICAS, BANCO_GERAIS, QuestaoLeve, QuestionRepository, Questao,
+                         abrir_repositorio, carregar_textos, montar_selecao_por_banco)
+from revisao import ReviewScheduler, montar_deck
+
+
+# Percentuais de desempenho
+LIMIAR_EXCELENTE = 70
+LIMIAR_BOM = 50
+
+# Questões sem texto (QuestaoLeve) têm os textos buscados neste tamanho de lote, a partir da atual
+LOTE_TEXTOS = 10
+
+
+@dataclass(frozen=True)
+class RespostaAvaliada:
+    """Resultado de uma resposta individual"""
+    correta: bool
+    escolhida: str
+    gabarito: str
+
+
+@dataclass(frozen=True)
+class ResultadoQuiz:
+    """Resumo da sessão encerrada"""
+    acertos: int
+    total: int
+    percentual: float
+    mensagem: str
+
+
+def avaliar_desempenho(percentual: float) -> str:
+    """Mensagem de desempenho para o percentual de acerto"""
+    if percentual >= LIMIAR_EXCELENTE:
+        return "🎉 Parabéns! Excelente desempenho!"
+    if percentual >= LIMIAR_BOM:
+        return "👍 Bom trabalho! Continue estudando!"
+    return "📚 Continue estudando para melhorar!"
+
+
+class QuizSession:
+    """Uma rodada do quiz: questão atual, respostas e resultado"""
+
+    def __init__(self, questoes: Sequence[Questao],
+                 agendadores: Optional[Sequence[ReviewScheduler]] = None,
+                 bancos: Optional[Sequence[str]] = None,
+                 registro: Optional[AnswerLog] = None):
+        self.questoes: List[Questao] = list(questoes)
+        # No modo revisão, a agenda de cada questão (paralela a self.questoes)
+        self.agendadores: Optional[List[ReviewScheduler]] = list(agendadores) if agendadores else None
+        # Banco de origem de cada questão, quando conhecido (paralelo a self.questoes)
+        self.bancos: Optional[List[str]] = list(bancos) if bancos else None
+        self.registro = registro
+        self.sessao_id = uuid.uuid4().hex
+        self.indice = 0
+        self.acertos = 0
+        self.respostas: List[RespostaAvaliada] = []
+        self._exibida_em: Optional[float] = None
+
+    @classmethod
+    def iniciar(cls, total_questoes: int,
+                banco_especificas: str = BANCO_ESPECIFICAS,
+                banco_gerais: str = BANCO_GERAIS,
+                seed: Optional[int] = None,
+                tema: Optional[str] = None,
+                registro: Optional[AnswerLog] = None) -> 'QuizSession':
+        """Sorteia as questões (60% específicas / 40% gerais), opcionalmente de um tema, e abre a sessão"""
+        selecao = montar_selecao_por_banco(total_questoes, banco_especificas, banco_gerais, seed=seed, tema=tema)
+        return cls.de_selecao(selecao, registro=registro)
+
+    @classmethod
+    def de_selecao(cls, selecao: Sequence[Tuple[str, Questao]],
+                   registro: Optional[AnswerLog] = None) -> 'QuizSession':
+        """Abre a sessão a partir de pares (banco, questão)"""
+        return cls([questao for _, questao in selecao], bancos=[banco for banco, _ in selecao], registro=registro)
+
+    @classmethod
+    def revisao(cls, total_questoes: int, usuario: str,
+                banco_especificas: str = BANCO_ESPECIFICAS,
+                banco_gerais: str = BANCO_GERAIS,
+                seed: Optional[int] = None,
+                registro: Optional[AnswerLog] = None) -> 'QuizSession':
+        """
+        Sessão de repetição espaçada: questões vencidas do usuário primeiro, depois novas.
+
+        A agenda é gravada pela thread do registro, quando há um, junto com as respostas.
+        """
+        deck = montar_deck(
+            total_questoes,
+            ReviewScheduler(abrir_repositorio(banco_especificas), usuario, registro),
+            ReviewScheduler(abrir_repositorio(banco_gerais), usuario, registro),
+            rng=random.Random(seed)
+        )
+        return cls(
+            [questao for questao, _ in deck],
+            [agendador for _, agendador in deck],
+            bancos=[agendador.repositorio.banco for _, agendador in deck],
+            registro=registro
+        )
+
+    @classmethod
+    def adaptativa(cls, total_questoes: int,
+                   banco_especificas: str = BANCO_ESPECIFICAS,
+                   banco_gerais: str = BANCO_GERAIS,
+                   seed: Optional[int] = None,
+                   registro: Optional[AnswerLog] = None,
+                   banco_eventos: Optional[str] = None,
+                   converter: Optional[Callable[[Questao, str], Any]] = None) -> 'AdaptiveSession':
+        """
+        Sessão adaptativa: cada questão é escolhida depois da resposta anterior, perto do nível
+        estimado do aluno. As dificuldades vêm de question_stats, no banco do log de respostas.
+        """
+        rng = random.Random(seed)
+        if banco_eventos is None:
+            banco_eventos = registro.banco if registro is not None else BANCO_EVENTOS
+        fontes = []
+        for banco in (banco_especificas, banco_gerais):
+            repositorio = abrir_repositorio(banco)
+            fontes.append((repositorio, abrir_indice(repositorio, banco_eventos)))
+
+        # Mesma proporção 60/40 do sorteio, decidida de antemão para a sessão inteira
+        num_especificas = int(total_questoes * PROPORCAO_ESPECIFICAS)
+        sequencia = [0] * num_especificas + [1] * (total_questoes - num_especificas)
+        rng.shuffle(sequencia)
+        return AdaptiveSession(fontes, sequencia, rng, registro=registro, converter=converter)
+
+    @property
+    def total(self) -> int:
+        return len(self.questoes)
+
+    @property
+    def finalizada(self) -> bool:
+        return self.indice >= self.total
+
+    def questao_atual(self) -> Optional[Questao]:
+        """Questão a ser exibida, ou None quando a sessão terminou"""
+        if self.finalizada:
+            return None
+        if self._exibida_em is None:
+            # Início do tempo de resposta: a primeira vez que a questão é pedida para exibição
+            self._exibida_em = time.monotonic()
+        questao = self.questoes[self.indice]
+        if isinstance(questao, QuestaoLeve) and not questao.carregada:
+            with trecho('sessao.carregar_textos'):
+                carregar_textos(self.questoes[self.indice:self.indice + LOTE_TEXTOS])
+        return questao
+
+    def responder(self, resposta: str) -> RespostaAvaliada:
+        """Registra a resposta da questão atual e avança para a próxima"""
+        exibida_em = self._exibida_em
+        questao = self.questao_atual()
+        if questao is None:
+            raise RuntimeError("A sessão já foi finalizada")
+
+        avaliada = RespostaAvaliada(
+            correta=resposta == questao.gabarito,
+            escolhida=resposta,
+            gabarito=questao.gabarito
+        )
+        if avaliada.correta:
+            self.acertos += 1
+        if self.agendadores:
+            self.agendadores[self.indice].registrar(questao.id, avaliada.correta)
+        if self.registro is not None:
+            self.registro.registrar(EventoResposta(
+                sessao=self.sessao_id,
+                banco=self.bancos[self.indice] if self.bancos else None,
+                questao_id=questao.id,
+                escolhida=resposta,
+                correta=avaliada.correta,
+                tempo_resposta=time.monotonic() - exibida_em if exibida_em is not None else None,
+                registrado_em=time.time()
+            ))
+        self.respostas.append(avaliada)
+        self.indice += 1
+        self._exibida_em = None
+        return avaliada
+
+    def resultado(self) -> ResultadoQuiz:
+        """Resumo com acertos, percentual e mensagem de desempenho"""
+        percentual = (self.acertos / self.total) * 100 if self.total else 0.0
+        return ResultadoQuiz(
+            acertos=self.acertos,
+            total=self.total,
+            percentual=percentual,
+            mensagem=avaliar_desempenho(percentual)
+        )
+
+
+class AdaptiveSession(QuizSession):
+    """
+    Sessão que escolhe cada questão só quando ela vai ser exibida.
+
+    A habilidade do aluno começa em 0 e é atualizada a cada resposta (Elo/Rasch); a próxima
+    questão sai da faixa de dificuldade em que a chance de acerto fica perto de ALVO_ACERTO.
+    """
+
+    def __init__(self, fontes: Sequence[Tuple[QuestionRepository, DifficultyIndex]],
+                 sequencia: Sequence[int], rng: random.Random,
+                 registro: Optional[AnswerLog] = None,
+                 converter: Optional[Callable[[Questao, str], Any]] = None):
+        super().__init__([], registro=registro)
+        self.fontes = list(fontes)
+        # Posição em self.fontes de onde sai cada questão da sessão
+        self.sequencia = list(sequencia)
+        self.rng = rng
+        # Permite às telas receber a questão no seu próprio modelo de dados
+        self.converter = converter
+        self.habilidade = 0.0
+        self.bancos: List[str] = []
+        self.dificuldades: List[float] = []
+        self._usadas: List[Set[int]] = [set() for _ in self.fontes]
+        self._total = len(self.sequencia)
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def questao_atual(self):
+        if self.indice == len(self.questoes) and not self.finalizada:
+            self._escolher_proxima()
+        return super().questao_atual()
+
+    @rastreado('sessao.escolher_proxima')
+    def _escolher_proxima(self):
+        # Dificuldade em que a chance de acerto, pelo modelo de Rasch, é ALVO_ACERTO
+        alvo = self.habilidade - math.log(ALVO_ACERTO / (1.0 - ALVO_ACERTO))
+        preferida = self.sequencia[self.indice]
+        ordem = [preferida] + [posicao for posicao in range(len(self.fontes)) if posicao != preferida]
+
+        for posicao in ordem:
+            repositorio, indice = self.fontes[posicao]
+            usadas = self._usadas[posicao]
+            while True:
+                questao_id = indice.escolher(alvo, usadas, self.rng)
+                if questao_id is None:
+                    break
+                usadas.add(questao_id)
+                questao = repositorio.por_id(questao_id)
+                if questao is None:
+                    # Apagada do banco depois que o índice foi montado
+                    continue
+                self.questoes.append(self.converter(questao, repositorio.banco) if self.converter else questao)
+                self.bancos.append(repositorio.banco)
+                self.dificuldades.append(indice.dificuldades[questao_id])
+                return
+
+        # Bancos esgotados: a sessão termina com as questões que já saíram
+        self._total = len(self.questoes)
+
+    def responder(self, resposta: str) -> RespostaAvaliada:
+        avaliada = super().responder(resposta)
+        self.habilidade = atualizar_habilidade(self.habilidade, self.dificuldades[self.indice - 1], avaliada.correta)
+        return avaliada
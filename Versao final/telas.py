@@ -0,0 +1,44 @@
+"""
+Gerenciador de telas
+Uma única janela Tk para o processo inteiro; as telas são frames criados uma vez e trocados
+"""
+
+import tkinter as tk
+from typing import Any, Callable, Dict, Optional
+
+
+class ScreenManager:
+    """Empilha as telas no mesmo container e traz a tela pedida para a frente"""
+
+    def __init__(self, root: tk.Tk, bg: str = "#1e1e1e"):
+        self.root = root
+        self.bg = bg
+        self.container = tk.Frame(root, bg=bg)
+        self.container.pack(fill='both', expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+
+        self.telas: Dict[str, Any] = {}
+        self.frames: Dict[str, tk.Frame] = {}
+        self.atual: Optional[str] = None
+
+    def registrar(self, nome: str, fabrica: Callable[[tk.Frame], Any]) -> Any:
+        """Cria o frame da tela uma única vez e constrói a tela dentro dele"""
+        frame = tk.Frame(self.container, bg=self.bg)
+        frame.grid(row=0, column=0, sticky='nsew')
+        self.frames[nome] = frame
+        self.telas[nome] = fabrica(frame)
+        return self.telas[nome]
+
+    def tela(self, nome: str) -> Any:
+        return self.telas[nome]
+
+    def mostrar(self, nome: str) -> Any:
+        """Traz a tela para a frente; nenhum widget é destruído ou recriado"""
+        self.frames[nome].tkraise()
+        self.atual = nome
+        return self.telas[nome]
+
+    def fechar(self):
+        """Encerra o mainloop e destrói a única janela do processo"""
+        self.root.destroy()
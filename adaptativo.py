@@ -0,0 +1,255 @@
+"""
+Seleção adaptativa de dificuldade
+Dificuldade de cada questão (escala logit, estilo Rasch) agrupada em faixas num índice em memória,
+em que cada sessão aplica só as questões com estatísticas novas
+"""
+
+import bisect
+import math
+import os
+import random
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from estatisticas import alteradas_desde, versao_estatisticas
+from repositorio import QuestionRepository
+
+# Largura de cada faixa de dificuldade, em logits
+LARGURA_FAIXA = 0.25
+# Passo da atualização Elo da habilidade do aluno, em logits
+FATOR_K = 0.4
+# Sorteios aleatórios numa faixa antes de passar às vizinhas
+TENTATIVAS_FAIXA = 8
+# Probabilidade de acerto buscada na próxima questão (um pouco acima de 50% para não desanimar)
+ALVO_ACERTO = 0.6
+
+
+def probabilidade_acerto(habilidade: float, dificuldade: float) -> float:
+    """Modelo de Rasch: chance de acerto de quem tem a habilidade numa questão com a dificuldade"""
+    return 1.0 / (1.0 + math.exp(dificuldade - habilidade))
+
+
+def atualizar_habilidade(habilidade: float, dificuldade: float, correta: bool,
+                         k: float = FATOR_K) -> float:
+    """Atualização Elo: sobe mais quando acerta uma questão difícil, cai mais quando erra uma fácil"""
+    return habilidade + k * ((1.0 if correta else 0.0) - probabilidade_acerto(habilidade, dificuldade))
+
+
+def dificuldade_estimada(tentativas: int, acertos: int) -> float:
+    """Logit da taxa de erro com suavização; questão sem histórico fica no meio (0)"""
+    return math.log((tentativas - acertos + 1) / (acertos + 1))
+
+
+class DifficultyIndex:
+    """Questões de um banco agrupadas por faixa de dificuldade, com as faixas ordenadas para bisect"""
+
+    def __init__(self, dificuldades: Dict[int, float], versao: int = 0):
+        self.dificuldades = dificuldades
+        # Contador de question_stats quando as dificuldades foram lidas ou atualizadas
+        self.versao = versao
+        faixas: Dict[int, List[int]] = {}
+        for questao_id, dificuldade in dificuldades.items():
+            faixas.setdefault(self._chave(dificuldade), []).append(questao_id)
+        self.chaves: List[int] = sorted(faixas)
+        self.faixas: List[List[int]] = [faixas[chave] for chave in self.chaves]
+        # Lugar de cada questão na sua faixa, para tirá-la de lá sem procurar
+        self._posicoes: Dict[int, int] = {
+            questao_id: posicao for faixa in self.faixas for posicao, questao_id in enumerate(faixa)
+        }
+        # Sessões sorteiam enquanto outra thread aplica as alterações
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.dificuldades)
+
+    @staticmethod
+    def _chave(dificuldade: float) -> int:
+        return math.floor(dificuldade / LARGURA_FAIXA)
+
+    def aplicar(self, dificuldades: Dict[int, float], versao: int):
+        """
+        Move para a faixa nova só as questões cuja dificuldade mudou; questões que não são do
+        banco são ignoradas. Alterações de uma versão que o índice já tem não fazem nada.
+        """
+        with self._lock:
+            if versao <= self.versao:
+                return
+            for questao_id, dificuldade in dificuldades.items():
+                anterior = self.dificuldades.get(questao_id)
+                if anterior is None:
+                    continue
+                self.dificuldades[questao_id] = dificuldade
+                if self._chave(anterior) != self._chave(dificuldade):
+                    self._remover(questao_id, self._chave(anterior))
+                    self._inserir(questao_id, self._chave(dificuldade))
+            self.versao = versao
+
+    def _remover(self, questao_id: int, chave: int):
+        indice = bisect.bisect_left(self.chaves, chave)
+        faixa = self.faixas[indice]
+        # A última questão da faixa ocupa o lugar da que sai
+        posicao = self._posicoes.pop(questao_id)
+        ultima = faixa.pop()
+        if ultima != questao_id:
+            faixa[posicao] = ultima
+            self._posicoes[ultima] = posicao
+        if not faixa:
+            del self.chaves[indice]
+            del self.faixas[indice]
+
+    def _inserir(self, questao_id: int, chave: int):
+        indice = bisect.bisect_left(self.chaves, chave)
+        if indice == len(self.chaves) or self.chaves[indice] != chave:
+            self.chaves.insert(indice, chave)
+            self.faixas.insert(indice, [])
+        faixa = self.faixas[indice]
+        self._posicoes[questao_id] = len(faixa)
+        faixa.append(questao_id)
+
+    def escolher(self, alvo: float, usadas: Set[int], rng: random.Random) -> Optional[int]:
+        """
+        Sorteia uma questão não usada da faixa mais próxima da dificuldade alvo.
+
+        A faixa sai de uma busca binária; se os sorteios nela só acharem questões já usadas
+        nesta sessão, passa às vizinhas, alternando para cima e para baixo. Só quando nenhuma
+        faixa rende um sorteio livre (sessão que já usou quase tudo) as faixas são varridas.
+        """
+        with self._lock:
+            return self._escolher(alvo, usadas, rng)
+
+    def _escolher(self, alvo: float, usadas: Set[int], rng: random.Random) -> Optional[int]:
+        if not self.chaves:
+            return None
+        chave = self._chave(alvo)
+        centro = bisect.bisect_left(self.chaves, chave)
+        if centro == len(self.chaves) or (centro > 0 and chave - self.chaves[centro - 1] < self.chaves[centro] - chave):
+            centro -= 1
+        vizinhas = [
+            posicao
+            for distancia in range(len(self.chaves))
+            for posicao in ((centro - distancia, centro + distancia) if distancia else (centro,))
+            if 0 <= posicao < len(self.chaves)
+        ]
+
+        for posicao in vizinhas:
+            questao_id = self._sortear_da_faixa(self.faixas[posicao], usadas, rng)
+            if questao_id is not None:
+                return questao_id
+        for posicao in vizinhas:
+            livres = [questao_id for questao_id in self.faixas[posicao] if questao_id not in usadas]
+            if livres:
+                return rng.choice(livres)
+        return None
+
+    @staticmethod
+    def _sortear_da_faixa(faixa: List[int], usadas: Set[int], rng: random.Random) -> Optional[int]:
+        # Poucas tentativas aleatórias; faixa sem folga cede a vez às vizinhas
+        for _ in range(TENTATIVAS_FAIXA):
+            questao_id = faixa[rng.randrange(len(faixa))]
+            if questao_id not in usadas:
+                return questao_id
+        return None
+
+
+def carregar_dificuldades(conn: sqlite3.Connection, banco: str,
+                          banco_eventos: Optional[str]) -> Dict[int, float]:
+    """Dificuldade de todas as questões do banco a partir de question_stats (0 para as sem histórico)"""
+    dificuldades = {linha[0]: 0.0 for linha in conn.execute('SELECT id FROM questoes')}
+    if banco_eventos and os.path.exists(banco_eventos):
+        eventos = sqlite3.connect(banco_eventos)
+        try:
+            linhas = eventos.execute(
+                'SELECT questao_id, tentativas, acertos FROM question_stats WHERE banco = ?', (banco,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # Log ainda sem agregados
+            linhas = []
+        finally:
+            eventos.close()
+        for questao_id, tentativas, acertos in linhas:
+            if questao_id in dificuldades:
+                dificuldades[questao_id] = dificuldade_estimada(tentativas, acertos)
+    return dificuldades
+
+
+# --------------------- Índices compartilhados ---------------------
+_indices: Dict[Tuple[str, Optional[str]], DifficultyIndex] = {}
+_indices_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _uri_leitura(banco_eventos: str) -> str:
+    """URI só de leitura do log, resolvida uma vez como a chave dos índices (não a cada sessão)"""
+    return f'{Path(banco_eventos).resolve().as_uri()}?mode=ro'
+
+
+def _atualizar(indice: DifficultyIndex, banco_eventos: Optional[str], banco: str) -> bool:
+    """
+    Aplica no índice as questões com estatísticas novas desde a versão dele, lidas do log sem
+    criá-lo se ele não existe.
+
+    Returns:
+        False se o log não diz quais questões mudaram e o índice precisa ser remontado
+    """
+    if not banco_eventos or not os.path.exists(banco_eventos):
+        return True
+    eventos = sqlite3.connect(_uri_leitura(banco_eventos), uri=True)
+    try:
+        versao = versao_estatisticas(eventos, banco)
+        if versao <= indice.versao:
+            return True
+        linhas = alteradas_desde(eventos, banco, indice.versao)
+    finally:
+        eventos.close()
+    if linhas is None:
+        return False
+    indice.aplicar({questao_id: dificuldade_estimada(tentativas, acertos)
+                    for questao_id, tentativas, acertos in linhas}, versao)
+    return True
+
+
+def abrir_indice(repositorio: QuestionRepository, banco_eventos: Optional[str]) -> DifficultyIndex:
+    """
+    Índice do banco compartilhado pelo processo: montado uma vez e, a cada sessão, atualizado
+    só com as questões cujas estatísticas mudaram desde então
+    """
+    chave = (repositorio.banco, banco_eventos)
+    with _indices_lock:
+        indice = _indices.get(chave)
+        if indice is None:
+            return _montar(repositorio, banco_eventos)
+    if not _atualizar(indice, banco_eventos, repositorio.banco):
+        with _indices_lock:
+            return _montar(repositorio, banco_eventos)
+    return indice
+
+
+def _montar(repositorio: QuestionRepository, banco_eventos: Optional[str]) -> DifficultyIndex:
+    # Versão lida antes das estatísticas: uma alteração no meio só é reaplicada depois
+    chave = (repositorio.banco, banco_eventos)
+    versao = _versao(banco_eventos, repositorio.banco)
+    with repositorio.conexao() as conn:
+        dificuldades = carregar_dificuldades(conn, repositorio.banco, banco_eventos)
+    indice = _indices[chave] = DifficultyIndex(dificuldades, versao)
+    return indice
+
+
+def _versao(banco_eventos: Optional[str], banco: str) -> int:
+    """Contador de alterações de question_stats do banco, sem criar o log se ele não existe"""
+    if not banco_eventos or not os.path.exists(banco_eventos):
+        return 0
+    eventos = sqlite3.connect(_uri_leitura(banco_eventos), uri=True)
+    try:
+        return versao_estatisticas(eventos, banco)
+    finally:
+        eventos.close()
+
+
+def descartar_indices():
+    """Esquece os índices, para recalculá-los com as estatísticas mais recentes"""
+    with _indices_lock:
+        _indices.clear()
+        _uri_leitura.cache_clear()
@@ -0,0 +1,5 @@
+"""
+Benchmarks do quiz
+Cada módulo roda sozinho (python benchmarks/<modulo>.py) ou pelo pacote (python -m benchmarks.<modulo>);
+suite mede todas as etapas sobre bancos sintéticos e compara com a base gravada localmente
+"""
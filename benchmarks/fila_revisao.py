@@ -0,0 +1,104 @@
+"""
+Tempo de montagem do deck de revisão
+Cria bancos sintéticos com 10^6 registros de revisão (agenda do usuário num banco à parte, por hash)
+e mede a escolha de 50 questões vencidas
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from repositorio import abrir_repositorio, fechar_repositorios  # noqa: E402
+from intercambio import hash_questao  # noqa: E402
+from revisao import SEGUNDOS_POR_DIA, ReviewScheduler, fechar_agendas, montar_deck  # noqa: E402
+
+LIMITE_MS = 100.0
+USUARIO = 'aluno'
+
+
+def criar_banco(caminho: str, agenda: str, registros: int, rng: random.Random, agora: float):
+    """Banco com `registros` questões, todas já revisadas pelo usuário, metade vencida"""
+    conn = sqlite3.connect(caminho)
+    conn.execute('''
+        CREATE TABLE questoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, numero TEXT, enunciado TEXT,
+            alternativa_a TEXT, alternativa_b TEXT, alternativa_c TEXT, alternativa_d TEXT,
+            fonte TEXT, gabarito TEXT, hash TEXT
+        )
+    ''')
+    questoes = (
+        (str(i), f"Enunciado {i}", "a", "b", "c", "d", "abcd"[i % 4], f"ICA 100-37, Art. {i % 900}")
+        for i in range(1, registros + 1)
+    )
+    conn.executemany(
+        '''INSERT INTO questoes (numero, enunciado, alternativa_a, alternativa_b, alternativa_c,
+                                alternativa_d, gabarito, fonte, hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        ((*questao, hash_questao(questao)) for questao in questoes)
+    )
+    conn.execute('CREATE INDEX idx_questoes_hash ON questoes(hash)')
+    conn.commit()
+
+    banco = os.path.basename(caminho)
+    revisoes = sqlite3.connect(agenda)
+    revisoes.execute(ReviewScheduler.SQL_CRIAR)
+    revisoes.executemany(
+        'INSERT INTO revisoes VALUES (?, ?, ?, ?, ?, ?)',
+        ((banco, hash_, 2, 6.0, 2.5, agora + rng.uniform(-30, 30) * SEGUNDOS_POR_DIA)
+         for (hash_,) in conn.execute('SELECT hash FROM questoes'))
+    )
+    revisoes.execute(ReviewScheduler.SQL_INDICE)
+    revisoes.commit()
+    revisoes.close()
+    conn.close()
+
+
+def executar(registros: int, quantidade: int, repeticoes: int) -> bool:
+    rng = random.Random(42)
+    agora = time.time()
+    tempos: List[float] = []
+
+    with tempfile.TemporaryDirectory() as pasta:
+        especificas = os.path.join(pasta, 'especificas.db')
+        gerais = os.path.join(pasta, 'gerais.db')
+        agenda = os.path.join(pasta, 'revisoes.db')
+        inicio = time.perf_counter()
+        criar_banco(especificas, agenda, int(registros * 0.6), rng, agora)
+        criar_banco(gerais, agenda, registros - int(registros * 0.6), rng, agora)
+        print(f"{registros} registros de revisão criados em {time.perf_counter() - inicio:.1f}s")
+
+        agendadores = (
+            ReviewScheduler(abrir_repositorio(especificas), USUARIO, banco=agenda),
+            ReviewScheduler(abrir_repositorio(gerais), USUARIO, banco=agenda),
+        )
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            deck = montar_deck(quantidade, *agendadores, agora=agora, rng=rng)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+            assert len(deck) == quantidade
+        fechar_repositorios()
+        fechar_agendas()
+
+    tempos.sort()
+    print(f"deck de {quantidade}: mediana {tempos[len(tempos) // 2]:.2f} ms  máx {tempos[-1]:.2f} ms")
+    return tempos[-1] < LIMITE_MS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a montagem do deck de revisão espaçada.")
+    parser.add_argument('--registros', type=int, default=1_000_000)
+    parser.add_argument('--quantidade', type=int, default=50)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.registros, args.quantidade, args.repeticoes) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Gerador de bancos sintéticos
+Arquivos no formato de TGE APP 2025 GERAIS.txt, de 10^3 a 10^6 questões, sempre iguais para a mesma seed
+"""
+
+import argparse
+import random
+from typing import Iterator, Tuple
+
+DOCUMENTOS = ('ICA 100-37', 'ICA 100-12', 'MCA 100-16', 'ICA 100-11', 'CIRCEA 100-56')
+PALAVRAS = (
+    'aeronave', 'órgão', 'ATS', 'controle', 'tráfego', 'aéreo', 'separação', 'espera', 'piloto',
+    'autorização', 'nível', 'voo', 'IFR', 'VFR', 'aproximação', 'aeródromo', 'procedimento',
+    'informação', 'serviço', 'mínimos', 'altitude', 'pouso', 'decolagem', 'rota', 'setor',
+)
+QUESTOES_POR_SECAO = 50
+
+
+def _frase(rng: random.Random, minimo: int, maximo: int) -> str:
+    palavras = [rng.choice(PALAVRAS) for _ in range(rng.randint(minimo, maximo))]
+    return ' '.join(palavras).capitalize() + '.'
+
+
+def gerar_questoes(quantidade: int, seed: int = 0,
+                   questoes_por_secao: int = QUESTOES_POR_SECAO) -> Iterator[Tuple[str, ...]]:
+    """
+    Questões no formato do QuestaoParser: (numero, enunciado, a, b, c, d, gabarito, fonte).
+    Cada bloco de `questoes_por_secao` vem de um documento; algumas têm o enunciado em duas linhas.
+    """
+    rng = random.Random(seed)
+    for i in range(quantidade):
+        documento = DOCUMENTOS[(i // questoes_por_secao) % len(DOCUMENTOS)]
+        enunciado = _frase(rng, 12, 40)
+        if rng.random() < 0.2:
+            enunciado += '\n' + _frase(rng, 4, 12)
+        alternativas = tuple(_frase(rng, 5, 18) for _ in 'abcd')
+        yield (f"{i + 1:02d}", enunciado, *alternativas, rng.choice('abcd'),
+               f"{documento}, Art. {rng.randint(1, 900)}.")
+
+
+def gerar_txt(caminho: str, quantidade: int, seed: int = 0,
+              questoes_por_secao: int = QUESTOES_POR_SECAO) -> str:
+    """Escreve as questões em seções de documento, alternando "Gabarito: x" e "Resposta: X" como no original"""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        for i, (numero, enunciado, a, b, c, d, gabarito, fonte) in enumerate(
+                gerar_questoes(quantidade, seed, questoes_por_secao)):
+            if i % questoes_por_secao == 0:
+                documento = fonte.split(',', 1)[0]
+                arquivo.write(f"==========\n{documento}\n==========\n\n")
+            linha_gabarito = f"Gabarito: {gabarito}" if i % 2 == 0 else f"Resposta: {gabarito.upper()}"
+            arquivo.write(
+                f"{numero}\n{enunciado}\na) {a}\nb) {b}\nc) {c}\nd) {d}\n{linha_gabarito}\n{fonte}\n\n"
+            )
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um TXT sintético no formato do banco de questões gerais.")
+    parser.add_argument('destino')
+    parser.add_argument('--quantidade', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    gerar_txt(args.destino, args.quantidade, args.seed)
+
+
+if __name__ == "__main__":
+    main()
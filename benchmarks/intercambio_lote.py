@@ -0,0 +1,71 @@
+"""
+Importação e exportação em lote (JSONL e CSV)
+Gera 10^6 questões sintéticas, importa, exporta nos dois formatos e reimporta o CSV num banco novo
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.gerador import gerar_questoes  # noqa: E402
+from intercambio import escrever_jsonl, exportar, importar  # noqa: E402
+
+# Vazão mínima de cada etapa; o importador de TXT faz ~7 mil questões/s na mesma máquina
+MINIMO_POR_S = 15_000
+
+
+def conteudo(banco: str):
+    conn = sqlite3.connect(banco)
+    try:
+        return conn.execute('''
+            SELECT COUNT(*), TOTAL(LENGTH(enunciado) + LENGTH(alternativa_a) + LENGTH(alternativa_d)),
+                   COUNT(DISTINCT hash)
+            FROM questoes
+        ''').fetchone()
+    finally:
+        conn.close()
+
+
+def executar(quantidade: int) -> bool:
+    ok = True
+    with tempfile.TemporaryDirectory() as pasta:
+        origem = os.path.join(pasta, 'origem.jsonl')
+        escrever_jsonl(gerar_questoes(quantidade, seed=1), origem)
+        print(f"{quantidade} questões, {os.path.getsize(origem) / 2**20:.0f} MB em JSONL")
+
+        etapas = []
+        banco = os.path.join(pasta, 'questoes.db')
+        copia = os.path.join(pasta, 'copia.db')
+        for nome, funcao in (
+            ('importar JSONL', lambda: importar(origem, banco)),
+            ('exportar JSONL', lambda: exportar(banco, os.path.join(pasta, 'saida.jsonl'))),
+            ('exportar CSV', lambda: exportar(banco, os.path.join(pasta, 'saida.csv'))),
+            ('importar CSV', lambda: importar(os.path.join(pasta, 'saida.csv'), copia)),
+        ):
+            inicio = time.perf_counter()
+            funcao()
+            duracao = time.perf_counter() - inicio
+            etapas.append(duracao)
+            print(f"  {nome:<15}{duracao:8.2f} s  ({quantidade / duracao:,.0f} questões/s)")
+
+        original, reimportado = conteudo(banco), conteudo(copia)
+        print(f"  banco original {original}, reimportado do CSV {reimportado}")
+        ok = original == reimportado and original[0] == quantidade and quantidade / max(etapas) >= MINIMO_POR_S
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a importação e a exportação em lote de JSONL e CSV.")
+    parser.add_argument('--quantidade', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.quantidade) else 1)
+
+
+if __name__ == "__main__":
+    main()
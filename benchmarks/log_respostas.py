@@ -0,0 +1,75 @@
+"""
+Custo do log de respostas no clique
+Compara o tempo de QuizSession.responder com e sem o AnswerLog e confere que tudo foi gravado
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eventos import AnswerLog  # noqa: E402
+from repositorio import Questao  # noqa: E402
+from sessao import QuizSession  # noqa: E402
+
+# Diferença máxima aceita no p99 de um clique (bem abaixo de um quadro de 16 ms)
+LIMITE_MS = 1.0
+
+
+def questoes_sinteticas(quantidade: int) -> List[Questao]:
+    return [
+        Questao(i, str(i), f"Enunciado {i}", "a", "b", "c", "d", "ICA 100-37", "abcd"[i % 4])
+        for i in range(quantidade)
+    ]
+
+
+def medir_cliques(questoes: List[Questao], registro: Optional[AnswerLog]) -> List[float]:
+    sessao = QuizSession(questoes, bancos=['sintetico.db'] * len(questoes), registro=registro)
+    tempos = []
+    while not sessao.finalizada:
+        sessao.questao_atual()
+        inicio = time.perf_counter()
+        sessao.responder('a')
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return tempos
+
+
+def percentil(tempos: List[float], p: float) -> float:
+    return tempos[min(len(tempos) - 1, int(len(tempos) * p))]
+
+
+def executar(respostas: int) -> bool:
+    questoes = questoes_sinteticas(respostas)
+    sem_log = medir_cliques(questoes, None)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = os.path.join(pasta, 'respostas.db')
+        registro = AnswerLog(banco)
+        com_log = medir_cliques(questoes, registro)
+        registro.fechar()
+        gravados = sqlite3.connect(banco).execute('SELECT COUNT(*) FROM eventos_resposta').fetchone()[0]
+
+    for nome, tempos in (('sem log', sem_log), ('com log', com_log)):
+        print(f"{nome}: p50 {percentil(tempos, 0.5) * 1000:.1f} µs  p99 {percentil(tempos, 0.99) * 1000:.1f} µs")
+    print(f"eventos gravados: {gravados} de {respostas}")
+
+    diferenca = percentil(com_log, 0.99) - percentil(sem_log, 0.99)
+    return gravados == respostas and diferenca < LIMITE_MS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o custo do log de respostas por clique.")
+    parser.add_argument('--respostas', type=int, default=100_000)
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.respostas) else 1)
+
+
+if __name__ == "__main__":
+    main()
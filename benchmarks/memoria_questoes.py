@@ -0,0 +1,93 @@
+"""
+Memória de um banco carregado inteiro
+Compara as linhas completas (todas) com as questões leves (todas_leves) num banco sintético
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from repositorio import abrir_repositorio, fechar_repositorios  # noqa: E402
+from sessao import QuizSession  # noqa: E402
+
+# A versão leve precisa ocupar ao menos 10x menos
+REDUCAO_MINIMA = 10.0
+
+
+def criar_banco(caminho: str, quantidade: int, rng: random.Random):
+    """Textos com o tamanho típico das questões da ICA: enunciado de ~250 caracteres, alternativas de ~90"""
+    palavras = "aeronave órgão ATS controle tráfego separação espera piloto autorização nível voo".split()
+
+    def texto(tamanho: int) -> str:
+        return ' '.join(rng.choice(palavras) for _ in range(tamanho // 8))
+
+    conn = sqlite3.connect(caminho)
+    conn.execute('''
+        CREATE TABLE questoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, numero TEXT, enunciado TEXT,
+            alternativa_a TEXT, alternativa_b TEXT, alternativa_c TEXT, alternativa_d TEXT,
+            fonte TEXT, gabarito TEXT
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO questoes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        ((i, f"{i:02d}", texto(250), texto(90), texto(90), texto(90), texto(90),
+          f"ICA 100-{i % 40}, Art. {i % 900}.", "abcd"[i % 4])
+         for i in range(1, quantidade + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def medir(funcao):
+    tracemalloc.start()
+    resultado = funcao()
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, atual
+
+
+def executar(quantidade: int) -> bool:
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = os.path.join(pasta, 'questoes.db')
+        criar_banco(banco, quantidade, rng)
+        repositorio = abrir_repositorio(banco)
+
+        completas, memoria_completas = medir(repositorio.todas)
+        del completas
+        leves, memoria_leves = medir(repositorio.todas_leves)
+
+        # Uma sessão sobre as questões leves busca os textos só das que aparecem
+        sessao = QuizSession(rng.sample(leves, 50))
+        while not sessao.finalizada:
+            questao = sessao.questao_atual()
+            assert questao.enunciado
+            sessao.responder(questao.gabarito)
+        carregadas = sum(leve.carregada for leve in leves)
+        fechar_repositorios()
+
+    reducao = memoria_completas / memoria_leves
+    print(f"{quantidade} questões")
+    print(f"  linhas completas: {memoria_completas / 2**20:7.1f} MB ({memoria_completas / quantidade:.0f} B/questão)")
+    print(f"  questões leves:   {memoria_leves / 2**20:7.1f} MB ({memoria_leves / quantidade:.0f} B/questão)")
+    print(f"  redução: {reducao:.1f}x; textos carregados após uma sessão de 50: {carregadas}")
+    return reducao >= REDUCAO_MINIMA
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara a memória das questões completas e leves.")
+    parser.add_argument('--quantidade', type=int, default=100_000)
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.quantidade) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Crescimento de memória em sessões seguidas
+Roda N sessões no motor (sorteio, revisão e adaptativo alternados) ou nas telas do quizAPPv2 e do
+quizTGEv2, compara snapshots do tracemalloc por subsistema e, nas telas, conta widgets e comandos Tcl;
+falha quando algum subsistema cresce além do orçamento por sessão
+
+    python -m benchmarks.memoria_sessoes --sessoes 200
+    python -m benchmarks.memoria_sessoes --alvo quizAPPv2 quizTGEv2 --sessoes 50   # precisa de display
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from eventos import AnswerLog, BANCO_EVENTOS, fechar_logs  # noqa: E402
+from modos import MODO_ADAPTATIVO, MODO_REVISAO, MODO_SORTEIO  # noqa: E402
+from repositorio import fechar_repositorios  # noqa: E402
+from revisao import fechar_agendas  # noqa: E402
+from sessao import QuizSession  # noqa: E402
+from adaptativo import descartar_indices  # noqa: E402
+
+ALVOS = ('motor', 'quizAPPv2', 'quizTGEv2')
+MODOS = (MODO_SORTEIO, MODO_REVISAO, MODO_ADAPTATIVO)
+BANCOS = ('questoesEspecificas.db', 'questoesGerais.db')
+USUARIO = 'memoria'
+QUESTOES_POR_SESSAO = 20
+
+# Sessões antes do primeiro snapshot: caches, statements e imports tardios se estabilizam nelas
+AQUECIMENTO = 10
+
+# Crescimento aceito por sessão, depois do aquecimento
+ORCAMENTO_BYTES = 512
+ORCAMENTO_TK = 0.05   # widgets ou comandos Tcl: nenhum deve sobrar a cada sessão
+
+# Arquivo de origem da alocação -> subsistema
+SUBSISTEMAS = {
+    'repositorio.py': 'repositorio',
+    'sessao.py': 'sessao',
+    'eventos.py': 'eventos',
+    'revisao.py': 'revisao',
+    'adaptativo.py': 'adaptativo',
+    'amostragem.py': 'repositorio',
+    'busca.py': 'repositorio',
+    'fontes.py': 'repositorio',
+    'quizAPPv2.py': 'telas',
+    'quizTGEv2.py': 'telas',
+    'telas.py': 'telas',
+    'layout_texto.py': 'telas',
+    'precarga.py': 'telas',
+    'rastreio.py': 'rastreio',
+}
+
+
+def subsistema(arquivo: str) -> str:
+    nome = os.path.basename(arquivo)
+    if nome in SUBSISTEMAS:
+        return SUBSISTEMAS[nome]
+    partes = Path(arquivo).parts
+    for pacote in ('tkinter', 'sqlite3'):
+        if pacote in partes:
+            return pacote
+    return 'outros'
+
+
+def por_subsistema(snapshot: tracemalloc.Snapshot) -> Dict[str, int]:
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    totais: Dict[str, int] = {}
+    for estatistica in snapshot.statistics('filename'):
+        nome = subsistema(estatistica.traceback[0].filename)
+        totais[nome] = totais.get(nome, 0) + estatistica.size
+    return totais
+
+
+# --------------------- Motor ---------------------
+class MotorDriver:
+    """Sessões só com o motor: sorteio, revisão e adaptativo alternados, com o log de respostas ligado"""
+
+    def __init__(self):
+        self.rng = random.Random(42)
+        # Lotes curtos: descarregar() ao fim de cada sessão não espera o intervalo de 0,5 s do log
+        self.registro = AnswerLog(BANCO_EVENTOS, intervalo=0.01)
+
+    def sessao(self, numero: int):
+        modo = MODOS[numero % len(MODOS)]
+        registro = self.registro
+        if modo == MODO_REVISAO:
+            sessao = QuizSession.revisao(QUESTOES_POR_SESSAO, USUARIO, *BANCOS, seed=numero, registro=registro)
+        elif modo == MODO_ADAPTATIVO:
+            sessao = QuizSession.adaptativa(QUESTOES_POR_SESSAO, *BANCOS, seed=numero, registro=registro)
+        else:
+            sessao = QuizSession.iniciar(QUESTOES_POR_SESSAO, *BANCOS, seed=numero, registro=registro)
+        while sessao.questao_atual() is not None:
+            sessao.responder(self.rng.choice('abcd'))
+        # A fila do log esvaziada não conta como crescimento
+        registro.descarregar()
+
+    def contadores(self) -> Dict[str, int]:
+        return {}
+
+    def fechar(self):
+        self.registro.fechar()
+
+
+# --------------------- Telas ---------------------
+class TkDriver:
+    """Sessões nas telas de um front-end, numa única janela retirada da tela"""
+
+    def __init__(self, nome: str):
+        import importlib
+        import tkinter as tk
+
+        self.nome = nome
+        self.rng = random.Random(42)
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.modulo = importlib.import_module(nome)
+        self.gerenciador = self.modulo.criar_aplicacao(self.root)
+        self.root.withdraw()
+        self.quiz = self.gerenciador.tela('quiz')
+
+    def bombear(self):
+        self.root.update_idletasks()
+        self.root.update()
+
+    def sessao(self, numero: int):
+        modo = MODOS[numero % len(MODOS)]
+        self.gerenciador.mostrar('quiz')
+        self.quiz.iniciar(QUESTOES_POR_SESSAO, seed=numero, modo=modo)
+        self.bombear()
+
+        if self.nome == 'quizAPPv2':
+            # O popup de resultado faz parte do caminho de resposta que está sendo medido
+            while self.quiz.quiz_ativo:
+                self.quiz.responder(self.rng.choice('abcd'))
+                self.bombear()
+        else:
+            # responder abre um messagebox modal; a avaliação e o desenho seguem o mesmo caminho sem ele
+            sessao = self.quiz.sessao
+            while not sessao.finalizada:
+                sessao.responder(self.rng.choice('abcd'))
+                if not sessao.finalizada:
+                    self.quiz.mostrar_questao()
+                self.bombear()
+            self.gerenciador.mostrar('inicio')
+        self.quiz.sessao.registro.descarregar()
+        self.bombear()
+
+    def contadores(self) -> Dict[str, int]:
+        def widgets(caminho: str) -> int:
+            filhos = self.root.tk.splitlist(self.root.tk.call('winfo', 'children', caminho))
+            return len(filhos) + sum(widgets(filho) for filho in filhos)
+
+        return {
+            'tk.widgets': widgets('.'),
+            'tk.comandos': len(self.root.tk.splitlist(self.root.tk.call('info', 'commands'))),
+            'tk.after': len(self.root.tk.splitlist(self.root.tk.call('after', 'info'))),
+        }
+
+    def fechar(self):
+        self.root.destroy()
+
+
+def medir(driver, sessoes: int) -> Dict[str, Dict[str, float]]:
+    """Crescimento por sessão entre o fim do aquecimento e o fim das N sessões"""
+    for numero in range(AQUECIMENTO):
+        driver.sessao(numero)
+    gc.collect()
+    antes = por_subsistema(tracemalloc.take_snapshot())
+    contadores_antes = driver.contadores()
+
+    for numero in range(AQUECIMENTO, AQUECIMENTO + sessoes):
+        driver.sessao(numero)
+    gc.collect()
+    depois = por_subsistema(tracemalloc.take_snapshot())
+    contadores_depois = driver.contadores()
+
+    crescimento = {}
+    for nome in sorted(set(antes) | set(depois)):
+        delta = depois.get(nome, 0) - antes.get(nome, 0)
+        crescimento[nome] = {'antes': antes.get(nome, 0), 'depois': depois.get(nome, 0),
+                             'por_sessao': delta / sessoes}
+    for nome in contadores_antes:
+        delta = contadores_depois[nome] - contadores_antes[nome]
+        crescimento[nome] = {'antes': contadores_antes[nome], 'depois': contadores_depois[nome],
+                             'por_sessao': delta / sessoes}
+    return crescimento
+
+
+def executar(alvos: List[str], sessoes: int, orcamento: int, origem: str) -> bool:
+    ok = True
+    with tempfile.TemporaryDirectory() as pasta:
+        # Cópias dos bancos: as sessões gravam respostas, agenda e estatísticas
+        for banco in BANCOS:
+            shutil.copyfile(os.path.join(origem, banco), os.path.join(pasta, banco))
+        anterior = os.getcwd()
+        os.chdir(pasta)
+        tracemalloc.start()
+        try:
+            for alvo in alvos:
+                if alvo == 'motor':
+                    driver = MotorDriver()
+                else:
+                    import tkinter as tk
+                    try:
+                        driver = TkDriver(alvo)
+                    except tk.TclError as e:
+                        print(f"{alvo}: sem display ({e}); ignorado")
+                        continue
+                try:
+                    crescimento = medir(driver, sessoes)
+                finally:
+                    driver.fechar()
+                ok = imprimir(alvo, sessoes, crescimento, orcamento) and ok
+        finally:
+            tracemalloc.stop()
+            fechar_logs()
+            fechar_repositorios()
+            fechar_agendas()
+            descartar_indices()
+            os.chdir(anterior)
+    return ok
+
+
+def imprimir(alvo: str, sessoes: int, crescimento: Dict[str, Dict[str, float]], orcamento: int) -> bool:
+    print(f"{alvo}: {sessoes} sessões de {QUESTOES_POR_SESSAO} questões após {AQUECIMENTO} de aquecimento")
+    ok = True
+    for nome, valores in crescimento.items():
+        limite = ORCAMENTO_TK if nome.startswith('tk.') else orcamento
+        estourou = valores['por_sessao'] > limite
+        ok = ok and not estourou
+        unidade = '' if nome.startswith('tk.') else ' B'
+        print(f"  {nome:<13}{valores['antes']:>12.0f}{unidade:2} -> {valores['depois']:>12.0f}{unidade:2}"
+              f"  {valores['por_sessao']:>+10.2f}{unidade}/sessão" + ("  ESTOUROU" if estourou else ""))
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o crescimento de memória em sessões seguidas do quiz.")
+    parser.add_argument('--alvo', nargs='+', default=['motor'], choices=ALVOS)
+    parser.add_argument('--sessoes', type=int, default=100)
+    parser.add_argument('--orcamento', type=int, default=ORCAMENTO_BYTES,
+                        help="Bytes aceitos por sessão em cada subsistema")
+    parser.add_argument('--pasta', default=str(RAIZ / 'Dados'), help="Pasta com os bancos .db")
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.alvo, args.sessoes, args.orcamento, args.pasta) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Abertura a frio do pacote binário de questões
+Compila um banco sintético de 10^6 questões, mede abrir o pacote, sortear um quiz e a memória residente
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pacote import QuestionPack, comparar, exportar  # noqa: E402
+
+LIMITE_ABERTURA_MS = 5.0
+LIMITE_MEMORIA_MB = 1.0
+
+
+def memoria_residente_mb(campo: str = 'VmRSS') -> Optional[float]:
+    """Memória residente do processo (VmRSS, ou RssAnon sem as páginas do arquivo), quando há /proc"""
+    try:
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith(campo + ':'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def criar_banco(caminho: str, quantidade: int):
+    conn = sqlite3.connect(caminho)
+    conn.execute('''
+        CREATE TABLE questoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, numero TEXT, enunciado TEXT,
+            alternativa_a TEXT, alternativa_b TEXT, alternativa_c TEXT, alternativa_d TEXT,
+            fonte TEXT, gabarito TEXT
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO questoes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        ((i, f"{i:02d}", f"Enunciado da questão {i} sobre separação e espera " * 3,
+          f"Alternativa A {i}", f"Alternativa B {i}", f"Alternativa C {i}", f"Alternativa D {i}",
+          f"ICA 100-37, Art. {i % 900}", "abcd"[i % 4])
+         for i in range(1, quantidade + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def executar(quantidade: int, sorteio: int, repeticoes: int) -> bool:
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = os.path.join(pasta, 'questoes.db')
+        caminho_pacote = os.path.join(pasta, 'questoes.qpak')
+
+        inicio = time.perf_counter()
+        criar_banco(banco, quantidade)
+        print(f"banco com {quantidade} questões criado em {time.perf_counter() - inicio:.1f}s")
+
+        inicio = time.perf_counter()
+        exportar(banco, caminho_pacote)
+        print(f"pacote de {os.path.getsize(caminho_pacote) / 2**20:.0f} MB exportado em "
+              f"{time.perf_counter() - inicio:.1f}s")
+        if quantidade <= 100_000:
+            print(f"ida e volta sem perdas: {comparar(banco, caminho_pacote)}")
+
+        aberturas, sorteios = [], []
+        memoria_antes = memoria_residente_mb()
+        anonima_antes = memoria_residente_mb('RssAnon')
+        pacotes = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            pacote = QuestionPack(caminho_pacote)
+            aberturas.append((time.perf_counter() - inicio) * 1000)
+            inicio = time.perf_counter()
+            questoes = pacote.sortear(sorteio, rng)
+            sorteios.append((time.perf_counter() - inicio) * 1000)
+            assert len(questoes) == sorteio
+            pacotes.append(pacote)
+        memoria_depois = memoria_residente_mb()
+        anonima_depois = memoria_residente_mb('RssAnon')
+        for pacote in pacotes:
+            pacote.fechar()
+
+    aberturas.sort()
+    sorteios.sort()
+    print(f"abrir: mediana {aberturas[len(aberturas) // 2]:.3f} ms  máx {aberturas[-1]:.3f} ms")
+    print(f"sortear {sorteio}: mediana {sorteios[len(sorteios) // 2]:.3f} ms  máx {sorteios[-1]:.3f} ms")
+    ok = aberturas[len(aberturas) // 2] < LIMITE_ABERTURA_MS
+    if memoria_antes is not None:
+        acrescimo = (memoria_depois - memoria_antes) / repeticoes
+        print(f"memória residente por pacote aberto: {acrescimo:.2f} MB")
+        if anonima_antes is not None:
+            # Páginas do arquivo mapeado são cache do sistema (e kernels com folios grandes mapeiam
+            # vários KB por página tocada); o custo próprio do processo é a memória anônima
+            acrescimo = (anonima_depois - anonima_antes) / repeticoes
+            print(f"  dos quais fora do arquivo mapeado: {acrescimo:.2f} MB")
+        ok = ok and acrescimo < LIMITE_MEMORIA_MB
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a abertura do pacote binário de questões.")
+    parser.add_argument('--quantidade', type=int, default=1_000_000)
+    parser.add_argument('--sorteio', type=int, default=50)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.quantidade, args.sorteio, args.repeticoes) else 1)
+
+
+if __name__ == "__main__":
+    main()
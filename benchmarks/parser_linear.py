@@ -0,0 +1,104 @@
+"""
+Micro-benchmark do parser de TXT (leitor_txt)
+Gera arquivos sintéticos de 10^4 a 10^6 questões e verifica se o tempo por questão fica constante
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from leitor_txt import ler_arquivo  # noqa: E402
+
+# Tolerância entre o maior e o menor tempo por questão para considerar a escala linear
+FATOR_LINEAR = 2.0
+
+
+def gerar_arquivo(caminho: str, quantidade: int, questoes_por_secao: int = 50):
+    """Escreve um arquivo no formato de TGE APP 2025 ESPECÍFICAS.txt"""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        for i in range(quantidade):
+            if i % questoes_por_secao == 0:
+                arquivo.write(f"==========\nSEÇÃO {i // questoes_por_secao}\n==========\n\n")
+            arquivo.write(
+                f"{i + 1:02d}\n"
+                f"Enunciado da questão {i + 1}, primeira linha do texto.\n"
+                f"Segunda linha do enunciado com o trecho da ICA.\n"
+                f"a) Alternativa A da questão {i + 1}.\n"
+                f"b) Alternativa B.\n"
+                f"c) Alternativa C.\n"
+                f"d) Alternativa D.\n"
+                f"ICA 100-37, Art. {i % 900 + 1}\n"
+                f"Gabarito: “{'abcd'[i % 4]}”.\n\n"
+            )
+
+
+def gerar_patologico(caminho: str, quantidade: int):
+    """Marcadores === desbalanceados e seções enormes, que faziam o regex antigo retroceder"""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write("===\n")
+        for i in range(quantidade):
+            arquivo.write(f"linha {i} com ==== no meio e = soltos ====== sem fechar\n")
+            if i % 997 == 0:
+                arquivo.write("=====\n")
+
+
+def medir(funcao: Callable[[], int]) -> float:
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def contar_especificas(caminho: str) -> int:
+    return sum(1 for _ in ler_arquivo(caminho))
+
+
+def contar_secoes(caminho: str) -> int:
+    # Sem questões no arquivo: só a classificação das linhas e o descarte das seções
+    erros = []
+    return sum(1 for _ in ler_arquivo(caminho, erros)) + len(erros)
+
+
+def executar(tamanhos: List[int]) -> bool:
+    resultados: Dict[str, List[float]] = {'parse': [], 'patologico': []}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in tamanhos:
+            caminho = os.path.join(pasta, f"sintetico_{tamanho}.txt")
+            gerar_arquivo(caminho, tamanho)
+            duracao = medir(lambda: contar_especificas(caminho))
+            resultados['parse'].append(duracao / tamanho)
+            print(f"parse       {tamanho:>9} questões: {duracao:8.3f}s  {duracao / tamanho * 1e6:7.2f} µs/questão")
+            os.remove(caminho)
+
+            caminho = os.path.join(pasta, f"patologico_{tamanho}.txt")
+            gerar_patologico(caminho, tamanho * 10)
+            duracao = medir(lambda: contar_secoes(caminho))
+            resultados['patologico'].append(duracao / tamanho)
+            print(f"patológico  {tamanho * 10:>9} linhas:  {duracao:8.3f}s  {duracao / tamanho * 1e6:7.2f} µs/10 linhas")
+            os.remove(caminho)
+
+    linear = True
+    for nome, por_item in resultados.items():
+        fator = max(por_item) / min(por_item)
+        situacao = "linear" if fator <= FATOR_LINEAR else "NÃO LINEAR"
+        linear = linear and fator <= FATOR_LINEAR
+        print(f"{nome}: variação do custo por item = {fator:.2f}x ({situacao})")
+    return linear
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica a escala linear dos parsers de TXT.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="Quantidades de questões dos arquivos sintéticos")
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.tamanhos) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Provas por cotas de documento
+Importa bancos sintéticos de 10^4 a 10^6 questões, mede a montagem do índice de fontes e o sorteio de uma
+prova de 50 questões; o tempo da prova deve acompanhar o tamanho dela, não o do banco
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.gerador import DOCUMENTOS, gerar_questoes  # noqa: E402
+from fontes import indexar_fontes  # noqa: E402
+from intercambio import escrever_jsonl, importar  # noqa: E402
+from repositorio import abrir_repositorio, fechar_repositorios, montar_prova  # noqa: E402
+
+# Prova de 50 questões repartida entre os documentos do gerador
+COTAS = {documento: 50 // len(DOCUMENTOS) for documento in DOCUMENTOS}
+REPETICOES = 20
+
+# Variação aceita no tempo da prova entre o menor e o maior banco
+FATOR_CONSTANTE = 3.0
+
+
+def medir_prova(banco: str, repeticoes: int) -> float:
+    """Melhor tempo de montar_prova, com o repositório e o índice já abertos"""
+    abrir_repositorio(banco).documentos()
+    melhor = float('inf')
+    for seed in range(repeticoes):
+        inicio = time.perf_counter()
+        prova = montar_prova(COTAS, (banco,), seed)
+        melhor = min(melhor, time.perf_counter() - inicio)
+        assert len(prova) == sum(COTAS.values()), len(prova)
+    return melhor
+
+
+def executar(tamanhos: List[int], repeticoes: int) -> bool:
+    por_tamanho: Dict[int, float] = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in tamanhos:
+            origem = os.path.join(pasta, f'origem_{tamanho}.jsonl')
+            banco = os.path.join(pasta, f'questoes_{tamanho}.db')
+            escrever_jsonl(gerar_questoes(tamanho, seed=1), origem)
+            relatorio = importar(origem, banco)
+            os.remove(origem)
+
+            # O importador já montou o índice; aqui só a remontagem, para medir o custo dela
+            conn = sqlite3.connect(banco)
+            inicio = time.perf_counter()
+            documentos = indexar_fontes(conn)
+            conn.commit()
+            indexacao = time.perf_counter() - inicio
+            conn.close()
+
+            por_tamanho[tamanho] = medir_prova(banco, repeticoes)
+            fechar_repositorios()
+            print(f"{tamanho:>9} questões: importação {relatorio.segundos:7.2f}s, índice de fontes "
+                  f"{indexacao:6.2f}s ({len(documentos)} documentos), prova de {sum(COTAS.values())} "
+                  f"{por_tamanho[tamanho] * 1000:7.2f} ms")
+            os.remove(banco)
+
+    fator = max(por_tamanho.values()) / min(por_tamanho.values())
+    constante = fator <= FATOR_CONSTANTE
+    print(f"variação do tempo da prova = {fator:.2f}x ({'constante' if constante else 'CRESCE COM O BANCO'})")
+    return constante
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o índice de fontes e o sorteio de provas por cotas.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES)
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.tamanhos, args.repeticoes) else 1)
+
+
+if __name__ == "__main__":
+    main()
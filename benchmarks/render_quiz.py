@@ -0,0 +1,64 @@
+"""
+Tempo de troca de questão no quizTGEv2
+Mede mostrar_questao em sequência e compara o p95 com o orçamento de um quadro (16 ms)
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+from typing import List
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import quizTGEv2  # noqa: E402
+
+ORCAMENTO_MS = 16.0
+
+
+def executar(quantidade: int, rodadas: int) -> bool:
+    root = tk.Tk()
+    gerenciador = quizTGEv2.criar_aplicacao(root)
+    quiz = gerenciador.tela('quiz')
+    gerenciador.mostrar('quiz')
+
+    tempos: List[float] = []
+    for rodada in range(rodadas):
+        quiz.iniciar(quantidade, seed=rodada)
+        root.update()
+        while quiz.sessao.indice + 1 < quiz.sessao.total:
+            # Deixa o Tk ocioso, como entre dois cliques do aluno, para o pré-layout rodar
+            root.update_idletasks()
+            root.update()
+            quiz.sessao.responder('a')
+            inicio = time.perf_counter()
+            quiz.mostrar_questao()
+            root.update_idletasks()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+
+    root.destroy()
+
+    tempos.sort()
+    p95 = tempos[int(len(tempos) * 0.95) - 1]
+    print(f"{len(tempos)} trocas: mediana {statistics.median(tempos):.2f} ms  p95 {p95:.2f} ms  "
+          f"máx {tempos[-1]:.2f} ms")
+    return p95 <= ORCAMENTO_MS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de troca de questão no quizTGEv2.")
+    parser.add_argument('--quantidade', type=int, default=50, choices=[10, 20, 30, 40, 50])
+    parser.add_argument('--rodadas', type=int, default=10)
+    parser.add_argument('--pasta', default=str(RAIZ / 'Dados'), help="Pasta com os bancos .db")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.pasta)
+    sys.exit(0 if executar(args.quantidade, args.rodadas) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Tempo de escolha da próxima questão no modo adaptativo
+Monta índices de dificuldade sintéticos de 10^3 a 10^6 questões e simula alunos respondendo
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from adaptativo import (ALVO_ACERTO, DifficultyIndex, atualizar_habilidade,  # noqa: E402
+                        probabilidade_acerto)
+
+LIMITE_US = 200.0
+
+
+def executar(tamanhos: List[int], respostas: int, alunos: int) -> bool:
+    rng = random.Random(42)
+    logit_alvo = math.log(ALVO_ACERTO / (1.0 - ALVO_ACERTO))
+    ok = True
+
+    for tamanho in tamanhos:
+        dificuldades = {i: rng.gauss(0.0, 1.5) for i in range(1, tamanho + 1)}
+        inicio = time.perf_counter()
+        indice = DifficultyIndex(dificuldades)
+        montagem = time.perf_counter() - inicio
+
+        tempos: List[float] = []
+        erro_final = 0.0
+        for _ in range(alunos):
+            verdadeira = rng.gauss(0.0, 1.0)
+            habilidade = 0.0
+            usadas = set()
+            for _ in range(respostas):
+                inicio = time.perf_counter()
+                questao_id = indice.escolher(habilidade - logit_alvo, usadas, rng)
+                tempos.append((time.perf_counter() - inicio) * 1e6)
+                usadas.add(questao_id)
+                dificuldade = dificuldades[questao_id]
+                correta = rng.random() < probabilidade_acerto(verdadeira, dificuldade)
+                habilidade = atualizar_habilidade(habilidade, dificuldade, correta)
+            erro_final += abs(habilidade - verdadeira)
+
+        tempos.sort()
+        p50 = tempos[len(tempos) // 2]
+        p99 = tempos[int(len(tempos) * 0.99)]
+        print(f"{tamanho:>9} questões ({len(indice.chaves)} faixas, índice em {montagem * 1000:.0f} ms): "
+              f"escolha p50 {p50:.1f} µs  p99 {p99:.1f} µs  "
+              f"erro médio da habilidade {erro_final / alunos:.2f} logit")
+        ok = ok and p99 < LIMITE_US
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a escolha de questões do modo adaptativo.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--respostas', type=int, default=50, help="Respostas por aluno simulado")
+    parser.add_argument('--alunos', type=int, default=200)
+    args = parser.parse_args(argv)
+    sys.exit(0 if executar(args.tamanhos, args.respostas, args.alunos) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Teste de resistência do "Tentar Novamente"
+Repete início -> responder tudo -> tentar novamente e verifica que a pilha e os widgets não crescem
+"""
+
+import argparse
+import inspect
+import os
+import sys
+import tkinter as tk
+from pathlib import Path
+from tkinter import messagebox
+from typing import List
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import QUIZaPP  # noqa: E402
+
+
+def contar_widgets(widget: tk.Misc) -> int:
+    return 1 + sum(contar_widgets(filho) for filho in widget.winfo_children())
+
+
+def executar(rodadas: int, quantidade: int) -> bool:
+    # As caixas de diálogo bloqueariam o laço; o teste só precisa das transições de tela
+    messagebox.showinfo = lambda *args, **kwargs: None
+    messagebox.showerror = lambda *args, **kwargs: None
+
+    root = tk.Tk()
+    gerenciador = QUIZaPP.criar_aplicacao(root)
+    inicio = gerenciador.tela('inicio')
+    quiz = gerenciador.tela('quiz')
+    resultado = gerenciador.tela('resultado')
+    inicio.quantidade.set(quantidade)
+
+    profundidades: List[int] = []
+    widgets: List[int] = []
+    for rodada in range(rodadas):
+        inicio.iniciar_quiz()
+        while not quiz.sessao.finalizada:
+            quiz.responder('a')
+        if gerenciador.atual != 'resultado':
+            print(f"rodada {rodada}: tela final inesperada '{gerenciador.atual}'")
+            return False
+        resultado.tentar_novamente()
+        root.update()
+
+        profundidades.append(len(inspect.stack(0)))
+        widgets.append(contar_widgets(root))
+        if (rodada + 1) % 100 == 0:
+            print(f"{rodada + 1:>5} rodadas: pilha={profundidades[-1]} widgets={widgets[-1]}")
+
+    root.destroy()
+
+    estavel = len(set(profundidades)) == 1 and len(set(widgets)) == 1
+    print(f"pilha: {min(profundidades)}..{max(profundidades)}  widgets: {min(widgets)}..{max(widgets)}  "
+          f"({'constante' if estavel else 'CRESCENDO'})")
+    return estavel
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Repete o ciclo de tentar novamente e mede pilha e widgets.")
+    parser.add_argument('--rodadas', type=int, default=1000)
+    parser.add_argument('--quantidade', type=int, default=10, choices=[10, 20, 30, 40, 50])
+    parser.add_argument('--pasta', default=str(RAIZ / 'Dados'), help="Pasta com os bancos .db")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.pasta)
+    sys.exit(0 if executar(args.rodadas, args.quantidade) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Suíte de benchmarks do quiz
+Para cada tamanho de banco sintético mede parse do TXT, importação, carga completa, sorteio de
+50 questões e desenho de uma questão fora da tela; grava em JSON e compara com a base local
+
+    python -m benchmarks.suite --gravar-base      # na versão de referência
+    python -m benchmarks.suite                    # depois da mudança; sai com 1 se algo regrediu
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / 'TXT ORIGINAL'))
+
+from benchmarks.gerador import gerar_txt  # noqa: E402
+from eventos import fechar_logs  # noqa: E402
+from questoes_refatorado import QuestaoImporter, QuestaoParser  # noqa: E402
+from repositorio import abrir_repositorio, fechar_repositorios  # noqa: E402
+from sessao import QuizSession  # noqa: E402
+
+TAMANHOS = (1_000, 10_000, 100_000)
+TAMANHOS_SUPORTADOS = (1_000, 10_000, 100_000, 1_000_000)
+ETAPAS = ('parse', 'importacao', 'carga_completa', 'carga_leve', 'sorteio_50', 'render')
+
+SAIDA = Path(__file__).resolve().parent / 'resultados.json'
+BASE = Path(__file__).resolve().parent / 'base.json'
+
+# Regressão: mais lento que a base por mais que a tolerância E por mais que o piso absoluto,
+# para o ruído de etapas de poucos microssegundos não disparar alarme
+TOLERANCIA = 0.25
+PISO_MS = 0.5
+
+REPETICOES_SORTEIO = 50
+QUESTOES_SORTEIO = 50
+
+
+def melhor_de(funcao: Callable[[], object], repeticoes: int,
+              preparar: Optional[Callable[[], None]] = None) -> float:
+    """Menor tempo (ms) entre as repetições; `preparar` roda antes de cada uma, fora da medição"""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        del resultado
+    return min(tempos)
+
+
+def remover_banco(banco: str):
+    for sufixo in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(banco + sufixo):
+            os.remove(banco + sufixo)
+
+
+def medir_render(banco: str, pasta: str) -> Optional[float]:
+    """
+    Mediana (ms) de mostrar_questao + update_idletasks no quizTGEv2, com a janela retirada da tela.
+    Sem display o Tk não abre e a etapa fica como None.
+    """
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+
+    for nome in ('questoesEspecificas.db', 'questoesGerais.db'):
+        shutil.copyfile(banco, os.path.join(pasta, nome))
+    anterior = os.getcwd()
+    os.chdir(pasta)
+    try:
+        import quizTGEv2
+
+        gerenciador = quizTGEv2.criar_aplicacao(root)
+        root.withdraw()
+        quiz = gerenciador.tela('quiz')
+        gerenciador.mostrar('quiz')
+        quiz.iniciar(QUESTOES_SORTEIO, seed=0)
+        root.update()
+
+        tempos: List[float] = []
+        while quiz.sessao.indice + 1 < quiz.sessao.total:
+            root.update()
+            quiz.sessao.responder('a')
+            inicio = time.perf_counter()
+            quiz.mostrar_questao()
+            root.update_idletasks()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tempos)
+    finally:
+        root.destroy()
+        fechar_logs()
+        # Os caminhos relativos dos bancos valem só para esta pasta
+        fechar_repositorios()
+        os.chdir(anterior)
+
+
+def medir_tamanho(tamanho: int, repeticoes: int, pasta: str) -> Dict[str, Optional[float]]:
+    txt = os.path.join(pasta, f'gerais_{tamanho}.txt')
+    banco = os.path.join(pasta, f'gerais_{tamanho}.db')
+    gerar_txt(txt, tamanho, seed=tamanho)
+
+    resultado: Dict[str, Optional[float]] = {}
+    parser = QuestaoParser()
+    resultado['parse'] = melhor_de(lambda: sum(1 for _ in parser.iter_questoes(txt)), repeticoes)
+    resultado['importacao'] = melhor_de(lambda: QuestaoImporter(banco).importar_arquivo(txt), repeticoes,
+                                        preparar=lambda: remover_banco(banco))
+
+    # O importador já criou os índices; as medições seguintes pegam o repositório já aberto
+    repositorio = abrir_repositorio(banco)
+    assert repositorio.contar() == tamanho, f"importadas {repositorio.contar()} de {tamanho} questões"
+    resultado['carga_completa'] = melhor_de(repositorio.todas, repeticoes)
+    resultado['carga_leve'] = melhor_de(repositorio.todas_leves, repeticoes)
+
+    tempos = []
+    for seed in range(REPETICOES_SORTEIO):
+        inicio = time.perf_counter()
+        QuizSession.iniciar(QUESTOES_SORTEIO, banco, banco, seed=seed)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    resultado['sorteio_50'] = statistics.median(tempos)
+    fechar_repositorios()
+
+    render = os.path.join(pasta, 'render')
+    os.makedirs(render, exist_ok=True)
+    resultado['render'] = medir_render(banco, render)
+
+    os.remove(txt)
+    remover_banco(banco)
+    return resultado
+
+
+def executar(tamanhos: List[int], repeticoes: int) -> dict:
+    # O importador configura o logging em INFO; durante a suíte só avisos interessam
+    logging.getLogger().setLevel(logging.WARNING)
+
+    resultados: Dict[str, Dict[str, Optional[float]]] = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in tamanhos:
+            resultados[str(tamanho)] = medir_tamanho(tamanho, repeticoes, pasta)
+            imprimir_tamanho(tamanho, resultados[str(tamanho)])
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticoes': repeticoes,
+        'resultados': resultados,
+    }
+
+
+def imprimir_tamanho(tamanho: int, resultado: Dict[str, Optional[float]]):
+    print(f"{tamanho} questões")
+    for etapa in ETAPAS:
+        valor = resultado.get(etapa)
+        print(f"  {etapa:<15}" + (f"{valor:12.3f} ms" if valor is not None else "     sem display"))
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> List[str]:
+    """Etapas mais lentas que a base além da tolerância; tamanhos ou etapas ausentes em um dos lados são ignorados"""
+    regressoes = []
+    for tamanho, etapas in atual['resultados'].items():
+        referencia = base.get('resultados', {}).get(tamanho, {})
+        for etapa, valor in etapas.items():
+            anterior = referencia.get(etapa)
+            if valor is None or anterior is None:
+                continue
+            if valor > anterior * (1 + tolerancia) and valor - anterior > PISO_MS:
+                regressoes.append(f"{tamanho} questões, {etapa}: {anterior:.3f} ms -> {valor:.3f} ms "
+                                  f"({valor / anterior:.2f}x)")
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede parse, importação, carga, sorteio e render em bancos sintéticos.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=list(TAMANHOS), choices=TAMANHOS_SUPORTADOS)
+    parser.add_argument('--repeticoes', type=int, default=3, help="Repetições das etapas pesadas (vale a melhor)")
+    parser.add_argument('--saida', default=str(SAIDA), help="JSON com os resultados desta execução")
+    parser.add_argument('--base', default=str(BASE), help="JSON de referência para a comparação")
+    parser.add_argument('--gravar-base', action='store_true', help="Grava os resultados como nova base")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="Fração de lentidão aceita antes de acusar regressão")
+    args = parser.parse_args(argv)
+
+    atual = executar(args.tamanhos, args.repeticoes)
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados em {args.saida}")
+
+    if args.gravar_base:
+        shutil.copyfile(args.saida, args.base)
+        print(f"Base gravada em {args.base}")
+        sys.exit(0)
+
+    if not os.path.exists(args.base):
+        print(f"Sem base em {args.base}; rode com --gravar-base para criar uma")
+        sys.exit(0)
+    with open(args.base, encoding='utf-8') as arquivo:
+        base = json.load(arquivo)
+
+    regressoes = comparar(atual, base, args.tolerancia)
+    for regressao in regressoes:
+        print(f"REGRESSÃO {regressao}")
+    if not regressoes:
+        print(f"Sem regressões em relação a {args.base} (tolerância {args.tolerancia:.0%})")
+    sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Detecção de questões quase duplicadas
+Assinaturas MinHash do enunciado e das alternativas, agrupadas por bandas LSH, em qualquer conjunto de bancos
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import sqlite3
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from busca import COLUNAS_TEXTO
+
+# 128 permutações em 16 bandas de 8 linhas: pares com similaridade de Jaccard acima de ~0,7
+# viram candidatos com alta probabilidade; abaixo de ~0,5 quase nunca
+NUM_PERMUTACOES = 128
+LINHAS_POR_BANDA = 8
+# Similaridade estimada mínima para confirmar um candidato como duplicata
+LIMIAR_SIMILARIDADE = 0.8
+# Palavras por shingle
+TAMANHO_SHINGLE = 3
+# Grupos distintos comparados dentro de um mesmo balde; acima disso o balde vem de um trecho comum a
+# muitas questões diferentes (um modelo de enunciado) e as outras bandas é que decidem
+MAX_REPRESENTANTES = 64
+
+_PRIMO = (1 << 61) - 1
+_PALAVRA = re.compile(r'\w+')
+
+SQL_QUESTOES = f"SELECT id, numero, fonte, {', '.join(COLUNAS_TEXTO)} FROM questoes ORDER BY id"
+
+
+@dataclass(frozen=True)
+class Registro:
+    """Uma questão de um dos bancos analisados"""
+    banco: str
+    questao_id: int
+    numero: str
+    fonte: str
+    enunciado: str
+
+
+def normalizar(texto: str) -> List[str]:
+    """Palavras em minúsculas e sem acentos, para que 'Separação' e 'separacao' coincidam"""
+    sem_acentos = unicodedata.normalize('NFKD', texto.lower())
+    sem_acentos = ''.join(c for c in sem_acentos if not unicodedata.combining(c))
+    return _PALAVRA.findall(sem_acentos)
+
+
+def shingles(texto: str, tamanho: int = TAMANHO_SHINGLE) -> Set[int]:
+    """Sequências de `tamanho` palavras, cada uma reduzida a um hash estável de 64 bits"""
+    palavras = normalizar(texto)
+    if len(palavras) < tamanho:
+        grupos = [' '.join(palavras)] if palavras else []
+    else:
+        grupos = [' '.join(palavras[i:i + tamanho]) for i in range(len(palavras) - tamanho + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(grupo.encode(), digest_size=8).digest(), 'little')
+        for grupo in grupos
+    }
+
+
+class MinHasher:
+    """Família de permutações (a·x + b) mod p, fixa pela seed para que as assinaturas sejam comparáveis"""
+
+    def __init__(self, num_permutacoes: int = NUM_PERMUTACOES, seed: int = 1):
+        rng = random.Random(seed)
+        self.permutacoes = [
+            (rng.randrange(1, _PRIMO), rng.randrange(0, _PRIMO)) for _ in range(num_permutacoes)
+        ]
+
+    def assinatura(self, conjunto: Set[int]) -> Tuple[int, ...]:
+        if not conjunto:
+            return ()
+        return tuple(min((a * x + b) % _PRIMO for x in conjunto) for a, b in self.permutacoes)
+
+
+def similaridade(assinatura_a: Sequence[int], assinatura_b: Sequence[int]) -> float:
+    """Fração de posições iguais: estimativa da similaridade de Jaccard"""
+    if not assinatura_a or not assinatura_b:
+        return 0.0
+    return sum(x == y for x, y in zip(assinatura_a, assinatura_b)) / len(assinatura_a)
+
+
+def ler_registros(bancos: Iterable[str]) -> Iterator[Tuple[Registro, str]]:
+    """Questões e o texto comparado de cada banco, abertos somente para leitura"""
+    for banco in bancos:
+        conn = sqlite3.connect(f'{Path(banco).resolve().as_uri()}?mode=ro', uri=True)
+        try:
+            for questao_id, numero, fonte, *textos in conn.execute(SQL_QUESTOES):
+                registro = Registro(banco, questao_id, str(numero or ''), fonte or '', textos[0] or '')
+                yield registro, ' '.join(texto or '' for texto in textos)
+        finally:
+            conn.close()
+
+
+class _Conjuntos:
+    """Union-find com compressão de caminho"""
+
+    def __init__(self, tamanho: int):
+        self.pai = list(range(tamanho))
+
+    def raiz(self, i: int) -> int:
+        while self.pai[i] != i:
+            self.pai[i] = self.pai[self.pai[i]]
+            i = self.pai[i]
+        return i
+
+    def unir(self, i: int, j: int):
+        self.pai[self.raiz(i)] = self.raiz(j)
+
+
+def agrupar_duplicatas(bancos: Sequence[str],
+                       limiar: float = LIMIAR_SIMILARIDADE,
+                       linhas_por_banda: int = LINHAS_POR_BANDA,
+                       hasher: Optional[MinHasher] = None) -> List[List[Registro]]:
+    """
+    Grupos de questões quase iguais entre todos os bancos, os maiores primeiro.
+
+    Cada assinatura é cortada em bandas; só questões que coincidem numa banda inteira
+    são comparadas, o que mantém o custo perto de linear no número de questões.
+    """
+    hasher = hasher or MinHasher()
+    registros: List[Registro] = []
+    assinaturas: List[Tuple[int, ...]] = []
+    for registro, texto in ler_registros(bancos):
+        registros.append(registro)
+        assinaturas.append(hasher.assinatura(shingles(texto)))
+
+    baldes: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    for posicao, assinatura in enumerate(assinaturas):
+        for inicio in range(0, len(assinatura), linhas_por_banda):
+            baldes[inicio, assinatura[inicio:inicio + linhas_por_banda]].append(posicao)
+
+    conjuntos = _Conjuntos(len(registros))
+    comparados: Set[Tuple[int, int]] = set()
+    for membros in baldes.values():
+        if len(membros) < 2:
+            continue
+        # Cada membro é comparado com um representante de cada grupo já formado no balde: um par
+        # de membros só fica sem comparação direta quando um terceiro já os uniu
+        representantes: List[int] = []
+        for membro in membros:
+            novo_grupo = True
+            for representante in representantes:
+                if conjuntos.raiz(representante) == conjuntos.raiz(membro):
+                    novo_grupo = False
+                    continue
+                par = (representante, membro)
+                if par in comparados:
+                    continue
+                comparados.add(par)
+                if similaridade(assinaturas[representante], assinaturas[membro]) >= limiar:
+                    # Continua comparando: o membro pode ligar dois grupos do balde
+                    conjuntos.unir(representante, membro)
+                    novo_grupo = False
+            if novo_grupo and len(representantes) < MAX_REPRESENTANTES:
+                representantes.append(membro)
+
+    grupos: Dict[int, List[Registro]] = defaultdict(list)
+    for posicao, registro in enumerate(registros):
+        grupos[conjuntos.raiz(posicao)].append(registro)
+    return sorted((grupo for grupo in grupos.values() if len(grupo) > 1), key=len, reverse=True)
+
+
+def localizar_bancos(caminhos: Sequence[str]) -> List[str]:
+    """Expande pastas nos .db que contêm a tabela questoes"""
+    bancos: List[str] = []
+    for caminho in map(Path, caminhos):
+        candidatos = sorted(caminho.rglob('*.db')) if caminho.is_dir() else [caminho]
+        for candidato in candidatos:
+            conn = sqlite3.connect(f'{candidato.resolve().as_uri()}?mode=ro', uri=True)
+            try:
+                tem_questoes = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questoes'"
+                ).fetchone()
+            except sqlite3.DatabaseError:
+                tem_questoes = None
+            finally:
+                conn.close()
+            if tem_questoes:
+                bancos.append(str(candidato))
+    return bancos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrupa questões quase duplicadas entre bancos (MinHash/LSH).")
+    parser.add_argument('caminhos', nargs='*', default=['.'], help="Bancos .db ou pastas (padrão: a atual)")
+    parser.add_argument('--limiar', type=float, default=LIMIAR_SIMILARIDADE,
+                        help="Similaridade de Jaccard estimada mínima (0 a 1)")
+    parser.add_argument('--entre-bancos', action='store_true',
+                        help="Mostra só grupos com questões de mais de um banco")
+    parser.add_argument('--mesmo-banco', action='store_true',
+                        help="Mostra só grupos com mais de uma questão no mesmo banco")
+    args = parser.parse_args(argv)
+
+    bancos = localizar_bancos(args.caminhos)
+    grupos = agrupar_duplicatas(bancos, args.limiar)
+    if args.entre_bancos:
+        grupos = [g for g in grupos if len({r.banco for r in g}) > 1]
+    if args.mesmo_banco:
+        grupos = [g for g in grupos if len({r.banco for r in g}) < len(g)]
+
+    print(f"{len(bancos)} bancos analisados, {len(grupos)} grupos de quase duplicatas\n")
+    for numero, grupo in enumerate(grupos, 1):
+        print(f"Grupo {numero}: {len(grupo)} questões em {len({r.banco for r in grupo})} banco(s)")
+        for registro in grupo:
+            print(f"  {registro.banco} #{registro.questao_id} (nº {registro.numero}, {registro.fonte}): "
+                  f"{registro.enunciado[:70]}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Estatísticas por questão
+Agregados mantidos a cada lote do log de respostas e relatórios de dificuldade e distratores
+"""
+
+import argparse
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from repositorio import abrir_repositorio
+
+ALTERNATIVAS = ('a', 'b', 'c', 'd')
+
+SQL_CRIAR = '''
+    CREATE TABLE IF NOT EXISTS question_stats (
+        banco TEXT NOT NULL,
+        questao_id INTEGER NOT NULL,
+        tentativas INTEGER NOT NULL,
+        acertos INTEGER NOT NULL,
+        escolhas_a INTEGER NOT NULL,
+        escolhas_b INTEGER NOT NULL,
+        escolhas_c INTEGER NOT NULL,
+        escolhas_d INTEGER NOT NULL,
+        tempo_total REAL NOT NULL,
+        respostas_com_tempo INTEGER NOT NULL,
+        PRIMARY KEY (banco, questao_id)
+    )
+'''
+
+# Soma o lote ao que já existe; cada questão do lote vira uma única linha de upsert
+SQL_SOMAR = '''
+    INSERT INTO question_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (banco, questao_id) DO UPDATE SET
+        tentativas = tentativas + excluded.tentativas,
+        acertos = acertos + excluded.acertos,
+        escolhas_a = escolhas_a + excluded.escolhas_a,
+        escolhas_b = escolhas_b + excluded.escolhas_b,
+        escolhas_c = escolhas_c + excluded.escolhas_c,
+        escolhas_d = escolhas_d + excluded.escolhas_d,
+        tempo_total = tempo_total + excluded.tempo_total,
+        respostas_com_tempo = respostas_com_tempo + excluded.respostas_com_tempo
+'''
+
+# Contador de alterações por banco e, por questão, o valor dele na última alteração; mantidos por
+# gatilhos, deixam quem guarda as dificuldades em memória aplicar só as questões que mudaram
+_ANOTAR_ALTERACAO = '''
+        INSERT INTO question_stats_versao VALUES (new.banco, 1)
+        ON CONFLICT (banco) DO UPDATE SET alteracoes = alteracoes + 1;
+        INSERT INTO question_stats_alteradas
+        SELECT new.banco, new.questao_id, alteracoes FROM question_stats_versao WHERE banco = new.banco
+        ON CONFLICT (banco, questao_id) DO UPDATE SET versao = excluded.versao;'''
+SQL_CRIAR_VERSAO = (
+    '''
+    CREATE TABLE IF NOT EXISTS question_stats_versao (
+        banco TEXT PRIMARY KEY,
+        alteracoes INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS question_stats_alteradas (
+        banco TEXT NOT NULL,
+        questao_id INTEGER NOT NULL,
+        versao INTEGER NOT NULL,
+        PRIMARY KEY (banco, questao_id)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_question_stats_alteradas ON question_stats_alteradas(banco, versao)',
+    # Gatilhos da primeira versão, que só contavam
+    'DROP TRIGGER IF EXISTS question_stats_versao_ai',
+    'DROP TRIGGER IF EXISTS question_stats_versao_au',
+    f'''CREATE TRIGGER IF NOT EXISTS question_stats_alteracao_ai AFTER INSERT ON question_stats BEGIN
+        {_ANOTAR_ALTERACAO}
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS question_stats_alteracao_au AFTER UPDATE ON question_stats BEGIN
+        {_ANOTAR_ALTERACAO}
+    END''',
+)
+
+# Reconstrução a partir do histórico, usada só quando a tabela é criada sobre um log existente
+SQL_RECONSTRUIR = '''
+    INSERT INTO question_stats
+    SELECT COALESCE(banco, ''), questao_id, COUNT(*), SUM(correta),
+           SUM(escolhida = 'a'), SUM(escolhida = 'b'), SUM(escolhida = 'c'), SUM(escolhida = 'd'),
+           COALESCE(SUM(tempo_resposta), 0), COUNT(tempo_resposta)
+    FROM eventos_resposta GROUP BY COALESCE(banco, ''), questao_id
+'''
+
+
+@dataclass(frozen=True)
+class EstatisticaQuestao:
+    banco: str
+    questao_id: int
+    tentativas: int
+    acertos: int
+    escolhas: Dict[str, int]
+    tempo_medio: Optional[float]
+
+    @property
+    def taxa_acerto(self) -> float:
+        return self.acertos / self.tentativas if self.tentativas else 0.0
+
+
+@dataclass(frozen=True)
+class Distrator:
+    estatistica: EstatisticaQuestao
+    gabarito: str
+    alternativa: str
+    escolhas: int
+
+    @property
+    def proporcao_erros(self) -> float:
+        """Fração dos erros que escolheram esta alternativa"""
+        erros = self.estatistica.tentativas - self.estatistica.acertos
+        return self.escolhas / erros if erros else 0.0
+
+
+def garantir_tabela(conn: sqlite3.Connection):
+    """Cria question_stats; se já houver histórico de respostas, calcula os agregados uma vez"""
+    tabelas = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.execute(SQL_CRIAR)
+    for sql in SQL_CRIAR_VERSAO:
+        conn.execute(sql)
+    if 'question_stats' not in tabelas and 'eventos_resposta' in tabelas:
+        conn.execute(SQL_RECONSTRUIR)
+
+
+def versao_estatisticas(conn: sqlite3.Connection, banco: str) -> int:
+    """Quantas vezes os agregados do banco mudaram; 0 se ainda não há contador"""
+    try:
+        linha = conn.execute('SELECT alteracoes FROM question_stats_versao WHERE banco = ?', (banco,)).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return linha[0] if linha else 0
+
+
+def alteradas_desde(conn: sqlite3.Connection, banco: str, versao: int) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    (questao_id, tentativas, acertos) das questões do banco alteradas depois da versão.
+
+    None se o log ainda não anota as alterações por questão (criado antes dos gatilhos)
+    """
+    try:
+        return conn.execute('''
+            SELECT s.questao_id, s.tentativas, s.acertos
+            FROM question_stats_alteradas a
+            JOIN question_stats s ON s.banco = a.banco AND s.questao_id = a.questao_id
+            WHERE a.banco = ? AND a.versao > ?
+        ''', (banco, versao)).fetchall()
+    except sqlite3.OperationalError:
+        return None
+
+
+def agregar(eventos: Iterable) -> List[Tuple]:
+    """Reduz um lote de EventoResposta a uma linha de incremento por (banco, questão)"""
+    somas: Dict[Tuple[str, int], List] = {}
+    for evento in eventos:
+        chave = (evento.banco or '', evento.questao_id)
+        linha = somas.get(chave)
+        if linha is None:
+            linha = somas[chave] = [0, 0, 0, 0, 0, 0, 0.0, 0]
+        linha[0] += 1
+        linha[1] += bool(evento.correta)
+        if evento.escolhida in ALTERNATIVAS:
+            linha[2 + ALTERNATIVAS.index(evento.escolhida)] += 1
+        if evento.tempo_resposta is not None:
+            linha[6] += evento.tempo_resposta
+            linha[7] += 1
+    return [(*chave, *linha) for chave, linha in somas.items()]
+
+
+def somar_lote(conn: sqlite3.Connection, eventos: Iterable):
+    """Aplica o lote aos agregados (sem commit: vai junto com a gravação dos eventos)"""
+    conn.executemany(SQL_SOMAR, agregar(eventos))
+
+
+# --------------------- Relatórios ---------------------
+def _estatistica(linha: tuple) -> EstatisticaQuestao:
+    banco, questao_id, tentativas, acertos, a, b, c, d, tempo_total, com_tempo = linha
+    return EstatisticaQuestao(
+        banco=banco,
+        questao_id=questao_id,
+        tentativas=tentativas,
+        acertos=acertos,
+        escolhas=dict(zip(ALTERNATIVAS, (a, b, c, d))),
+        tempo_medio=tempo_total / com_tempo if com_tempo else None
+    )
+
+
+def mais_dificeis(conn: sqlite3.Connection, limite: int = 20,
+                  minimo_tentativas: int = 5) -> List[EstatisticaQuestao]:
+    """Questões com menor taxa de acerto, lidas só dos agregados"""
+    linhas = conn.execute('''
+        SELECT * FROM question_stats WHERE tentativas >= ?
+        ORDER BY CAST(acertos AS REAL) / tentativas, tentativas DESC LIMIT ?
+    ''', (minimo_tentativas, limite))
+    return [_estatistica(linha) for linha in linhas]
+
+
+def distratores(conn: sqlite3.Connection, limite: int = 20,
+                minimo_erros: int = 5) -> List[Distrator]:
+    """
+    Alternativa errada mais escolhida de cada questão, ordenada pela atração que exerce.
+
+    O gabarito vem do banco de questões, buscado só para as questões com agregados.
+    """
+    estatisticas = [
+        _estatistica(linha) for linha in conn.execute(
+            'SELECT * FROM question_stats WHERE tentativas - acertos >= ?', (minimo_erros,)
+        )
+    ]
+
+    por_banco: Dict[str, List[EstatisticaQuestao]] = {}
+    for estatistica in estatisticas:
+        por_banco.setdefault(estatistica.banco, []).append(estatistica)
+
+    resultado: List[Distrator] = []
+    for banco, lista in por_banco.items():
+        if not banco:
+            continue
+        gabaritos = {
+            questao.id: questao.gabarito
+            for questao in abrir_repositorio(banco).por_ids([e.questao_id for e in lista])
+        }
+        for estatistica in lista:
+            gabarito = gabaritos.get(estatistica.questao_id)
+            if gabarito is None:
+                continue
+            erradas = {letra: n for letra, n in estatistica.escolhas.items() if letra != gabarito}
+            alternativa = max(erradas, key=erradas.get)
+            resultado.append(Distrator(estatistica, gabarito, alternativa, erradas[alternativa]))
+
+    resultado.sort(key=lambda d: (d.proporcao_erros, d.escolhas), reverse=True)
+    return resultado[:limite]
+
+
+def main(argv=None):
+    # Import local: eventos importa este módulo para manter os agregados
+    from eventos import BANCO_EVENTOS
+
+    parser = argparse.ArgumentParser(description="Relatórios de dificuldade e distratores por questão.")
+    parser.add_argument('--banco-eventos', default=BANCO_EVENTOS)
+    parser.add_argument('--limite', type=int, default=20)
+    parser.add_argument('--minimo', type=int, default=5, help="Tentativas (ou erros) mínimos por questão")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.banco_eventos)
+    garantir_tabela(conn)
+    conn.commit()
+
+    print("Questões mais difíceis:")
+    for e in mais_dificeis(conn, args.limite, args.minimo):
+        tempo = f"{e.tempo_medio:.1f}s" if e.tempo_medio is not None else "-"
+        print(f"  {e.banco} #{e.questao_id}: {e.taxa_acerto:.0%} de acerto em {e.tentativas} tentativas, "
+              f"tempo médio {tempo}")
+
+    print("\nDistratores mais atraentes:")
+    for d in distratores(conn, args.limite, args.minimo):
+        print(f"  {d.estatistica.banco} #{d.estatistica.questao_id}: '{d.alternativa}' "
+              f"({d.proporcao_erros:.0%} dos erros; gabarito '{d.gabarito}')")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
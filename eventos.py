@@ -0,0 +1,247 @@
+"""
+Log de respostas
+Cada resposta vira um evento numa fila; uma thread escreve os eventos em lotes num banco próprio,
+junto com as escritas que outros módulos enfileiram para os bancos deles (agenda de revisão)
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+from estatisticas import garantir_tabela, somar_lote
+
+logger = logging.getLogger(__name__)
+
+BANCO_EVENTOS = 'respostas.db'
+
+# Um lote é gravado quando enche ou quando o primeiro evento dele completa este tempo na fila;
+# uma queda do processo perde no máximo o lote em formação
+TAMANHO_LOTE = 64
+INTERVALO_LOTE = 0.5
+# Espera máxima de descarregar() e da abertura do banco pela thread de escrita
+TEMPO_ESPERA = 10.0
+
+_FIM = object()
+
+
+class EventoResposta(NamedTuple):
+    sessao: str
+    banco: Optional[str]
+    questao_id: int
+    escolhida: str
+    correta: bool
+    tempo_resposta: Optional[float]     # segundos entre exibir a questão e responder
+    registrado_em: float                # epoch em segundos
+
+
+class Escrita(NamedTuple):
+    """Comando SQL para outro banco, gravado pela thread do log no mesmo lote das respostas"""
+    banco: str
+    sql: str
+    parametros: Sequence
+
+
+class AnswerLog:
+    """Log somente de inserção, gravado por uma thread em commits agrupados junto com question_stats"""
+
+    SQL_CRIAR = '''
+        CREATE TABLE IF NOT EXISTS eventos_resposta (
+            id INTEGER PRIMARY KEY,
+            sessao TEXT NOT NULL,
+            banco TEXT,
+            questao_id INTEGER NOT NULL,
+            escolhida TEXT NOT NULL,
+            correta INTEGER NOT NULL,
+            tempo_resposta REAL,
+            registrado_em REAL NOT NULL
+        )
+    '''
+    SQL_INSERIR = '''
+        INSERT INTO eventos_resposta
+            (sessao, banco, questao_id, escolhida, correta, tempo_resposta, registrado_em)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def __init__(self, banco: str = BANCO_EVENTOS,
+                 tamanho_lote: int = TAMANHO_LOTE, intervalo: float = INTERVALO_LOTE):
+        self.banco = banco
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.gravados = 0
+        self._fila: queue.Queue = queue.Queue()
+        self._fechado = False
+        # Erro que derrubou a thread de escrita; quem registra ou descarrega recebe ele
+        self._erro: Optional[BaseException] = None
+        self._pronto = threading.Event()
+        self._escritor = threading.Thread(target=self._escrever, name='log-respostas', daemon=True)
+        self._escritor.start()
+        # A thread abre o banco; uma falha aqui aparece para quem criou o log, não numa thread morta
+        if not self._pronto.wait(TEMPO_ESPERA):
+            raise TimeoutError(f"O log de respostas não abriu {banco} em {TEMPO_ESPERA:.0f}s")
+        if self._erro is not None:
+            raise RuntimeError(f"Não foi possível abrir o log de respostas em {banco}") from self._erro
+        # Grava o que ainda estiver na fila quando o programa terminar
+        atexit.register(self.fechar)
+
+    def _conferir(self):
+        if self._fechado:
+            raise RuntimeError("O log de respostas já foi fechado")
+        if self._erro is not None:
+            raise RuntimeError("A thread do log de respostas parou") from self._erro
+
+    def registrar(self, evento: EventoResposta):
+        """Enfileira o evento e volta imediatamente; quem grava é a thread do log"""
+        self._conferir()
+        self._fila.put_nowait(evento)
+
+    def escrever(self, banco: str, sql: str, parametros: Sequence):
+        """Enfileira uma escrita em outro banco; a thread do log grava e faz o commit no lote seguinte"""
+        self._conferir()
+        self._fila.put_nowait(Escrita(banco, sql, parametros))
+
+    def descarregar(self, timeout: Optional[float] = TEMPO_ESPERA):
+        """
+        Espera até que todos os eventos enfileirados estejam gravados.
+
+        Raises:
+            TimeoutError: A fila não esvaziou em `timeout` segundos
+            RuntimeError: A thread de escrita parou (o erro dela vem encadeado)
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._fila.all_tasks_done:
+            while self._fila.unfinished_tasks and self._erro is None:
+                restante = INTERVALO_LOTE if limite is None else limite - time.monotonic()
+                if restante <= 0:
+                    raise TimeoutError(f"{self._fila.unfinished_tasks} escritas do log ainda na fila")
+                # Acorda de tempos em tempos para perceber uma thread que morreu sem esvaziar a fila
+                self._fila.all_tasks_done.wait(min(restante, INTERVALO_LOTE))
+        if self._erro is not None:
+            raise RuntimeError("A thread do log de respostas parou") from self._erro
+
+    def fechar(self):
+        if self._fechado:
+            return
+        self._fechado = True
+        self._fila.put(_FIM)
+        self._escritor.join(TEMPO_ESPERA)
+        atexit.unregister(self.fechar)
+
+    # --------------------- Thread de escrita ---------------------
+    def _escrever(self):
+        try:
+            conn = sqlite3.connect(self.banco)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Com WAL, NORMAL só arrisca o último commit numa queda de energia, não a integridade
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(self.SQL_CRIAR)
+            garantir_tabela(conn)
+            conn.commit()
+        except BaseException as e:
+            self._erro = e
+            return
+        finally:
+            self._pronto.set()
+
+        try:
+            self._consumir(conn)
+        except BaseException as e:
+            logger.exception("A thread do log de respostas parou")
+            self._erro = e
+            # Acorda quem está em descarregar(): a fila não vai mais esvaziar
+            with self._fila.all_tasks_done:
+                self._fila.all_tasks_done.notify_all()
+        finally:
+            conn.close()
+
+    def _consumir(self, conn: sqlite3.Connection):
+        # Conexões dos outros bancos, abertas na primeira escrita de cada um
+        outros: Dict[str, sqlite3.Connection] = {}
+        try:
+            self._consumir_lotes(conn, outros)
+        finally:
+            for outra in outros.values():
+                outra.close()
+
+    def _consumir_lotes(self, conn: sqlite3.Connection, outros: Dict[str, sqlite3.Connection]):
+        terminou = False
+        while not terminou:
+            lote: List[Union[EventoResposta, Escrita]] = []
+            item = self._fila.get()
+            limite = time.monotonic() + self.intervalo
+            while item is not _FIM:
+                lote.append(item)
+                if len(lote) >= self.tamanho_lote:
+                    break
+                try:
+                    item = self._fila.get(timeout=max(0.0, limite - time.monotonic()))
+                except queue.Empty:
+                    break
+            else:
+                terminou = True
+
+            eventos = [item for item in lote if isinstance(item, EventoResposta)]
+            if eventos:
+                self._gravar(conn, eventos)
+            if len(eventos) < len(lote):
+                self._gravar_escritas(outros, [item for item in lote if isinstance(item, Escrita)])
+            for _ in range(len(lote) + terminou):
+                self._fila.task_done()
+
+    def _gravar_escritas(self, outros: Dict[str, sqlite3.Connection], escritas: List[Escrita]):
+        """Grava as escritas na ordem em que chegaram, com um commit por banco"""
+        por_banco: Dict[str, List[Escrita]] = {}
+        for escrita in escritas:
+            por_banco.setdefault(escrita.banco, []).append(escrita)
+        for banco, lista in por_banco.items():
+            conn = outros.get(banco)
+            try:
+                if conn is None:
+                    conn = outros[banco] = sqlite3.connect(banco)
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute('PRAGMA synchronous=NORMAL')
+                for escrita in lista:
+                    conn.execute(escrita.sql, escrita.parametros)
+                conn.commit()
+            except sqlite3.Error:
+                if conn is not None:
+                    conn.rollback()
+                logger.exception(f"Falha ao gravar {len(lista)} escritas em {banco}")
+
+    def _gravar(self, conn: sqlite3.Connection, lote: List[EventoResposta]):
+        try:
+            conn.executemany(self.SQL_INSERIR, lote)
+            # Agregados por questão no mesmo commit: nunca divergem do log
+            somar_lote(conn, lote)
+            conn.commit()
+            self.gravados += len(lote)
+        except sqlite3.Error:
+            conn.rollback()
+            logger.exception(f"Falha ao gravar {len(lote)} eventos de resposta")
+
+
+# --------------------- Log compartilhado ---------------------
+_logs: Dict[str, AnswerLog] = {}
+_logs_lock = threading.Lock()
+
+
+def abrir_log(banco: str = BANCO_EVENTOS) -> AnswerLog:
+    """Devolve o log do banco, iniciando a thread de escrita só na primeira vez"""
+    with _logs_lock:
+        log = _logs.get(banco)
+        if log is None or log._erro is not None:
+            # Log cuja thread parou não volta: um novo toma o lugar dele
+            log = AnswerLog(banco)
+            _logs[banco] = log
+        return log
+
+
+def fechar_logs():
+    """Grava o que falta e encerra as threads de todos os logs abertos pelo processo"""
+    with _logs_lock:
+        for log in _logs.values():
+            log.fechar()
+        _logs.clear()
@@ -0,0 +1,339 @@
+"""
+Índice de fontes das questões
+A fonte em texto livre ('ICA 100-37, Art. 418.') vira um par normalizado (documento, artigo) numa tabela
+própria, com cada questão numerada dentro do seu documento; uma prova por cotas ("12 da ICA 100-37,
+8 da ICA 100-12") sorteia posições e busca só as linhas sorteadas, sem varrer o banco.
+Gatilhos em questoes anotam as linhas alteradas e os importadores aplicam só essas no índice
+"""
+
+import random
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from amostragem import em_partes
+
+# Onde termina o documento: vírgula, ponto e vírgula, travessão entre espaços ou, sem pontuação
+# nenhuma, a palavra que abre a localização ('ICA 100-9 Item 5.3')
+_FIM_DOCUMENTO = re.compile(
+    r'\s*[,;]\s*|\s+[–—-]\s+|\s+(?=(?:art\b|art\.|item\b|anexo\b|cap\b|cap\.|§))',
+    re.IGNORECASE,
+)
+# Sigla colada no número ('MCA100-16')
+_SIGLA_COLADA = re.compile(r'^([A-Z]+)(?=\d)')
+_ESPACOS = re.compile(r'\s+')
+_LOCALIZADORES = (
+    (re.compile(r'\bart\b\.?\s*', re.IGNORECASE), 'Art. '),
+    (re.compile(r'\bitem\b\s*', re.IGNORECASE), 'Item '),
+    (re.compile(r'\banexo\b\s*', re.IGNORECASE), 'Anexo '),
+)
+
+SQL_CRIAR = (
+    '''
+    CREATE TABLE IF NOT EXISTS fontes_questoes (
+        questao_id INTEGER PRIMARY KEY,
+        documento TEXT NOT NULL,
+        artigo TEXT NOT NULL,
+        posicao INTEGER NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS fontes_documentos (
+        documento TEXT PRIMARY KEY,
+        quantidade INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''',
+    # Questões inseridas, apagadas ou com a fonte alterada desde a última atualização do índice
+    '''
+    CREATE TABLE IF NOT EXISTS fontes_pendentes (
+        questao_id INTEGER PRIMARY KEY
+    )
+    ''',
+)
+# Posição da questão dentro do documento (0..quantidade-1): o sorteio vira busca pontual no índice
+SQL_INDICE = 'CREATE UNIQUE INDEX IF NOT EXISTS idx_fontes_posicao ON fontes_questoes(documento, posicao)'
+
+# A normalização é Python e não roda num gatilho (quem escreve pelo sqlite3 de linha de comando não
+# teria a função); os gatilhos só anotam o id, em SQL puro, e atualizar_fontes faz o resto.
+# WHERE NOT EXISTS em vez de OR IGNORE: dentro de um UPSERT o SQLite ignora o OR IGNORE dos gatilhos
+_ANOTAR = '''INSERT INTO fontes_pendentes(questao_id) SELECT {id}
+        WHERE NOT EXISTS (SELECT 1 FROM fontes_pendentes WHERE questao_id = {id});'''
+GATILHOS_FONTES = {
+    'questoes_fontes_ai': f'''CREATE TRIGGER IF NOT EXISTS questoes_fontes_ai AFTER INSERT ON questoes BEGIN
+        {_ANOTAR.format(id='new.id')}
+    END''',
+    'questoes_fontes_ad': f'''CREATE TRIGGER IF NOT EXISTS questoes_fontes_ad AFTER DELETE ON questoes BEGIN
+        {_ANOTAR.format(id='old.id')}
+    END''',
+    'questoes_fontes_au': f'''CREATE TRIGGER IF NOT EXISTS questoes_fontes_au AFTER UPDATE OF id, fonte ON questoes BEGIN
+        {_ANOTAR.format(id='old.id')}
+        {_ANOTAR.format(id='new.id')}
+    END''',
+}
+
+
+def _limpar(texto: str) -> str:
+    return _ESPACOS.sub(' ', texto).strip().rstrip('.').strip()
+
+
+@lru_cache(maxsize=1 << 16)
+def normalizar_fonte(fonte) -> Tuple[str, str]:
+    """
+    Separa a fonte em (documento, artigo) normalizados.
+
+    'ICA 100-37, Art. 418.'                  -> ('ICA 100-37', 'Art. 418')
+    'MCA100-16; Item 2.15.2'                 -> ('MCA 100-16', 'Item 2.15.2')
+    'CAOp CINDACTA II 100-681 – Item 2.4.2'  -> ('CAOP CINDACTA II 100-681', 'Item 2.4.2')
+    'IAC RNP Z RWY 10 SBMG.'                 -> ('IAC RNP Z RWY 10 SBMG', '')
+    """
+    partes = _FIM_DOCUMENTO.split((fonte or '').strip(), maxsplit=1)
+    documento = _SIGLA_COLADA.sub(r'\1 ', _limpar(partes[0]).upper())
+    artigo = _limpar(partes[1]) if len(partes) > 1 else ''
+    for padrao, substituto in _LOCALIZADORES:
+        artigo = padrao.sub(substituto, artigo)
+    return documento, artigo.strip()
+
+
+def documento_da_fonte(fonte) -> str:
+    """Só o documento normalizado da fonte"""
+    return normalizar_fonte(fonte)[0]
+
+
+# --------------------- Tabela de fontes ---------------------
+def indexar_fontes(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Remonta fontes_questoes e fontes_documentos a partir da tabela questoes.
+
+    Roda na transação de quem chama (o commit fica com ele): a importação em lote chama depois
+    da carga; as demais usam atualizar_fontes. Quem só lê o banco usa ler_indice_fontes.
+
+    Returns:
+        Quantidade de questões por documento
+    """
+    for sql in SQL_CRIAR:
+        conn.execute(sql)
+    # Retrato COUNT/MAX(id) das versões anteriores, substituído pelos gatilhos
+    conn.execute('DROP TABLE IF EXISTS fontes_estado')
+    # Carga sem o índice de posição, que é criado de uma vez no fim
+    conn.execute('DROP INDEX IF EXISTS idx_fontes_posicao')
+    conn.execute('DELETE FROM fontes_questoes')
+    conn.execute('DELETE FROM fontes_documentos')
+    conn.execute('DELETE FROM fontes_pendentes')
+
+    quantidades: Dict[str, int] = {}
+
+    def linhas() -> Iterable[Tuple[int, str, str, int]]:
+        # Cursor próprio: as questões vêm em fluxo enquanto o executemany grava na outra tabela
+        for questao_id, fonte in conn.cursor().execute('SELECT id, fonte FROM questoes ORDER BY id'):
+            documento, artigo = normalizar_fonte(fonte)
+            posicao = quantidades.get(documento, 0)
+            quantidades[documento] = posicao + 1
+            yield questao_id, documento, artigo, posicao
+
+    conn.executemany(
+        'INSERT INTO fontes_questoes (questao_id, documento, artigo, posicao) VALUES (?, ?, ?, ?)', linhas()
+    )
+    conn.execute(SQL_INDICE)
+    conn.executemany('INSERT INTO fontes_documentos (documento, quantidade) VALUES (?, ?)', quantidades.items())
+    _recriar_gatilhos(conn)
+    return quantidades
+
+
+def _recriar_gatilhos(conn: sqlite3.Connection):
+    for nome, gatilho in GATILHOS_FONTES.items():
+        conn.execute(f'DROP TRIGGER IF EXISTS {nome}')
+        conn.execute(gatilho)
+
+
+def garantir_gatilhos_fontes(conn: sqlite3.Connection):
+    """
+    Recria os gatilhos de um banco que já tem o índice, para que a versão gravada nele seja a
+    atual; os importadores chamam antes de escrever em questoes. Banco sem índice fica como está.
+    """
+    marcadores = ','.join('?' * len(GATILHOS_FONTES))
+    if conn.execute(f"SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name IN ({marcadores})",
+                    tuple(GATILHOS_FONTES)).fetchone() is not None:
+        _recriar_gatilhos(conn)
+
+
+def _indice_mantido(conn: sqlite3.Connection) -> bool:
+    """Se o índice existe e os gatilhos estão anotando as mudanças em questoes"""
+    marcadores = ','.join('?' * len(GATILHOS_FONTES))
+    return conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({marcadores})", tuple(GATILHOS_FONTES)
+    ).fetchone()[0] == len(GATILHOS_FONTES)
+
+
+def atualizar_fontes(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Aplica no índice só as questões anotadas pelos gatilhos; sem índice (ou sem os gatilhos), remonta.
+
+    Uma questão que sai do documento deixa a posição para a última do mesmo documento, de modo
+    que as posições continuam de 0 a quantidade-1 sem renumerar as demais. Roda na transação
+    de quem chama.
+
+    Returns:
+        Quantidade de questões por documento
+    """
+    if not _indice_mantido(conn):
+        return indexar_fontes(conn)
+    quantidades: Dict[str, int] = dict(conn.execute('SELECT documento, quantidade FROM fontes_documentos'))
+    pendentes = [linha[0] for linha in conn.execute('SELECT questao_id FROM fontes_pendentes ORDER BY questao_id')]
+    alterados = set()
+
+    for parte in em_partes(pendentes):
+        marcadores = ','.join('?' * len(parte))
+        fontes = dict(conn.execute(f'SELECT id, fonte FROM questoes WHERE id IN ({marcadores})', parte))
+        for questao_id in parte:
+            # Posição lida agora: uma pendente anterior pode ter movido esta para o seu lugar
+            indexada = conn.execute('SELECT documento, posicao FROM fontes_questoes WHERE questao_id = ?',
+                                    (questao_id,)).fetchone()
+            if indexada is not None:
+                documento, posicao = indexada
+                ultima = quantidades[documento] - 1
+                conn.execute('DELETE FROM fontes_questoes WHERE questao_id = ?', (questao_id,))
+                if posicao != ultima:
+                    conn.execute('UPDATE fontes_questoes SET posicao = ? WHERE documento = ? AND posicao = ?',
+                                 (posicao, documento, ultima))
+                quantidades[documento] = ultima
+                alterados.add(documento)
+            if questao_id in fontes:
+                documento, artigo = normalizar_fonte(fontes[questao_id])
+                posicao = quantidades.get(documento, 0)
+                conn.execute('INSERT INTO fontes_questoes (questao_id, documento, artigo, posicao) VALUES (?, ?, ?, ?)',
+                             (questao_id, documento, artigo, posicao))
+                quantidades[documento] = posicao + 1
+                alterados.add(documento)
+
+    conn.executemany('DELETE FROM fontes_documentos WHERE documento = ?',
+                     [(documento,) for documento in alterados if not quantidades[documento]])
+    conn.executemany('INSERT OR REPLACE INTO fontes_documentos (documento, quantidade) VALUES (?, ?)',
+                     [(documento, quantidades[documento]) for documento in alterados if quantidades[documento]])
+    conn.execute('DELETE FROM fontes_pendentes')
+    return {documento: quantidade for documento, quantidade in quantidades.items() if quantidade}
+
+
+def ler_indice_fontes(conn: sqlite3.Connection) -> Optional[Dict[str, int]]:
+    """
+    Quantidade de questões por documento, lida do índice sem escrever nada no banco.
+
+    None se o índice não existe, se o banco não tem os gatilhos que o mantêm ou se há mudanças
+    em questoes que nenhum importador aplicou ainda; aí vale agrupar_por_documento.
+    """
+    if not _indice_mantido(conn):
+        return None
+    if conn.execute('SELECT 1 FROM fontes_pendentes LIMIT 1').fetchone() is not None:
+        return None
+    return dict(conn.execute('SELECT documento, quantidade FROM fontes_documentos'))
+
+
+def agrupar_por_documento(conn: sqlite3.Connection) -> Dict[str, List[int]]:
+    """
+    Ids das questões de cada documento, na ordem de id: a mesma numeração de posições do índice,
+    montada em memória para bancos que ninguém indexou
+    """
+    por_documento: Dict[str, List[int]] = {}
+    for questao_id, fonte in conn.execute('SELECT id, fonte FROM questoes ORDER BY id'):
+        por_documento.setdefault(documento_da_fonte(fonte), []).append(questao_id)
+    return por_documento
+
+
+def ids_por_posicoes(conn: sqlite3.Connection, documento: str, posicoes: Sequence[int]) -> List[int]:
+    """Ids das questões nas posições do documento, na ordem das posições"""
+    por_posicao: Dict[int, int] = {}
+    # Provas grandes em partes, abaixo do limite de parâmetros do SQLite
+    for parte in em_partes(list(posicoes)):
+        marcadores = ','.join('?' * len(parte))
+        por_posicao.update(conn.execute(
+            f'SELECT posicao, questao_id FROM fontes_questoes WHERE documento = ? AND posicao IN ({marcadores})',
+            (documento, *parte),
+        ))
+    return [por_posicao[posicao] for posicao in posicoes if posicao in por_posicao]
+
+
+def dividir_cotas(cotas: Mapping[str, int], quantidades: Sequence[Mapping[str, int]],
+                  rng: random.Random) -> List[Dict[str, List[int]]]:
+    """
+    Sorteia as posições de cada cota entre os bancos que têm o documento.
+
+    A cota é sorteada sobre as questões de todos os bancos juntos (posição global) e cada
+    posição volta para o banco dono dela; quem tem mais questões do documento contribui mais.
+    Documento com menos questões que a cota entra com todas.
+
+    Args:
+        cotas: Documento (normalizado ou não) -> quantidade de questões
+        quantidades: Questões por documento de cada banco, na ordem dos bancos
+        rng: Gerador do sorteio
+
+    Returns:
+        Para cada banco, documento -> posições sorteadas
+    """
+    normalizadas: Dict[str, int] = {}
+    for documento, cota in cotas.items():
+        documento = documento_da_fonte(documento)
+        normalizadas[documento] = normalizadas.get(documento, 0) + cota
+
+    por_banco: List[Dict[str, List[int]]] = [{} for _ in quantidades]
+    for documento, cota in normalizadas.items():
+        disponiveis = [quantidade.get(documento, 0) for quantidade in quantidades]
+        for posicao in rng.sample(range(sum(disponiveis)), min(cota, sum(disponiveis))):
+            for banco, disponivel in enumerate(disponiveis):
+                if posicao < disponivel:
+                    por_banco[banco].setdefault(documento, []).append(posicao)
+                    break
+                posicao -= disponivel
+    return por_banco
+
+
+def ler_cotas(especificacao: Iterable[str]) -> Dict[str, int]:
+    """Cotas no formato 'ICA 100-37=12' (uma por item), somadas quando o documento se repete"""
+    cotas: Dict[str, int] = {}
+    for item in especificacao:
+        documento, separador, quantidade = item.rpartition('=')
+        if not separador or not documento.strip() or not quantidade.strip().isdigit():
+            raise ValueError(f"Cota inválida: {item!r} (use 'DOCUMENTO=QUANTIDADE')")
+        documento = documento_da_fonte(documento)
+        cotas[documento] = cotas.get(documento, 0) + int(quantidade)
+    return cotas
+
+
+def main(argv=None):
+    """Lista os documentos de cada banco ou monta uma prova por cotas"""
+    import argparse
+
+    from repositorio import abrir_repositorio, fechar_repositorios, montar_prova
+
+    parser = argparse.ArgumentParser(description="Índice de fontes: documentos por banco e provas por cotas.")
+    parser.add_argument('bancos', nargs='+', help="Bancos .db")
+    parser.add_argument('--prova', nargs='+', metavar='DOCUMENTO=QUANTIDADE',
+                        help="Cotas da prova, ex.: 'ICA 100-37=12' 'ICA 100-12=8'")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        if not args.prova:
+            for banco in args.bancos:
+                documentos = abrir_repositorio(banco).documentos()
+                print(f"{banco}: {sum(documentos.values())} questões em {len(documentos)} documentos")
+                for documento, quantidade in sorted(documentos.items(), key=lambda item: (-item[1], item[0])):
+                    print(f"  {quantidade:>8}  {documento or '(sem fonte)'}")
+            return
+
+        cotas = ler_cotas(args.prova)
+        prova = montar_prova(cotas, args.bancos, args.seed)
+        por_documento: Dict[str, int] = {}
+        for banco, questao in prova:
+            documento = documento_da_fonte(questao.fonte)
+            por_documento[documento] = por_documento.get(documento, 0) + 1
+            print(f"{banco}  #{questao.id:<8} {questao.fonte}")
+        for documento, cota in cotas.items():
+            obtidas = por_documento.get(documento, 0)
+            if obtidas < cota:
+                print(f"{documento}: {obtidas} de {cota} questões (o documento não tem mais)")
+    finally:
+        fechar_repositorios()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+"""
+Intercâmbio de questões em lote
+Leitura e escrita em fluxo de JSONL e CSV para a tabela questoes; a importação roda numa transação só,
+com pragmas relaxados, índices e busca por tema refeitos depois da carga e validação por lote
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from itertools import islice
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from busca import GATILHOS, TABELA_FTS, garantir_indice_texto
+from amostragem import em_partes
+from fontes import GATILHOS_FONTES, indexar_fontes
+from rastreio import trecho
+
+# Mesma ordem das tuplas do QuestaoParser e do hash_questao
+CAMPOS = ('numero', 'enunciado', 'alternativa_a', 'alternativa_b', 'alternativa_c', 'alternativa_d',
+          'gabarito', 'fonte')
+# O número pode faltar: bancos do importador antigo de específicas não têm nenhum
+OBRIGATORIOS = CAMPOS[1:7]
+GABARITOS = frozenset('abcd')
+_SO_TEXTO = {str}
+FORMATOS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+
+TAMANHO_LOTE = 10_000
+# Linhas inválidas detalhadas no relatório; as demais só entram na contagem
+LIMITE_ERROS = 20
+
+# Mesmo esquema criado pelo importador de TXT
+SQL_CRIAR = '''
+    CREATE TABLE IF NOT EXISTS questoes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        numero TEXT,                -- NULL quando a questão não tem número: não colide no UNIQUE
+        enunciado TEXT NOT NULL,
+        alternativa_a TEXT NOT NULL,
+        alternativa_b TEXT NOT NULL,
+        alternativa_c TEXT NOT NULL,
+        alternativa_d TEXT NOT NULL,
+        gabarito TEXT NOT NULL,
+        fonte TEXT,
+        hash TEXT,
+        arquivo TEXT,
+        UNIQUE(numero, fonte)
+    )
+'''
+# Índices secundários: removidos durante a carga e recriados no fim, na mesma transação.
+# Ficam o do UNIQUE(numero, fonte), que decide o UPSERT, e o do hash, que decide
+# se uma questão sem essa chave já está no banco.
+SQL_INDICE_HASH = 'CREATE INDEX IF NOT EXISTS idx_questoes_hash ON questoes(hash)'
+INDICES = {
+    'idx_questoes_arquivo': 'CREATE INDEX idx_questoes_arquivo ON questoes(arquivo)',
+    'idx_questoes_fonte': 'CREATE INDEX idx_questoes_fonte ON questoes(fonte)',
+}
+# Atualiza no lugar (mantendo o id, a que question_stats e eventos_resposta se referem) só quando o
+# conteúdo mudou e a questão é do mesmo arquivo ou de antes do manifesto, como no importador de TXT
+SQL_INSERIR = f'''
+    INSERT INTO questoes ({', '.join(CAMPOS)}, hash, arquivo)
+    VALUES ({', '.join('?' * (len(CAMPOS) + 2))})
+    ON CONFLICT (numero, fonte) DO UPDATE SET
+        {', '.join(f'{campo} = excluded.{campo}' for campo in (*CAMPOS[1:], 'hash', 'arquivo'))}
+    WHERE (questoes.arquivo IS NULL OR questoes.arquivo = excluded.arquivo)
+      AND questoes.hash IS NOT excluded.hash
+'''
+# Questões sem (numero, fonte) único entram só se o conteúdo ainda não estiver no banco
+SQL_INSERIR_NOVA = f'''
+    INSERT INTO questoes ({', '.join(CAMPOS)}, hash, arquivo)
+    SELECT {', '.join('?' * (len(CAMPOS) + 2))}
+    WHERE NOT EXISTS (SELECT 1 FROM questoes WHERE hash = ?)
+'''
+SQL_EXPORTAR = f'SELECT id, {", ".join(CAMPOS)} FROM questoes ORDER BY id'
+
+# Só durante a importação: sem fsync e journal em memória; a transação única ainda pode ser desfeita
+PRAGMAS_CARGA = (
+    'PRAGMA synchronous=OFF',
+    'PRAGMA cache_size=-262144',   # ~256 MB de cache de páginas
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+class RelatorioImportacao(NamedTuple):
+    lidas: int
+    importadas: int
+    invalidas: int
+    erros: List[Tuple[int, str]]   # (linha do arquivo, motivo), até LIMITE_ERROS
+    segundos: float
+    duplicadas: int = 0            # conteúdo já no banco: nada foi gravado
+    conflitos: int = 0             # (numero, fonte) de uma questão de outro arquivo, que foi mantida
+
+
+class RelatorioExportacao(NamedTuple):
+    exportadas: int
+    recusadas: int
+    erros: List[Tuple[int, str]]   # (id da questão, motivo), até LIMITE_ERROS
+
+
+SEPARADOR_HASH = '\x1f'
+
+
+def hash_questao(questao: Tuple) -> str:
+    """
+    Hash do conteúdo de uma questão.
+
+    Args:
+        questao: Tupla (numero, enunciado, a, b, c, d, gabarito, fonte)
+
+    Returns:
+        Digest hexadecimal de 32 caracteres
+    """
+    conteudo = SEPARADOR_HASH.join('' if campo is None else str(campo) for campo in questao)
+    return hashlib.blake2b(conteudo.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _hash_textos(questao: Tuple[str, ...]) -> str:
+    """hash_questao para a questão já validada e sem fonte nula, sem converter campo a campo"""
+    return hashlib.blake2b(SEPARADOR_HASH.join(questao).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def formato_de(caminho: str) -> str:
+    formato = FORMATOS.get(Path(caminho).suffix.lower())
+    if formato is None:
+        raise ValueError(f"Formato não reconhecido pela extensão: {caminho} (use .jsonl ou .csv)")
+    return formato
+
+
+# --------------------- Leitores ---------------------
+def ler_jsonl(caminho: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """(linha, objeto) de cada linha não vazia; JSON inválido ou que não seja objeto vem como None"""
+    decodificar = json.JSONDecoder().decode
+    with open(caminho, encoding='utf-8-sig') as arquivo:
+        for numero_linha, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue
+            try:
+                registro = decodificar(linha)
+            except ValueError:
+                registro = None
+            yield numero_linha, registro if isinstance(registro, dict) else None
+
+
+def ler_csv(caminho: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """(linha, registro) de um CSV com cabeçalho; vírgula, ponto e vírgula (Excel em português) ou tab"""
+    with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+        amostra = arquivo.read(1 << 16)
+        arquivo.seek(0)
+        try:
+            delimitador = csv.Sniffer().sniff(amostra.split('\n', 1)[0], delimiters=',;\t').delimiter
+        except csv.Error:
+            delimitador = ','
+        # Só o delimitador vem do cabeçalho: aspas e aspas dobradas ("") seguem o padrão do Excel,
+        # que o cabeçalho sem aspas não deixa o Sniffer adivinhar
+        leitor = csv.DictReader(arquivo, delimiter=delimitador)
+        leitor.fieldnames = [nome.strip().lower() for nome in leitor.fieldnames or ()]
+        faltando = [campo for campo in OBRIGATORIOS if campo not in leitor.fieldnames]
+        if faltando:
+            raise ValueError(f"{caminho}: colunas ausentes no cabeçalho: {', '.join(faltando)}")
+        for registro in leitor:
+            # A linha física onde o registro termina; textos com quebra de linha ocupam várias
+            yield leitor.line_num, registro
+
+
+LEITORES = {'jsonl': ler_jsonl, 'csv': ler_csv}
+
+
+def _normalizar(valores: list) -> Optional[str]:
+    """
+    Confere e normaliza, no lugar, os valores de uma questão na ordem de CAMPOS.
+
+    O gabarito pode vir como letra ou como o texto de uma das alternativas, que vira a letra dela.
+
+    Returns:
+        O motivo da recusa, ou None se a questão é válida
+    """
+    textos = valores[:7]
+    if set(map(type, textos)) != _SO_TEXTO:
+        # Números vindos do JSON (ex.: "numero": 12) viram texto; ausentes, texto vazio
+        textos = valores[:7] = ['' if valor is None else str(valor) for valor in textos]
+    if valores[7] is not None and type(valores[7]) is not str:
+        valores[7] = str(valores[7])
+    if not all(map(str.strip, textos[1:])):
+        vazios = [campo for campo, valor in zip(OBRIGATORIOS, textos[1:]) if not valor.strip()]
+        return f"campos vazios: {', '.join(vazios)}"
+    gabarito = textos[6].strip().lower()
+    if gabarito not in GABARITOS:
+        alternativas = [alternativa.strip().casefold() for alternativa in textos[2:6]]
+        resposta = textos[6].strip().casefold()
+        if alternativas.count(resposta) != 1:
+            return f"gabarito inválido: {textos[6]!r}"
+        gabarito = 'abcd'[alternativas.index(resposta)]
+    valores[6] = gabarito
+    return None
+
+
+def validar_lote(lote: Iterable[Tuple[int, Optional[dict]]]) -> Tuple[List[Tuple[int, tuple]], List[Tuple[int, str]]]:
+    """Separa as linhas válidas (linha, tupla na ordem de CAMPOS) das inválidas (linha, motivo)"""
+    validas = []
+    invalidas = []
+    for numero_linha, registro in lote:
+        if registro is None:
+            invalidas.append((numero_linha, "JSON inválido ou não é um objeto"))
+            continue
+        valores = list(map(registro.get, CAMPOS))
+        motivo = _normalizar(valores)
+        if motivo is None:
+            validas.append((numero_linha, tuple(valores)))
+        else:
+            invalidas.append((numero_linha, motivo))
+    return validas, invalidas
+
+
+# --------------------- Importação ---------------------
+def _tem_fts(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABELA_FTS,)
+    ).fetchone() is not None
+
+
+def tem_chave_numero_fonte(conn: sqlite3.Connection) -> bool:
+    """Se a tabela questoes tem UNIQUE(numero, fonte); o banco antigo de específicas não tem"""
+    for _, nome, unico, *_ in conn.execute('PRAGMA index_list(questoes)'):
+        if unico and [linha[2] for linha in conn.execute(f'PRAGMA index_info("{nome}")')] == ['numero', 'fonte']:
+            return True
+    return False
+
+
+def _inserir_por_hash(conn: sqlite3.Connection, linhas: List[Tuple[int, tuple]], chave_unica: bool,
+                      numero_nulo: bool) -> Tuple[int, int, List[Tuple[int, str]]]:
+    """
+    Insere as questões cujo hash ainda não está no banco.
+
+    Sob UNIQUE(numero, fonte) a questão sem número entra com numero NULL, que não colide com
+    nenhuma outra; se a coluna não aceita NULL, só cabe uma questão sem número por fonte.
+
+    Returns:
+        (inseridas, já existentes, recusadas como (linha do arquivo, motivo))
+    """
+    nulo = chave_unica and numero_nulo
+    parametros = [
+        (None if nulo and not linha[0].strip() else linha[0], *linha[1:], linha[8]) for _, linha in linhas
+    ]
+    if not chave_unica or numero_nulo:
+        inseridas = conn.executemany(SQL_INSERIR_NOVA, parametros).rowcount
+        return inseridas, len(linhas) - inseridas, []
+
+    inseridas = 0
+    recusadas: List[Tuple[int, str]] = []
+    for (numero_linha, linha), valores in zip(linhas, parametros):
+        try:
+            inseridas += conn.execute(SQL_INSERIR_NOVA, valores).rowcount
+        except sqlite3.IntegrityError:
+            recusadas.append((numero_linha, f"sem numero e com a fonte de outra questão sem numero "
+                                            f"({linha[7]!r}); o banco exige (numero, fonte) único"))
+    return inseridas, len(linhas) - inseridas - len(recusadas), recusadas
+
+
+def _contar_hashes(conn: sqlite3.Connection, hashes: List[str]) -> int:
+    """Quantos dos hashes já estão no banco"""
+    total = 0
+    for parte in em_partes(hashes):
+        total += conn.execute(
+            f'SELECT COUNT(*) FROM questoes WHERE hash IN ({",".join("?" * len(parte))})', parte
+        ).fetchone()[0]
+    return total
+
+
+def importar(origem: str, banco: str, formato: Optional[str] = None,
+             tamanho_lote: int = TAMANHO_LOTE) -> RelatorioImportacao:
+    """
+    Carrega um arquivo JSONL ou CSV na tabela questoes do banco (criada se preciso).
+
+    Tudo acontece numa transação: índices secundários e gatilhos da busca saem antes da carga e
+    voltam depois dela, com o índice FTS e o de fontes reconstruídos de uma vez. Linhas inválidas são puladas e
+    relatadas; uma falha no meio desfaz a importação inteira.
+
+    Com número, a questão atualiza no lugar a de mesmo (numero, fonte), se o conteúdo mudou e ela
+    veio do mesmo arquivo (ou de antes do manifesto); a de outro arquivo fica e a nova vira
+    conflito. Sem número, ou num banco sem essa chave única, ela só entra se o hash do conteúdo
+    ainda não estiver no banco. Reimportar o mesmo arquivo não grava nada.
+    """
+    inicio = time.perf_counter()
+    registros = LEITORES[formato or formato_de(origem)](origem)
+    arquivo = str(Path(origem).resolve())
+
+    conn = sqlite3.connect(banco, isolation_level=None)
+    try:
+        modo_journal = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        sincronia = conn.execute('PRAGMA synchronous').fetchone()[0]
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        for pragma in PRAGMAS_CARGA:
+            conn.execute(pragma)
+
+        lidas = importadas = invalidas = duplicadas = conflitos = 0
+        erros: List[Tuple[int, str]] = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(SQL_CRIAR)
+            # Bancos anteriores ao importador com manifesto não têm hash/arquivo
+            colunas = {linha[1]: linha[3] for linha in conn.execute('PRAGMA table_info(questoes)')}
+            for coluna in ('hash', 'arquivo'):
+                if coluna not in colunas:
+                    conn.execute(f'ALTER TABLE questoes ADD COLUMN {coluna} TEXT')
+            conn.execute(SQL_INDICE_HASH)
+            # Sem os hashes das questões antigas a deduplicação não as enxergaria
+            conn.executemany('UPDATE questoes SET hash = ? WHERE id = ?', [
+                (hash_questao(linha[1:]), linha[0])
+                for linha in conn.execute(f'SELECT id, {", ".join(CAMPOS)} FROM questoes WHERE hash IS NULL')
+            ])
+            chave_unica = tem_chave_numero_fonte(conn)
+            numero_nulo = not colunas['numero']
+            # Carga sem manter índices secundários, o FTS nem o índice de fontes linha a linha
+            for nome in INDICES:
+                conn.execute(f'DROP INDEX IF EXISTS {nome}')
+            for gatilho in ('questoes_fts_ai', 'questoes_fts_ad', 'questoes_fts_au', *GATILHOS_FONTES):
+                conn.execute(f'DROP TRIGGER IF EXISTS {gatilho}')
+
+            while True:
+                with trecho('intercambio.leitura'):
+                    lote = list(islice(registros, tamanho_lote))
+                if not lote:
+                    break
+                lidas += len(lote)
+                with trecho('intercambio.validacao'):
+                    validas, rejeitadas = validar_lote(lote)
+                    linhas = [
+                        (numero_linha, (*questao,
+                                        _hash_textos(questao) if questao[7] is not None else hash_questao(questao),
+                                        arquivo))
+                        for numero_linha, questao in validas
+                    ]
+                invalidas += len(rejeitadas)
+                erros.extend(rejeitadas[:LIMITE_ERROS - len(erros)])
+                with trecho('intercambio.gravacao'):
+                    if chave_unica:
+                        com_numero = [linha for _, linha in linhas if linha[0].strip()]
+                        gravadas = conn.executemany(SQL_INSERIR, com_numero).rowcount
+                        importadas += gravadas
+                        if gravadas < len(com_numero):
+                            # As não gravadas são iguais às do banco ou de outro arquivo; as gravadas
+                            # também já têm o hash no banco e saem da conta
+                            hashes = list({linha[8] for linha in com_numero})
+                            iguais = min(max(_contar_hashes(conn, hashes) - gravadas, 0), len(com_numero) - gravadas)
+                            duplicadas += iguais
+                            conflitos += len(com_numero) - gravadas - iguais
+                        sem_numero = [(numero_linha, linha) for numero_linha, linha in linhas if not linha[0].strip()]
+                    else:
+                        sem_numero = linhas
+                    if sem_numero:
+                        inseridas, repetidas, recusadas = _inserir_por_hash(conn, sem_numero, chave_unica, numero_nulo)
+                        importadas += inseridas
+                        duplicadas += repetidas
+                        invalidas += len(recusadas)
+                        erros.extend(recusadas[:LIMITE_ERROS - len(erros)])
+
+            with trecho('intercambio.indices'):
+                for sql in INDICES.values():
+                    conn.execute(sql)
+            with trecho('intercambio.busca'):
+                if _tem_fts(conn):
+                    conn.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+                    for gatilho in GATILHOS:
+                        conn.execute(gatilho)
+                else:
+                    garantir_indice_texto(conn)
+            with trecho('intercambio.fontes'):
+                # Remonta de uma vez e recria os gatilhos
+                indexar_fontes(conn)
+            with trecho('intercambio.commit'):
+                conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.execute(f'PRAGMA synchronous={sincronia}')
+            conn.execute(f'PRAGMA journal_mode={modo_journal}')
+    finally:
+        conn.close()
+
+    return RelatorioImportacao(lidas, importadas, invalidas, erros, time.perf_counter() - inicio, duplicadas,
+                               conflitos)
+
+
+# --------------------- Exportação ---------------------
+# Objeto JSON de uma linha com as chaves de CAMPOS: só os valores são codificados a cada questão
+_MODELO_JSONL = '{{' + ', '.join(f'"{campo}": {{}}' for campo in CAMPOS) + '}}\n'
+
+
+def _valor_json(valor) -> str:
+    return encode_basestring(valor) if type(valor) is str else json.dumps(valor, ensure_ascii=False)
+
+
+def escrever_jsonl(linhas: Iterable[tuple], caminho: str) -> int:
+    modelo = _MODELO_JSONL.format
+    total = 0
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        iterador = iter(linhas)
+        while True:
+            lote = list(islice(iterador, TAMANHO_LOTE))
+            if not lote:
+                break
+            arquivo.writelines(modelo(*map(_valor_json, linha)) for linha in lote)
+            total += len(lote)
+    return total
+
+
+def escrever_csv(linhas: Iterable[tuple], caminho: str) -> int:
+    """CSV com cabeçalho, em UTF-8 com BOM para o Excel reconhecer os acentos"""
+    total = 0
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(CAMPOS)
+        iterador = iter(linhas)
+        while True:
+            lote = list(islice(iterador, TAMANHO_LOTE))
+            if not lote:
+                break
+            escritor.writerows(lote)
+            total += len(lote)
+    return total
+
+
+ESCRITORES = {'jsonl': escrever_jsonl, 'csv': escrever_csv}
+
+
+def exportar(banco: str, destino: str, formato: Optional[str] = None) -> RelatorioExportacao:
+    """
+    Grava as questões do banco, na ordem dos ids, num arquivo JSONL ou CSV.
+
+    Passam pela mesma validação da importação: o arquivo sai normalizado (gabarito em letra) e as
+    questões que importar recusaria ficam de fora e vão para o relatório.
+    """
+    escrever = ESCRITORES[formato or formato_de(destino)]
+    recusadas: List[Tuple[int, str]] = []
+
+    def validas(cursor: sqlite3.Cursor) -> Iterator[tuple]:
+        for questao_id, *valores in cursor:
+            motivo = _normalizar(valores)
+            if motivo is None:
+                yield tuple(valores)
+            else:
+                recusadas.append((questao_id, motivo))
+
+    conn = sqlite3.connect(f'{Path(banco).resolve().as_uri()}?mode=ro', uri=True)
+    try:
+        exportadas = escrever(validas(conn.execute(SQL_EXPORTAR)), destino)
+    finally:
+        conn.close()
+    return RelatorioExportacao(exportadas, len(recusadas), recusadas[:LIMITE_ERROS])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa e exporta questões em JSONL ou CSV.")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    importacao = comandos.add_parser('importar', help="arquivo .jsonl/.csv -> banco")
+    importacao.add_argument('origem')
+    importacao.add_argument('banco')
+    importacao.add_argument('--formato', choices=sorted(LEITORES))
+    importacao.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Linhas validadas e gravadas por vez")
+    exportacao = comandos.add_parser('exportar', help="banco -> arquivo .jsonl/.csv")
+    exportacao.add_argument('banco')
+    exportacao.add_argument('destino')
+    exportacao.add_argument('--formato', choices=sorted(ESCRITORES))
+    args = parser.parse_args(argv)
+
+    if args.comando == 'exportar':
+        inicio = time.perf_counter()
+        exportacao = exportar(args.banco, args.destino, args.formato)
+        print(f"{exportacao.exportadas} questões exportadas para {args.destino} "
+              f"em {time.perf_counter() - inicio:.1f}s")
+        if exportacao.recusadas:
+            print(f"{exportacao.recusadas} questões inválidas ficaram de fora:")
+            for questao_id, motivo in exportacao.erros:
+                print(f"  id {questao_id}: {motivo}")
+            if exportacao.recusadas > len(exportacao.erros):
+                print(f"  ... e mais {exportacao.recusadas - len(exportacao.erros)}")
+        sys.exit(1 if exportacao.recusadas else 0)
+
+    relatorio = importar(args.origem, args.banco, args.formato, args.lote)
+    print(f"{relatorio.importadas} de {relatorio.lidas} questões importadas em {args.banco} "
+          f"({relatorio.segundos:.1f}s)")
+    if relatorio.duplicadas:
+        print(f"{relatorio.duplicadas} questões já estavam no banco e não foram repetidas")
+    if relatorio.conflitos:
+        print(f"{relatorio.conflitos} questões com (numero, fonte) de outro arquivo não foram gravadas")
+    if relatorio.invalidas:
+        print(f"{relatorio.invalidas} linhas inválidas ignoradas:")
+        for numero_linha, motivo in relatorio.erros:
+            print(f"  linha {numero_linha}: {motivo}")
+        if relatorio.invalidas > len(relatorio.erros):
+            print(f"  ... e mais {relatorio.invalidas - len(relatorio.erros)}")
+    sys.exit(1 if relatorio.invalidas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Medição de texto quebrado por palavra
+Conta as linhas que um texto ocupa num widget Text com wrap=WORD, com cache LRU das medições
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Descrição de fonte no formato do Tk, ex.: ("Arial", 12) ou ("Arial", 11, "bold")
+Fonte = Tuple
+
+TAMANHO_CACHE_LINHAS = 4096
+TAMANHO_CACHE_PALAVRAS = 16384
+
+
+class MedidorTexto:
+    """Conta linhas quebradas usando Font.measure, memorizando por (texto, largura, fonte)"""
+
+    def __init__(self, root: tk.Misc):
+        self.root = root
+        self._fontes: Dict[Fonte, tkfont.Font] = {}
+        # Os caches são por instância para não prender a janela depois de destruída
+        self.contar_linhas = lru_cache(maxsize=TAMANHO_CACHE_LINHAS)(self._contar_linhas)
+        self._largura_palavra = lru_cache(maxsize=TAMANHO_CACHE_PALAVRAS)(self._medir)
+
+    def fonte(self, descricao: Fonte) -> tkfont.Font:
+        if descricao not in self._fontes:
+            self._fontes[descricao] = tkfont.Font(root=self.root, font=descricao)
+        return self._fontes[descricao]
+
+    def _medir(self, palavra: str, descricao: Fonte) -> int:
+        return self.fonte(descricao).measure(palavra)
+
+    def _contar_linhas(self, texto: str, largura: int, descricao: Fonte) -> int:
+        """Simula a quebra por palavra do Tk: palavra que não cabe vai para a linha seguinte"""
+        if largura <= 0:
+            return texto.count('\n') + 1
+
+        espaco = self._largura_palavra(' ', descricao)
+        total = 0
+        for paragrafo in texto.split('\n'):
+            linhas = 1
+            ocupado = 0
+            for palavra in paragrafo.split():
+                medida = self._largura_palavra(palavra, descricao)
+                if ocupado and ocupado + espaco + medida > largura:
+                    linhas += 1
+                    ocupado = 0
+                if medida > largura:
+                    # Palavra maior que a linha é quebrada por caractere
+                    extras, resto = divmod(medida, largura)
+                    linhas += extras - (0 if resto else 1)
+                    ocupado = resto or largura
+                else:
+                    ocupado += (espaco if ocupado else 0) + medida
+            total += linhas
+        return total
+
+    def largura_util(self, widget: tk.Text, descricao: Fonte) -> int:
+        """Largura em pixels disponível para o texto dentro do widget"""
+        borda = 2 * (int(widget.cget('borderwidth')) + int(widget.cget('padx'))
+                     + int(widget.cget('highlightthickness')))
+        largura = widget.winfo_width()
+        if largura <= 1:
+            # Widget ainda não mapeado: usa a largura configurada em caracteres
+            return int(widget.cget('width')) * self._largura_palavra('0', descricao)
+        return largura - borda
+
+    def limpar(self):
+        self.contar_linhas.cache_clear()
+        self._largura_palavra.cache_clear()
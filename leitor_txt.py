@@ -0,0 +1,247 @@
+"""
+Leitor dos bancos em TXT
+Um parser só para os arquivos de questões gerais e específicas: padrões compilados uma vez, uma passada
+linear, gabarito antes ou depois da fonte, "Gabarito:" ou "Resposta:" e blocos malformados descartados
+e relatados, com a leitura retomada no número da questão seguinte
+"""
+
+import os
+import re
+import sys
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Cada linha (já sem espaços nas pontas) é classificada por um único match:
+#   separador    ==========            abre ou fecha uma seção de título, descartada inteira
+#   numero       01                    início de questão
+#   alternativa  a) texto              letra em 'letra', texto em 'alternativa'
+#   gabarito     Gabarito: “c”.        também "Resposta: C", com ou sem aspas
+LINHA = re.compile(r'''
+      (?P<separador>={3,})$
+    | (?P<numero>\d+)$
+    | (?P<letra>[a-eA-E])\)\s*(?P<alternativa>.*)
+    | (?:[Gg]abarito|[Rr]esposta)\s*:\s*["“”'‘’]?\s*(?P<gabarito>[a-dA-D])(?![^\W\d_])
+''', re.VERBOSE)
+
+LETRAS = 'abcd'
+
+# Estados da leitura
+_FORA = 0           # entre questões (ou descartando um bloco malformado até o próximo número)
+_ENUNCIADO = 1
+_ALTERNATIVAS = 2
+_FECHAMENTO = 3     # depois do d): gabarito e fonte, em qualquer ordem
+
+
+def ler_linhas(caminho: str, inicio: int = 0, fim: Optional[int] = None) -> Iterator[str]:
+    """
+    Linhas do arquivo sem a quebra final; UTF-8 (com ou sem BOM) e, linha a linha, latin-1 se falhar.
+
+    Com inicio/fim, só as linhas que começam no trecho [inicio, fim) em bytes (ver dividir_arquivo)
+    """
+    with open(caminho, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        posicao = inicio
+        codificacao = 'utf-8-sig'   # só na primeira linha
+        for bruta in arquivo:
+            if fim is not None and posicao >= fim:
+                break
+            posicao += len(bruta)
+            try:
+                linha = bruta.decode(codificacao)
+            except UnicodeDecodeError:
+                linha = bruta.decode('latin-1')
+            codificacao = 'utf-8'
+            yield linha.rstrip('\n\r')
+
+
+def dividir_arquivo(caminho: str, tamanho: int) -> List[Tuple[int, int]]:
+    """
+    Trechos (inicio, fim) em bytes de cerca de `tamanho`, para ler em paralelo.
+
+    Cada corte fica no começo de uma linha só com o número da questão precedida de linha em
+    branco: ali o leitor sempre começa uma questão nova, então ler os trechos um a um dá as
+    mesmas questões que ler o arquivo inteiro. Só o arquivo é lido, e só perto dos cortes.
+    """
+    total = os.path.getsize(caminho)
+    trechos = []
+    inicio = 0
+    with open(caminho, 'rb') as arquivo:
+        while inicio + tamanho < total:
+            arquivo.seek(inicio + tamanho)
+            arquivo.readline()              # resto da linha onde o corte caiu
+            corte = None
+            anterior_vazia = False
+            while True:
+                posicao = arquivo.tell()
+                bruta = arquivo.readline()
+                if not bruta:
+                    break
+                texto = bruta.strip()
+                if anterior_vazia and texto.isdigit():
+                    corte = posicao
+                    break
+                anterior_vazia = not texto
+            if corte is None:
+                break
+            trechos.append((inicio, corte))
+            inicio = corte
+    trechos.append((inicio, total))
+    return trechos
+
+
+def ler_questoes(linhas: Iterable[str],
+                 erros: Optional[List[Tuple[int, str]]] = None) -> Iterator[Tuple[str, ...]]:
+    """
+    Monta as questões numa passada só, sem guardar mais que a questão corrente.
+
+    Args:
+        linhas: Linhas do arquivo, na ordem
+        erros: Lista que recebe (linha do arquivo, motivo) de cada bloco descartado e de cada
+            linha ignorada fora de uma questão
+
+    Yields:
+        Tuplas (numero, enunciado, a, b, c, d, gabarito, fonte); a fonte pode vir vazia
+    """
+    classificar = LINHA.match
+    estado = _FORA
+    secao = False
+    anterior_vazia = True
+    inicio = 0
+    numero = gabarito = fonte = ""
+    enunciado: List[str] = []
+    alternativas: List[str] = []
+
+    def descartar(numero_linha: int, motivo: str):
+        if erros is not None:
+            erros.append((numero_linha, f"questão {numero or '?'} (linha {inicio}): {motivo}"))
+
+    for numero_linha, linha in enumerate(linhas, 1):
+        texto = linha.strip()
+        if not texto:
+            if estado == _FECHAMENTO:
+                # Linha em branco fecha a questão; a fonte é opcional, o gabarito não
+                if gabarito:
+                    yield (numero, ' '.join(enunciado), *alternativas, gabarito, fonte)
+                else:
+                    descartar(numero_linha, "sem gabarito")
+                estado = _FORA
+            anterior_vazia = True
+            continue
+
+        m = classificar(texto)
+        tipo = m.lastgroup if m else None
+
+        if tipo == 'separador':
+            if estado != _FORA:
+                descartar(numero_linha, "interrompida por um separador")
+                estado = _FORA
+            secao = not secao
+            anterior_vazia = True
+            continue
+        if secao:
+            continue
+
+        if estado == _FORA and tipo != 'numero':
+            # Nada fora de uma questão some sem aviso: sobras de um bloco descartado também entram
+            if erros is not None:
+                erros.append((numero_linha, f"linha fora de questão: {texto[:40]!r}"))
+            anterior_vazia = False
+            continue
+
+        if estado == _FECHAMENTO:
+            if tipo == 'gabarito' and not gabarito:
+                gabarito = m.group('gabarito').lower()
+                if not fonte:
+                    anterior_vazia = False
+                    continue
+            elif tipo == 'numero' and gabarito:
+                # Próxima questão colada, sem linha em branco nem fonte
+                yield (numero, ' '.join(enunciado), *alternativas, gabarito, fonte)
+                estado = _FORA
+            elif tipo is None and not fonte:
+                fonte = texto
+                if not gabarito:
+                    anterior_vazia = False
+                    continue
+            else:
+                descartar(numero_linha, f"linha inesperada depois das alternativas: {texto[:40]!r}")
+                estado = _FORA
+                anterior_vazia = False
+                if tipo != 'numero':
+                    continue
+
+            if estado == _FECHAMENTO:
+                # Gabarito e fonte completos
+                yield (numero, ' '.join(enunciado), *alternativas, gabarito, fonte)
+                estado = _FORA
+                anterior_vazia = False
+                continue
+
+        if estado == _ENUNCIADO:
+            if tipo == 'alternativa' and m.group('letra') in 'aA':
+                if not enunciado:
+                    descartar(numero_linha, "sem enunciado")
+                    estado = _FORA
+                else:
+                    alternativas.append(m.group('alternativa'))
+                    estado = _ALTERNATIVAS
+            elif tipo == 'numero' and anterior_vazia and enunciado:
+                descartar(numero_linha, "sem alternativas")
+                estado = _FORA
+            else:
+                enunciado.append(texto)
+
+        elif estado == _ALTERNATIVAS:
+            # Vale a posição, não a letra: os TXT têm "c)" repetido e "e)" no lugar do "d)"
+            if tipo == 'alternativa':
+                alternativas.append(m.group('alternativa'))
+                if len(alternativas) == len(LETRAS):
+                    if not all(alternativas):
+                        descartar(numero_linha, "alternativa vazia")
+                        estado = _FORA
+                    else:
+                        estado = _FECHAMENTO
+            else:
+                esperada = LETRAS[len(alternativas)]
+                descartar(numero_linha, f"esperada a alternativa {esperada}), encontrado {texto[:40]!r}")
+                estado = _FORA
+
+        if estado == _FORA and tipo == 'numero':
+            # Início de questão; também é onde a leitura se ressincroniza depois de um bloco descartado
+            numero = texto
+            inicio = numero_linha
+            gabarito = fonte = ""
+            enunciado = []
+            alternativas = []
+            estado = _ENUNCIADO
+        anterior_vazia = False
+
+    if estado == _FECHAMENTO and gabarito:
+        yield (numero, ' '.join(enunciado), *alternativas, gabarito, fonte)
+    elif estado != _FORA:
+        descartar(numero_linha, "arquivo terminou no meio da questão")
+
+
+def ler_arquivo(caminho: str, erros: Optional[List[Tuple[int, str]]] = None) -> Iterator[Tuple[str, ...]]:
+    """ler_questoes direto de um arquivo TXT"""
+    return ler_questoes(ler_linhas(caminho), erros)
+
+
+def main(argv=None):
+    """Confere arquivos TXT sem importar: conta as questões e lista os blocos descartados"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("uso: python leitor_txt.py ARQUIVO.txt [...]")
+        sys.exit(2)
+    total_erros = 0
+    for caminho in argv:
+        erros: List[Tuple[int, str]] = []
+        questoes = sum(1 for _ in ler_arquivo(caminho, erros))
+        print(f"{caminho}: {questoes} questões, {len(erros)} linhas com problema")
+        for numero_linha, motivo in erros:
+            print(f"  linha {numero_linha}: {motivo}")
+        total_erros += len(erros)
+    sys.exit(1 if total_erros else 0)
+
+
+if __name__ == "__main__":
+    main()
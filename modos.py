@@ -0,0 +1,14 @@
+"""
+Modos de sessão
+Constantes leves, importadas pelas telas iniciais sem carregar o motor do quiz
+"""
+
+MODO_SORTEIO = 'sorteio'
+MODO_REVISAO = 'revisao'
+MODO_ADAPTATIVO = 'adaptativo'
+NOMES_MODOS = {
+    MODO_SORTEIO: "Sorteio (60% específicas / 40% gerais)",
+    MODO_REVISAO: "Revisão (repetição espaçada)",
+    MODO_ADAPTATIVO: "Adaptativo (dificuldade ajustada)",
+}
+MODOS_POR_NOME = {nome: modo for modo, nome in NOMES_MODOS.items()}
@@ -0,0 +1,325 @@
+"""
+Pacote binário de questões
+Um banco compilado num arquivo só (cabeçalho, tabelas de largura fixa e textos UTF-8), lido por mmap
+"""
+
+import argparse
+import json
+import mmap
+import random
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from repositorio import Questao
+
+MAGICO = b'QPAK'
+VERSAO = 1
+
+# magico, versão, colunas, quantidade e a posição de cada seção no arquivo
+CABECALHO = struct.Struct('<4sHHQQQQQQQ')
+
+# Tipo de cada valor, para devolver ao SQLite exatamente o que saiu dele
+NULO, TEXTO, INTEIRO, REAL, BLOB = range(5)
+
+_CAMPOS_QUESTAO = Questao._fields[1:]
+
+
+def _alinhar(arquivo, multiplo: int = 8):
+    excesso = arquivo.tell() % multiplo
+    if excesso:
+        arquivo.write(b'\0' * (multiplo - excesso))
+
+
+def _codificar(valor) -> Tuple[int, bytes]:
+    if valor is None:
+        return NULO, b''
+    if isinstance(valor, str):
+        return TEXTO, valor.encode('utf-8')
+    if isinstance(valor, int):
+        return INTEIRO, str(valor).encode('ascii')
+    if isinstance(valor, float):
+        return REAL, repr(valor).encode('ascii')
+    return BLOB, bytes(valor)
+
+
+def _decodificar(tipo: int, dados: bytes):
+    if tipo == TEXTO:
+        return dados.decode('utf-8')
+    if tipo == NULO:
+        return None
+    if tipo == INTEIRO:
+        return int(dados)
+    if tipo == REAL:
+        return float(dados)
+    return dados
+
+
+# --------------------- Exportação ---------------------
+def exportar(banco: str, destino: str) -> int:
+    """
+    Compila a tabela questoes do banco em um pacote; devolve a quantidade de questões.
+
+    Seções, nesta ordem: metadados (JSON com o esquema), ids ordenados (int64),
+    tipos de cada valor (1 byte por coluna), início de cada valor no bloco de textos
+    (uint64, mais um final) e o bloco de textos.
+    """
+    if sys.byteorder != 'little':
+        raise RuntimeError("O formato do pacote é little-endian")
+
+    conn = sqlite3.connect(f'{Path(banco).resolve().as_uri()}?mode=ro', uri=True)
+    try:
+        esquema = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'questoes'"
+        ).fetchone()
+        if esquema is None:
+            raise ValueError(f"{banco} não tem a tabela questoes")
+        indices = [linha[0] for linha in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'questoes' "
+            "AND sql IS NOT NULL ORDER BY name"
+        )]
+        try:
+            sequencia = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'questoes'").fetchone()
+        except sqlite3.OperationalError:
+            sequencia = None
+        cursor = conn.execute('SELECT * FROM questoes ORDER BY id')
+        colunas = [descricao[0] for descricao in cursor.description]
+        if colunas[0] != 'id':
+            raise ValueError("A primeira coluna de questoes deve ser id")
+        colunas_texto = colunas[1:]
+
+        ids = array('q')
+        tipos = bytearray()
+        inicios = array('Q')
+        with tempfile.TemporaryFile() as textos:
+            posicao = 0
+            for questao_id, *valores in cursor:
+                ids.append(questao_id)
+                for valor in valores:
+                    tipo, dados = _codificar(valor)
+                    tipos.append(tipo)
+                    inicios.append(posicao)
+                    textos.write(dados)
+                    posicao += len(dados)
+            inicios.append(posicao)
+
+            metadados = json.dumps({
+                'colunas': colunas,
+                'esquema': esquema[0],
+                'indices': indices,
+                'sequencia': sequencia[0] if sequencia else None,
+            }, ensure_ascii=False).encode('utf-8')
+
+            with open(destino, 'wb') as saida:
+                saida.write(b'\0' * CABECALHO.size)
+                _alinhar(saida)
+                pos_metadados = saida.tell()
+                saida.write(metadados)
+                _alinhar(saida)
+                pos_ids = saida.tell()
+                ids.tofile(saida)
+                pos_tipos = saida.tell()
+                saida.write(tipos)
+                _alinhar(saida)
+                pos_inicios = saida.tell()
+                inicios.tofile(saida)
+                pos_textos = saida.tell()
+                textos.seek(0)
+                shutil.copyfileobj(textos, saida)
+
+                saida.seek(0)
+                saida.write(CABECALHO.pack(
+                    MAGICO, VERSAO, len(colunas_texto), len(ids),
+                    pos_metadados, len(metadados), pos_ids, pos_tipos, pos_inicios, pos_textos
+                ))
+        return len(ids)
+    finally:
+        conn.close()
+
+
+# --------------------- Leitura ---------------------
+class QuestionPack:
+    """
+    Pacote aberto por mmap: abrir custa o mesmo para qualquer tamanho, e só as
+    páginas dos valores efetivamente lidos entram na memória.
+    """
+
+    def __init__(self, caminho: str):
+        if sys.byteorder != 'little':
+            raise RuntimeError("O formato do pacote é little-endian")
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'rb')
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._mapa, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            # O quiz lê questões espalhadas: sem leitura antecipada, só as páginas tocadas são carregadas
+            self._mapa.madvise(mmap.MADV_RANDOM)
+        self._lock = threading.Lock()
+
+        (magico, versao, self.num_colunas, self.quantidade, pos_metadados, tam_metadados,
+         pos_ids, pos_tipos, pos_inicios, pos_textos) = CABECALHO.unpack_from(self._mapa)
+        if magico != MAGICO:
+            raise ValueError(f"{caminho} não é um pacote de questões")
+        if versao != VERSAO:
+            raise ValueError(f"Versão {versao} do pacote não suportada")
+
+        self.metadados = json.loads(self._mapa[pos_metadados:pos_metadados + tam_metadados])
+        self.colunas: List[str] = self.metadados['colunas']
+        celulas = self.quantidade * self.num_colunas
+
+        visao = memoryview(self._mapa)
+        self._ids = visao[pos_ids:pos_ids + self.quantidade * 8].cast('q')
+        self._tipos = visao[pos_tipos:pos_tipos + celulas]
+        self._inicios = visao[pos_inicios:pos_inicios + (celulas + 1) * 8].cast('Q')
+        self._textos = visao[pos_textos:]
+        # Posição de cada campo de Questao entre as colunas do pacote
+        self._posicoes_questao = [self.colunas.index(campo) - 1 for campo in _CAMPOS_QUESTAO]
+
+    def __len__(self) -> int:
+        return self.quantidade
+
+    def __enter__(self) -> 'QuestionPack':
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    def indice_de(self, questao_id: int) -> Optional[int]:
+        """Posição da questão no pacote, por busca binária nos ids ordenados"""
+        posicao = bisect_left(self._ids, questao_id)
+        if posicao < self.quantidade and self._ids[posicao] == questao_id:
+            return posicao
+        return None
+
+    def valor(self, indice: int, coluna: int):
+        """Decodifica só um valor (coluna contada depois do id)"""
+        celula = indice * self.num_colunas + coluna
+        inicio, fim = self._inicios[celula], self._inicios[celula + 1]
+        return _decodificar(self._tipos[celula], bytes(self._textos[inicio:fim]))
+
+    def campo(self, indice: int, nome: str):
+        return self.valor(indice, self.colunas.index(nome) - 1)
+
+    def linha(self, indice: int) -> tuple:
+        """A linha completa, com todas as colunas da tabela de origem"""
+        return (self._ids[indice], *(self.valor(indice, coluna) for coluna in range(self.num_colunas)))
+
+    def questao(self, indice: int) -> Questao:
+        return Questao(self._ids[indice], *(self.valor(indice, coluna) for coluna in self._posicoes_questao))
+
+    def por_id(self, questao_id: int) -> Optional[Questao]:
+        indice = self.indice_de(questao_id)
+        return self.questao(indice) if indice is not None else None
+
+    def por_ids(self, ids: Sequence[int]) -> List[Questao]:
+        """Busca várias questões, preservando a ordem dos ids"""
+        indices = (self.indice_de(questao_id) for questao_id in ids)
+        return [self.questao(indice) for indice in indices if indice is not None]
+
+    def contar(self) -> int:
+        return self.quantidade
+
+    def sortear(self, k: int, rng: random.Random) -> List[Questao]:
+        """Sorteia k questões decodificando apenas as escolhidas"""
+        return [self.questao(indice) for indice in rng.sample(range(self.quantidade), min(k, self.quantidade))]
+
+    def linhas(self) -> Iterator[tuple]:
+        for indice in range(self.quantidade):
+            yield self.linha(indice)
+
+    def fechar(self):
+        with self._lock:
+            if self._mapa.closed:
+                return
+            self._ids.release()
+            self._tipos.release()
+            self._inicios.release()
+            self._textos.release()
+            self._mapa.close()
+            self._arquivo.close()
+
+
+def importar(pacote: str, banco: str) -> int:
+    """Recria a tabela questoes (esquema, índices e sequência) num banco novo a partir do pacote"""
+    with QuestionPack(pacote) as leitor:
+        conn = sqlite3.connect(banco)
+        try:
+            conn.execute(leitor.metadados['esquema'])
+            marcadores = ', '.join('?' * len(leitor.colunas))
+            conn.executemany(f'INSERT INTO questoes VALUES ({marcadores})', leitor.linhas())
+            for indice in leitor.metadados['indices']:
+                conn.execute(indice)
+            if leitor.metadados['sequencia'] is not None:
+                conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'questoes'",
+                             (leitor.metadados['sequencia'],))
+            conn.commit()
+        finally:
+            conn.close()
+        return len(leitor)
+
+
+def comparar(banco: str, pacote: str) -> bool:
+    """Confere, valor a valor e com os mesmos tipos, se o pacote reproduz o banco"""
+    conn = sqlite3.connect(f'{Path(banco).resolve().as_uri()}?mode=ro', uri=True)
+    try:
+        with QuestionPack(pacote) as leitor:
+            linhas = conn.execute('SELECT * FROM questoes ORDER BY id')
+            total = 0
+            for original, copia in zip(linhas, leitor.linhas()):
+                if [(type(v), v) for v in original] != [(type(v), v) for v in copia]:
+                    return False
+                total += 1
+            return total == len(leitor) and conn.execute('SELECT COUNT(*) FROM questoes').fetchone()[0] == total
+    finally:
+        conn.close()
+
+
+# --------------------- Pacotes compartilhados ---------------------
+_pacotes: Dict[str, QuestionPack] = {}
+_pacotes_lock = threading.Lock()
+
+
+def abrir_pacote(caminho: str) -> QuestionPack:
+    """Devolve o pacote já mapeado, abrindo o arquivo só na primeira vez"""
+    with _pacotes_lock:
+        pacote = _pacotes.get(caminho)
+        if pacote is None:
+            pacote = QuestionPack(caminho)
+            _pacotes[caminho] = pacote
+        return pacote
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila bancos de questões em pacotes binários e vice-versa.")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    exportacao = comandos.add_parser('exportar', help="banco .db -> pacote")
+    exportacao.add_argument('banco')
+    exportacao.add_argument('pacote')
+    importacao = comandos.add_parser('importar', help="pacote -> banco .db novo")
+    importacao.add_argument('pacote')
+    importacao.add_argument('banco')
+    verificacao = comandos.add_parser('verificar', help="confere se o pacote reproduz o banco")
+    verificacao.add_argument('banco')
+    verificacao.add_argument('pacote')
+    args = parser.parse_args(argv)
+
+    if args.comando == 'exportar':
+        print(f"{exportar(args.banco, args.pacote)} questões exportadas para {args.pacote}")
+    elif args.comando == 'importar':
+        if Path(args.banco).exists():
+            parser.error(f"{args.banco} já existe")
+        print(f"{importar(args.pacote, args.banco)} questões importadas em {args.banco}")
+    else:
+        iguais = comparar(args.banco, args.pacote)
+        print("Pacote idêntico ao banco" if iguais else "Pacote diverge do banco")
+        sys.exit(0 if iguais else 1)
+
+
+if __name__ == "__main__":
+    main()
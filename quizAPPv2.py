@@ -1,18 +1,13 @@
 #QUIZaPP
 
-import sqlite3
-import random
+import getpass
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-# --------------------- Carrega questões dos bancos ---------------------
-def carregar_questoes(banco):
-    conn = sqlite3.connect(banco)
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, fonte, gabarito FROM questoes')
-    questoes = cursor.fetchall()
-    conn.close()
-    return questoes
+from modos import MODO_ADAPTATIVO, MODO_REVISAO, MODO_SORTEIO, MODOS_POR_NOME, NOMES_MODOS
+from precarga import BankPreloader, sonda
+from rastreio import rastreado, trecho
+from telas import ScreenManager
 
 # --------------------- Configuração da janela ---------------------
 def configurar_janela(janela, titulo="Quiz TGE APP 2025"):
@@ -36,9 +31,9 @@ def configurar_janela(janela, titulo="Quiz TGE APP 2025"):
 
 # --------------------- Tela Inicial ---------------------
 class TelaInicial:
-    def __init__(self, master):
+    def __init__(self, master, gerenciador):
         self.master = master
-        self.largura, self.altura = configurar_janela(master)
+        self.gerenciador = gerenciador
 
         # Container principal centralizado
         main_frame = tk.Frame(master, bg="#1e1e1e")
@@ -60,45 +55,99 @@ class TelaInicial:
                                    values=opcoes, font=("Arial", 12), state="readonly", width=15)
         self.dropdown.pack(pady=15)
 
+        tk.Label(center_frame, text="Filtrar por tema (opcional):",
+                 font=("Arial", 14), bg="#1e1e1e", fg="#cccccc").pack(pady=(15, 5))
+        self.tema = tk.StringVar()
+        tk.Entry(center_frame, textvariable=self.tema, font=("Arial", 12), width=30).pack(pady=5)
+
+        tk.Label(center_frame, text="Modo:", font=("Arial", 14), bg="#1e1e1e", fg="#cccccc").pack(pady=(10, 5))
+        self.modo = tk.StringVar(value=NOMES_MODOS[MODO_SORTEIO])
+        ttk.Combobox(center_frame, textvariable=self.modo, values=list(NOMES_MODOS.values()),
+                     font=("Arial", 12), state="readonly", width=35).pack(pady=5)
+
         tk.Button(center_frame, text="Iniciar Quiz", font=("Arial", 14, "bold"), 
                  bg="#333333", fg="#ffffff", width=20, height=2, 
                  command=self.iniciar_quiz).pack(pady=30)
 
+        # Motor do quiz e bancos carregados em segundo plano enquanto esta tela está visível
+        self.status = tk.Label(center_frame, text="Carregando bancos de questões...", font=("Arial", 11),
+                               bg="#1e1e1e", fg="#888888")
+        self.status.pack()
+        self.precarga = BankPreloader(gerenciador.root, ('questoesEspecificas.db', 'questoesGerais.db'),
+                                      ao_concluir=self.bancos_carregados)
+        self.precarga.iniciar()
+        sonda.marcar('tela_inicial')
+
+    def bancos_carregados(self, erros):
+        if erros:
+            self.status.config(text="Falha ao abrir: " + ", ".join(banco or "motor do quiz" for banco in erros))
+        else:
+            self.status.config(text="Bancos prontos")
+
     def iniciar_quiz(self):
+        sonda.marcar('clique')
         total = self.quantidade.get()
         if total <= 0:
             messagebox.showerror("Erro", "Escolha uma quantidade válida.")
             return
-        self.master.destroy()
-        QuizApp(total)
+        if self.gerenciador.tela('quiz').iniciar(total, tema=self.tema.get().strip() or None,
+                                                 modo=MODOS_POR_NOME[self.modo.get()]):
+            self.gerenciador.mostrar('quiz')
 
 # --------------------- Quiz Principal ---------------------
 class QuizApp:
-    def __init__(self, total_questoes):
+    def __init__(self, master, gerenciador, largura):
+        self.master = master
+        self.root = gerenciador.root
+        self.gerenciador = gerenciador
+        self.largura = largura
+        self.sessao = None
+        self.quiz_ativo = False
+        self.popup = None
+
+        # Os widgets são criados uma única vez e reaproveitados a cada quiz
+        self.criar_interface()
+
+    def iniciar(self, total_questoes, seed=None, tema=None, modo=MODO_SORTEIO):
+        # Importados só agora: a tela inicial abre sem o motor, que a pré-carga já trouxe em segundo plano
+        from eventos import abrir_log
+        from sessao import QuizSession
+
         self.total_questoes = total_questoes
-        self.acertos = 0
-        self.indice = 0
-        self.questoes = self.preparar_questoes()
+        self.seed = seed
+        self.tema = tema
+        if modo == MODO_REVISAO:
+            # Vencidas do usuário primeiro, depois questões novas; o tema não se aplica
+            self.sessao = QuizSession.revisao(total_questoes, getpass.getuser(), 'questoesEspecificas.db',
+                                              'questoesGerais.db', seed=seed, registro=abrir_log())
+        elif modo == MODO_ADAPTATIVO:
+            # Cada questão é escolhida pelo nível estimado nas respostas anteriores; o tema não se aplica
+            self.sessao = QuizSession.adaptativa(total_questoes, 'questoesEspecificas.db', 'questoesGerais.db',
+                                                 seed=seed, registro=abrir_log())
+        else:
+            self.sessao = QuizSession.de_selecao(self.preparar_questoes(), registro=abrir_log())
+        if self.sessao.total == 0:
+            if tema and modo == MODO_SORTEIO:
+                messagebox.showerror("Erro", f"Nenhuma questão encontrada para o tema \"{tema}\".")
+            else:
+                messagebox.showerror("Erro", "Nenhuma questão disponível nos bancos de questões.")
+            return False
         self.quiz_ativo = True
 
-        self.root = tk.Tk()
-        self.largura, self.altura = configurar_janela(self.root, "Quiz TGE APP 2025")
-        
-        # Configurar o que acontece quando a janela é fechada
-        self.root.protocol("WM_DELETE_WINDOW", self.fechar_quiz)
-
-        self.criar_interface()
+        self.progress.config(maximum=self.sessao.total)
         self.mostrar_questao()
-        self.root.mainloop()
+        sonda.marcar('primeira_questao', desde='clique')
+        return True
 
+    @rastreado('criar_interface')
     def criar_interface(self):
         # Frame principal
-        main_frame = tk.Frame(self.root, bg="#1e1e1e")
+        main_frame = tk.Frame(self.master, bg="#1e1e1e")
         main_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Barra de progresso
         self.progress = ttk.Progressbar(main_frame, length=self.largura-100, 
-                                      mode='determinate', maximum=len(self.questoes))
+                                      mode='determinate')
         self.progress.pack(pady=20)
 
         # Label da pergunta
@@ -130,95 +179,116 @@ class QuizApp:
             btn.pack(pady=8, padx=30, fill="x")
             self.botoes[letra] = btn
 
+    @rastreado('preparar_questoes')
     def preparar_questoes(self):
-        especificas = carregar_questoes('questoesEspecificas.db')
-        gerais = carregar_questoes('questoesGerais.db')
-        random.shuffle(especificas)
-        random.shuffle(gerais)
-
-        num_especificas = int(self.total_questoes * 0.6)
-        num_gerais = self.total_questoes - num_especificas
-
-        selecionadas = especificas[:num_especificas] + gerais[:num_gerais]
-        random.shuffle(selecionadas)
-        return selecionadas
+        # Sorteia só as linhas necessárias em cada banco (60% específicas / 40% gerais),
+        # restritas ao tema quando houver filtro
+        from repositorio import montar_selecao_por_banco
+        return montar_selecao_por_banco(self.total_questoes, 'questoesEspecificas.db', 'questoesGerais.db',
+                                        seed=self.seed, tema=self.tema)
 
     def mostrar_questao(self):
         if not self.quiz_ativo:
             return
             
-        if self.indice >= len(self.questoes):
+        questao = self.sessao.questao_atual()
+        if questao is None:
             self.finalizar_quiz()
             return
 
-        questao = self.questoes[self.indice]
-        _, numero, enunciado, a, b, c, d, fonte, gabarito = questao
-        self.gabarito_correto = gabarito
+        # A última chamada finaliza o quiz com um diálogo; só o desenho da questão entra no trecho
+        with trecho('mostrar_questao'):
+            _, numero, enunciado, a, b, c, d, fonte, _ = questao
 
-        self.pergunta_label.config(text=f"Pergunta {self.indice + 1} de {len(self.questoes)}: {enunciado}\n\nFonte: {fonte}")
+            self.pergunta_label.config(text=f"Pergunta {self.sessao.indice + 1} de {self.sessao.total}: {enunciado}\n\nFonte: {fonte}")
         
-        self.botoes['a'].config(text=f"A) {a}")
-        self.botoes['b'].config(text=f"B) {b}")
-        self.botoes['c'].config(text=f"C) {c}")
-        self.botoes['d'].config(text=f"D) {d}")
+            self.botoes['a'].config(text=f"A) {a}")
+            self.botoes['b'].config(text=f"B) {b}")
+            self.botoes['c'].config(text=f"C) {c}")
+            self.botoes['d'].config(text=f"D) {d}")
 
-        self.progress['value'] = self.indice
+            self.progress['value'] = self.sessao.indice
 
     def responder(self, resposta):
         if not self.quiz_ativo:
             return
             
-        if resposta == self.gabarito_correto:
-            self.acertos += 1
+        # O diálogo de resultado espera o aluno e fica fora do trecho
+        with trecho('responder'):
+            avaliada = self.sessao.responder(resposta)
+        if avaliada.correta:
             self.mostrar_popup_resultado("✅ Correto!", "info")
         else:
-            self.mostrar_popup_resultado(f"❌ Errado. Resposta correta: {self.gabarito_correto}", "error")
+            self.mostrar_popup_resultado(f"❌ Errado. Resposta correta: {avaliada.gabarito}", "error")
         self.proxima_questao()
 
-    def mostrar_popup_resultado(self, mensagem, tipo):
-        # Criar janela personalizada para o resultado
+    def criar_popup_resultado(self):
+        # Uma única janela de resultado, criada na primeira resposta e reaproveitada nas seguintes;
+        # um Toplevel novo por resposta acumulava janelas e callbacks de after num dia inteiro de sessões
         popup = tk.Toplevel(self.root)
+        popup.withdraw()
         popup.title("Resultado")
         popup.configure(bg="#1e1e1e")
-        
+        popup.protocol("WM_DELETE_WINDOW", self.esconder_popup_resultado)
+
         # Configurar tamanho da janela
         largura_popup = 400
         altura_popup = 120
-        
+
         # Obter dimensões da tela
         largura_tela = popup.winfo_screenwidth()
         altura_tela = popup.winfo_screenheight()
-        
+
         # Calcular posição: centralizado horizontalmente, 10 pixels acima do limite inferior
         pos_x = (largura_tela - largura_popup) // 2
         pos_y = altura_tela - altura_popup - 10
-        
+
         popup.geometry(f"{largura_popup}x{altura_popup}+{pos_x}+{pos_y}")
-        
-        # Tornar a janela modal
         popup.transient(self.root)
-        popup.grab_set()
-        
-        # Cor de fundo baseada no tipo
-        cor_fundo = "#2d5a2d" if tipo == "info" else "#5a2d2d"
-        popup.configure(bg=cor_fundo)
-        
+
         # Conteúdo da janela
-        tk.Label(popup, text=mensagem, font=("Arial", 12, "bold"), 
-                bg=cor_fundo, fg="#ffffff", justify="center").pack(pady=20)
-        
+        self.popup_label = tk.Label(popup, text="", font=("Arial", 12, "bold"),
+                                    fg="#ffffff", justify="center")
+        self.popup_label.pack(pady=20)
+
         # Botão OK
-        tk.Button(popup, text="OK", font=("Arial", 11, "bold"), 
-                 bg="#333333", fg="#ffffff", width=10,
-                 command=popup.destroy).pack(pady=10)
-        
+        self.popup_botao = tk.Button(popup, text="OK", font=("Arial", 11, "bold"),
+                                     bg="#333333", fg="#ffffff", width=10,
+                                     command=self.esconder_popup_resultado)
+        self.popup_botao.pack(pady=10)
+
+        self.popup = popup
+        self.popup_fechamento = None
+
+    def mostrar_popup_resultado(self, mensagem, tipo):
+        if self.popup is None:
+            self.criar_popup_resultado()
+        elif self.popup_fechamento is not None:
+            # Resposta dada antes do fechamento automático da anterior
+            self.popup.after_cancel(self.popup_fechamento)
+
+        # Cor de fundo baseada no tipo
+        cor_fundo = "#2d5a2d" if tipo == "info" else "#5a2d2d"
+        self.popup.configure(bg=cor_fundo)
+        self.popup_label.config(text=mensagem, bg=cor_fundo)
+
+        # Tornar a janela modal
+        self.popup.deiconify()
+        self.popup.grab_set()
+
         # Fechar automaticamente após 3 segundos
-        popup.after(3000, lambda: popup.destroy() if popup.winfo_exists() else None)
+        self.popup_fechamento = self.popup.after(3000, self.esconder_popup_resultado)
+
+    def esconder_popup_resultado(self):
+        if self.popup_fechamento is not None:
+            self.popup.after_cancel(self.popup_fechamento)
+            self.popup_fechamento = None
+        self.popup.grab_release()
+        self.popup.withdraw()
 
     def proxima_questao(self):
         if not self.quiz_ativo:
             return
-        self.indice += 1
         self.mostrar_questao()
 
     def finalizar_quiz(self):
@@ -227,75 +297,80 @@ class QuizApp:
             
         self.quiz_ativo = False
         
-        percentual = (self.acertos / len(self.questoes)) * 100
+        final = self.sessao.resultado()
         resultado = f"Quiz Finalizado!\n\n"
-        resultado += f"Você acertou {self.acertos} de {len(self.questoes)} questões.\n"
-        resultado += f"Percentual de acerto: {percentual:.1f}%"
-        
-        if percentual >= 70:
-            resultado += "\n\n🎉 Parabéns! Excelente desempenho!"
-        elif percentual >= 50:
-            resultado += "\n\n👍 Bom trabalho! Continue estudando!"
-        else:
-            resultado += "\n\n📚 Continue estudando para melhorar!"
+        resultado += f"Você acertou {final.acertos} de {final.total} questões.\n"
+        resultado += f"Percentual de acerto: {final.percentual:.1f}%"
+        resultado += f"\n\n{final.mensagem}"
         
         # Criar diálogo personalizado com opção de tentar novamente
-        self.mostrar_resultado_final(resultado, percentual)
+        self.mostrar_resultado_final(resultado, final.percentual)
 
     def mostrar_resultado_final(self, resultado, percentual):
-        # Criar janela personalizada para o resultado
-        resultado_window = tk.Toplevel(self.root)
-        resultado_window.title("Resultado Final")
-        resultado_window.configure(bg="#1e1e1e")
-        
-        # Centralizar a janela de resultado
-        largura_resultado = 400
-        altura_resultado = 300
-        pos_x = (self.root.winfo_screenwidth() - largura_resultado) // 2
-        pos_y = (self.root.winfo_screenheight() - altura_resultado) // 2
-        resultado_window.geometry(f"{largura_resultado}x{altura_resultado}+{pos_x}+{pos_y}")
-        
-        # Tornar a janela modal
-        resultado_window.transient(self.root)
-        resultado_window.grab_set()
-        
-        # Conteúdo da janela
-        tk.Label(resultado_window, text=resultado, font=("Arial", 12), 
-                bg="#1e1e1e", fg="#ffffff", justify="center").pack(pady=30)
+        tela = self.gerenciador.tela('resultado')
+        tela.exibir(resultado)
+        self.gerenciador.mostrar('resultado')
+
+    def fechar_quiz(self):
+        self.quiz_ativo = False
+        self.gerenciador.fechar()
+
+# --------------------- Resultado Final ---------------------
+class TelaResultado:
+    def __init__(self, master, gerenciador):
+        self.master = master
+        self.gerenciador = gerenciador
+
+        # Container para centralizar conteúdo
+        center_frame = tk.Frame(master, bg="#1e1e1e")
+        center_frame.pack(expand=True)
+
+        # Conteúdo da tela
+        self.resultado_label = tk.Label(center_frame, text="", font=("Arial", 12), 
+                                      bg="#1e1e1e", fg="#ffffff", justify="center")
+        self.resultado_label.pack(pady=30)
         
         # Frame para os botões
-        botoes_frame = tk.Frame(resultado_window, bg="#1e1e1e")
+        botoes_frame = tk.Frame(center_frame, bg="#1e1e1e")
         botoes_frame.pack(pady=20)
         
         # Botão Tentar Novamente
         tk.Button(botoes_frame, text="Tentar Novamente", font=("Arial", 12, "bold"), 
                  bg="#4CAF50", fg="#ffffff", width=15, height=2,
-                 command=lambda: self.tentar_novamente(resultado_window)).pack(side="left", padx=10)
+                 command=self.tentar_novamente).pack(side="left", padx=10)
         
         # Botão Sair
         tk.Button(botoes_frame, text="Sair", font=("Arial", 12, "bold"), 
                  bg="#f44336", fg="#ffffff", width=15, height=2,
-                 command=lambda: self.sair_aplicacao(resultado_window)).pack(side="right", padx=10)
+                 command=self.sair_aplicacao).pack(side="right", padx=10)
 
-    def tentar_novamente(self, resultado_window):
-        resultado_window.destroy()
-        self.fechar_quiz()
-        # Reiniciar o aplicativo
-        root = tk.Tk()
-        app = TelaInicial(root)
-        root.mainloop()
+    def exibir(self, resultado):
+        self.resultado_label.config(text=resultado)
 
-    def sair_aplicacao(self, resultado_window):
-        resultado_window.destroy()
-        self.fechar_quiz()
+    def tentar_novamente(self):
+        # Volta para a tela inicial na mesma janela, sem criar outro Tk nem outro mainloop
+        self.gerenciador.mostrar('inicio')
 
-    def fechar_quiz(self):
-        self.quiz_ativo = False
-        if self.root:
-            self.root.destroy()
+    def sair_aplicacao(self):
+        self.gerenciador.fechar()
+
+# --------------------- Montagem das Telas ---------------------
+def criar_aplicacao(root):
+    largura, altura = configurar_janela(root, "Quiz TGE APP 2025")
+    gerenciador = ScreenManager(root)
+
+    gerenciador.registrar('inicio', lambda frame: TelaInicial(frame, gerenciador))
+    gerenciador.registrar('quiz', lambda frame: QuizApp(frame, gerenciador, largura))
+    gerenciador.registrar('resultado', lambda frame: TelaResultado(frame, gerenciador))
+
+    # Configurar o que acontece quando a janela é fechada
+    root.protocol("WM_DELETE_WINDOW", gerenciador.fechar)
+
+    gerenciador.mostrar('inicio')
+    return gerenciador
 
 # --------------------- Início do Programa ---------------------
 if __name__ == "__main__":
     root = tk.Tk()
-    app = TelaInicial(root)
+    criar_aplicacao(root)
     root.mainloop()
\ No newline at end of file
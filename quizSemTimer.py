@@ -1,18 +1,13 @@
 # QUIZaPP sem timer (refatorado: janela 70% alinhada à direita)
 
-import sqlite3
-import random
+import getpass
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-# --------------------- Carrega questões dos bancos ---------------------
-def carregar_questoes(banco):
-    conn = sqlite3.connect(banco)
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, fonte, gabarito FROM questoes')
-    questoes = cursor.fetchall()
-    conn.close()
-    return questoes
+from modos import MODO_ADAPTATIVO, MODO_REVISAO, MODO_SORTEIO, MODOS_POR_NOME, NOMES_MODOS
+from precarga import BankPreloader, sonda
+from rastreio import rastreado, trecho
+from telas import ScreenManager
 
 # --------------------- Função para posicionar janela 70% direita ---------------------
 def centralizar_direita(janela, largura_percent=70, altura_percent=80):
@@ -30,11 +25,9 @@ def centralizar_direita(janela, largura_percent=70, altura_percent=80):
 
 # --------------------- Tela Inicial ---------------------
 class TelaInicial:
-    def __init__(self, master):
+    def __init__(self, master, gerenciador):
         self.master = master
-        self.master.title("Quiz TGE APP 2025")
-        centralizar_direita(self.master, 70, 80)
-        self.master.configure(bg="#1e1e1e")
+        self.gerenciador = gerenciador
 
         tk.Label(master, text="Quiz TGE APP 2025", font=("Arial", 16, "bold"), bg="#1e1e1e", fg="#ffffff").pack(pady=20)
         tk.Label(master, text="Escolha a quantidade de questões:", font=("Arial", 12), bg="#1e1e1e", fg="#cccccc").pack(pady=10)
@@ -44,35 +37,58 @@ class TelaInicial:
         self.dropdown = ttk.Combobox(master, textvariable=self.quantidade, values=opcoes, font=("Arial", 11), state="readonly")
         self.dropdown.pack(pady=10)
 
+        tk.Label(master, text="Filtrar por tema (opcional):",
+                 font=("Arial", 12), bg="#1e1e1e", fg="#cccccc").pack(pady=(10, 5))
+        self.tema = tk.StringVar()
+        tk.Entry(master, textvariable=self.tema, font=("Arial", 11), width=30).pack(pady=5)
+
+        tk.Label(master, text="Modo:", font=("Arial", 13), bg="#1e1e1e", fg="#cccccc").pack(pady=(10, 5))
+        self.modo = tk.StringVar(value=NOMES_MODOS[MODO_SORTEIO])
+        ttk.Combobox(master, textvariable=self.modo, values=list(NOMES_MODOS.values()),
+                     font=("Arial", 11), state="readonly", width=35).pack(pady=5)
+
         tk.Button(master, text="Iniciar Quiz", font=("Arial", 12, "bold"), bg="#333333", fg="#ffffff",
                   width=20, command=self.iniciar_quiz).pack(pady=20)
 
+        # Motor do quiz e bancos carregados em segundo plano enquanto esta tela está visível
+        self.status = tk.Label(master, text="Carregando bancos de questões...", font=("Arial", 10),
+                               bg="#1e1e1e", fg="#888888")
+        self.status.pack()
+        self.precarga = BankPreloader(gerenciador.root, ('questoesEspecificas.db', 'questoesGerais.db'),
+                                      ao_concluir=self.bancos_carregados)
+        self.precarga.iniciar()
+        sonda.marcar('tela_inicial')
+
+    def bancos_carregados(self, erros):
+        if erros:
+            self.status.config(text="Falha ao abrir: " + ", ".join(banco or "motor do quiz" for banco in erros))
+        else:
+            self.status.config(text="Bancos prontos")
+
     def iniciar_quiz(self):
+        sonda.marcar('clique')
         total = self.quantidade.get()
         if total <= 0:
             messagebox.showerror("Erro", "Escolha uma quantidade válida.")
             return
-        self.master.destroy()
-        QuizApp(total)
+        if self.gerenciador.tela('quiz').iniciar(total, tema=self.tema.get().strip() or None,
+                                                 modo=MODOS_POR_NOME[self.modo.get()]):
+            self.gerenciador.mostrar('quiz')
 
 # --------------------- Quiz Principal ---------------------
 class QuizApp:
-    def __init__(self, total_questoes):
-        self.total_questoes = total_questoes
-        self.acertos = 0
-        self.indice = 0
-        self.questoes = self.preparar_questoes()
-
-        self.root = tk.Tk()
-        self.root.title("Quiz")
-        centralizar_direita(self.root, 70, 80)
-        self.root.configure(bg="#1e1e1e")
+    def __init__(self, master, gerenciador):
+        self.master = master
+        self.root = gerenciador.root
+        self.gerenciador = gerenciador
+        self.sessao = None
 
-        self.progress = ttk.Progressbar(self.root, length=600, mode='determinate', maximum=len(self.questoes))
+        # Os widgets são criados uma única vez e reaproveitados a cada quiz
+        self.progress = ttk.Progressbar(self.master, length=600, mode='determinate')
         self.progress.pack(pady=15)
 
         #novo metodo de exibição de perguntas
-        self.pergunta_label = tk.Message(self.root, text="", width=800, font=("Arial", 14),
+        self.pergunta_label = tk.Message(self.master, text="", width=800, font=("Arial", 14),
                                  bg="#1e1e1e", fg="#ffffff", justify="left")
         self.pergunta_label.pack(pady=20)
 
@@ -82,62 +98,100 @@ class QuizApp:
 
         self.botoes = {}
         for letra in ['a', 'b', 'c', 'd']:
-            btn = tk.Button(self.root, text="", width=60, font=("Arial", 11), bg="#333333", fg="#ffffff",
+            btn = tk.Button(self.master, text="", width=60, font=("Arial", 11), bg="#333333", fg="#ffffff",
                             command=lambda l=letra: self.responder(l))
             btn.pack(pady=5)
             self.botoes[letra] = btn
 
-        self.mostrar_questao()
-        self.root.mainloop()
+    def iniciar(self, total_questoes, seed=None, tema=None, modo=MODO_SORTEIO):
+        # Importados só agora: a tela inicial abre sem o motor, que a pré-carga já trouxe em segundo plano
+        from eventos import abrir_log
+        from sessao import QuizSession
 
-    def preparar_questoes(self):
-        especificas = carregar_questoes('questoesEspecificas.db')
-        gerais = carregar_questoes('questoesGerais.db')
-        random.shuffle(especificas)
-        random.shuffle(gerais)
+        self.total_questoes = total_questoes
+        self.seed = seed
+        self.tema = tema
+        if modo == MODO_REVISAO:
+            # Vencidas do usuário primeiro, depois questões novas; o tema não se aplica
+            self.sessao = QuizSession.revisao(total_questoes, getpass.getuser(), 'questoesEspecificas.db',
+                                              'questoesGerais.db', seed=seed, registro=abrir_log())
+        elif modo == MODO_ADAPTATIVO:
+            # Cada questão é escolhida pelo nível estimado nas respostas anteriores; o tema não se aplica
+            self.sessao = QuizSession.adaptativa(total_questoes, 'questoesEspecificas.db', 'questoesGerais.db',
+                                                 seed=seed, registro=abrir_log())
+        else:
+            self.sessao = QuizSession.de_selecao(self.preparar_questoes(), registro=abrir_log())
+        if self.sessao.total == 0:
+            if tema and modo == MODO_SORTEIO:
+                messagebox.showerror("Erro", f"Nenhuma questão encontrada para o tema \"{tema}\".")
+            else:
+                messagebox.showerror("Erro", "Nenhuma questão disponível nos bancos de questões.")
+            return False
 
-        num_especificas = int(self.total_questoes * 0.6)
-        num_gerais = self.total_questoes - num_especificas
+        self.root.title("Quiz")
+        self.progress.config(maximum=self.sessao.total)
+        self.mostrar_questao()
+        sonda.marcar('primeira_questao', desde='clique')
+        return True
 
-        selecionadas = especificas[:num_especificas] + gerais[:num_gerais]
-        random.shuffle(selecionadas)
-        return selecionadas
+    @rastreado('preparar_questoes')
+    def preparar_questoes(self):
+        # Sorteia só as linhas necessárias em cada banco (60% específicas / 40% gerais),
+        # restritas ao tema quando houver filtro
+        from repositorio import montar_selecao_por_banco
+        return montar_selecao_por_banco(self.total_questoes, 'questoesEspecificas.db', 'questoesGerais.db',
+                                        seed=self.seed, tema=self.tema)
 
     def mostrar_questao(self):
-        if self.indice >= len(self.questoes):
+        questao = self.sessao.questao_atual()
+        if questao is None:
             self.finalizar_quiz()
             return
 
-        questao = self.questoes[self.indice]
-        _, numero, enunciado, a, b, c, d, fonte, gabarito = questao
-        self.gabarito_correto = gabarito
+        # A última chamada finaliza o quiz com um diálogo; só o desenho da questão entra no trecho
+        with trecho('mostrar_questao'):
+            _, numero, enunciado, a, b, c, d, fonte, _ = questao
 
-        self.pergunta_label.config(text=f"Pergunta {self.indice + 1}: {enunciado}\nFonte: {fonte}")
-        self.botoes['a'].config(text=f"a) {a}")
-        self.botoes['b'].config(text=f"b) {b}")
-        self.botoes['c'].config(text=f"c) {c}")
-        self.botoes['d'].config(text=f"d) {d}")
+            self.pergunta_label.config(text=f"Pergunta {self.sessao.indice + 1}: {enunciado}\nFonte: {fonte}")
+            self.botoes['a'].config(text=f"a) {a}")
+            self.botoes['b'].config(text=f"b) {b}")
+            self.botoes['c'].config(text=f"c) {c}")
+            self.botoes['d'].config(text=f"d) {d}")
 
-        self.progress['value'] = self.indice
+            self.progress['value'] = self.sessao.indice
 
     def responder(self, resposta):
-        if resposta == self.gabarito_correto:
-            self.acertos += 1
+        # O diálogo de resultado espera o aluno e fica fora do trecho
+        with trecho('responder'):
+            avaliada = self.sessao.responder(resposta)
+        if avaliada.correta:
             messagebox.showinfo("Resultado", "✅ Correto!")
         else:
-            messagebox.showerror("Resultado", f"❌ Errado. Resposta correta: {self.gabarito_correto}")
+            messagebox.showerror("Resultado", f"❌ Errado. Resposta correta: {avaliada.gabarito}")
         self.proxima_questao()
 
     def proxima_questao(self):
-        self.indice += 1
         self.mostrar_questao()
 
     def finalizar_quiz(self):
-        messagebox.showinfo("Fim do Quiz", f"Você acertou {self.acertos} de {len(self.questoes)} questões.")
-        self.root.destroy()
+        final = self.sessao.resultado()
+        messagebox.showinfo("Fim do Quiz", f"Você acertou {final.acertos} de {final.total} questões.")
+        self.gerenciador.fechar()
+
+# --------------------- Montagem das Telas ---------------------
+def criar_aplicacao(root):
+    root.title("Quiz TGE APP 2025")
+    centralizar_direita(root, 70, 80)
+    root.configure(bg="#1e1e1e")
+
+    gerenciador = ScreenManager(root)
+    gerenciador.registrar('inicio', lambda frame: TelaInicial(frame, gerenciador))
+    gerenciador.registrar('quiz', lambda frame: QuizApp(frame, gerenciador))
+    gerenciador.mostrar('inicio')
+    return gerenciador
 
 # --------------------- Início do Programa ---------------------
 if __name__ == "__main__":
     root = tk.Tk()
-    app = TelaInicial(root)
+    criar_aplicacao(root)
     root.mainloop()
@@ -1,18 +1,22 @@
 # QUIZaPP sem timer (refatorado: alternativas completas e melhor layout)
 
-import sqlite3
-import random
+import getpass
 import tkinter as tk
+from collections import namedtuple
 from tkinter import ttk, messagebox, scrolledtext
 
-# --------------------- Carrega questões dos bancos ---------------------
-def carregar_questoes(banco):
-    conn = sqlite3.connect(banco)
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, fonte, gabarito FROM questoes')
-    questoes = cursor.fetchall()
-    conn.close()
-    return questoes
+from layout_texto import MedidorTexto
+
+from modos import MODO_ADAPTATIVO, MODO_REVISAO, MODO_SORTEIO, MODOS_POR_NOME, NOMES_MODOS
+from precarga import BankPreloader, sonda
+from rastreio import rastreado, trecho
+from telas import ScreenManager
+
+FONTE_PERGUNTA = ("Arial", 12)
+FONTE_ALTERNATIVA = ("Arial", 11)
+
+# Texto já montado e alturas (em linhas) calculadas para uma questão
+LayoutQuestao = namedtuple('LayoutQuestao', ['questao', 'contador', 'pergunta', 'altura_pergunta', 'alternativas'])
 
 # --------------------- Função para posicionar janela 70% direita ---------------------
 def centralizar_direita(janela, largura_percent=70, altura_percent=80):
@@ -30,11 +34,9 @@ def centralizar_direita(janela, largura_percent=70, altura_percent=80):
 
 # --------------------- Tela Inicial ---------------------
 class TelaInicial:
-    def __init__(self, master):
+    def __init__(self, master, gerenciador):
         self.master = master
-        self.master.title("Quiz TGE APP 2025")
-        centralizar_direita(self.master, 70, 80)
-        self.master.configure(bg="#1e1e1e")
+        self.gerenciador = gerenciador
 
         tk.Label(master, text="Quiz TGE APP 2025", font=("Arial", 16, "bold"), bg="#1e1e1e", fg="#ffffff").pack(pady=20)
         tk.Label(master, text="Escolha a quantidade de questões:", font=("Arial", 12), bg="#1e1e1e", fg="#cccccc").pack(pady=10)
@@ -44,42 +46,101 @@ class TelaInicial:
         self.dropdown = ttk.Combobox(master, textvariable=self.quantidade, values=opcoes, font=("Arial", 11), state="readonly")
         self.dropdown.pack(pady=10)
 
+        tk.Label(master, text="Filtrar por tema (opcional):",
+                 font=("Arial", 12), bg="#1e1e1e", fg="#cccccc").pack(pady=(10, 5))
+        self.tema = tk.StringVar()
+        tk.Entry(master, textvariable=self.tema, font=("Arial", 11), width=30).pack(pady=5)
+
+        tk.Label(master, text="Modo:", font=("Arial", 13), bg="#1e1e1e", fg="#cccccc").pack(pady=(10, 5))
+        self.modo = tk.StringVar(value=NOMES_MODOS[MODO_SORTEIO])
+        ttk.Combobox(master, textvariable=self.modo, values=list(NOMES_MODOS.values()),
+                     font=("Arial", 11), state="readonly", width=35).pack(pady=5)
+
         tk.Button(master, text="Iniciar Quiz", font=("Arial", 12, "bold"), bg="#333333", fg="#ffffff",
                   width=20, command=self.iniciar_quiz).pack(pady=20)
 
+        # Motor do quiz e bancos carregados em segundo plano enquanto esta tela está visível
+        self.status = tk.Label(master, text="Carregando bancos de questões...", font=("Arial", 10),
+                               bg="#1e1e1e", fg="#888888")
+        self.status.pack()
+        self.precarga = BankPreloader(gerenciador.root, ('questoesEspecificas.db', 'questoesGerais.db'),
+                                      ao_concluir=self.bancos_carregados)
+        self.precarga.iniciar()
+        sonda.marcar('tela_inicial')
+
+    def bancos_carregados(self, erros):
+        if erros:
+            self.status.config(text="Falha ao abrir: " + ", ".join(banco or "motor do quiz" for banco in erros))
+        else:
+            self.status.config(text="Bancos prontos")
+
     def iniciar_quiz(self):
+        sonda.marcar('clique')
         total = self.quantidade.get()
         if total <= 0:
             messagebox.showerror("Erro", "Escolha uma quantidade válida.")
             return
-        self.master.destroy()
-        QuizApp(total)
+        if self.gerenciador.tela('quiz').iniciar(total, tema=self.tema.get().strip() or None,
+                                                 modo=MODOS_POR_NOME[self.modo.get()]):
+            self.gerenciador.mostrar('quiz')
 
 # --------------------- Quiz Principal ---------------------
 class QuizApp:
-    def __init__(self, total_questoes):
+    def __init__(self, master, gerenciador):
+        self.master = master
+        self.root = gerenciador.root
+        self.gerenciador = gerenciador
+        self.sessao = None
+        self.medidor = MedidorTexto(self.root)
+        self._proximo_layout = None
+        self._pre_layout_agendado = None
+
+        # Os widgets são criados uma única vez e reaproveitados a cada quiz
+        self.criar_interface()
+
+    def iniciar(self, total_questoes, seed=None, tema=None, modo=MODO_SORTEIO):
+        """Sorteia as questões e mostra a primeira, reaproveitando a interface."""
+        # Importados só agora: a tela inicial abre sem o motor, que a pré-carga já trouxe em segundo plano
+        from eventos import abrir_log
+        from sessao import QuizSession
+
         self.total_questoes = total_questoes
-        self.acertos = 0
-        self.indice = 0
-        self.questoes = self.preparar_questoes()
+        self.seed = seed
+        self.tema = tema
+        if modo == MODO_REVISAO:
+            # Vencidas do usuário primeiro, depois questões novas; o tema não se aplica
+            self.sessao = QuizSession.revisao(total_questoes, getpass.getuser(), 'questoesEspecificas.db',
+                                              'questoesGerais.db', seed=seed, registro=abrir_log())
+        elif modo == MODO_ADAPTATIVO:
+            # Cada questão é escolhida pelo nível estimado nas respostas anteriores; o tema não se aplica
+            self.sessao = QuizSession.adaptativa(total_questoes, 'questoesEspecificas.db', 'questoesGerais.db',
+                                                 seed=seed, registro=abrir_log())
+        else:
+            self.sessao = QuizSession.de_selecao(self.preparar_questoes(), registro=abrir_log())
+        if self.sessao.total == 0:
+            if tema and modo == MODO_SORTEIO:
+                messagebox.showerror("Erro", f"Nenhuma questão encontrada para o tema \"{tema}\".")
+            else:
+                messagebox.showerror("Erro", "Nenhuma questão disponível nos bancos de questões.")
+            return False
 
-        self.root = tk.Tk()
         self.root.title("Quiz")
         centralizar_direita(self.root, 75, 85)  # Aumentei um pouco para mais espaço
-        self.root.configure(bg="#1e1e1e")
 
-        self.criar_interface()
+        self.progress.config(maximum=self.sessao.total)
         self.mostrar_questao()
-        self.root.mainloop()
+        sonda.marcar('primeira_questao', desde='clique')
+        return True
 
+    @rastreado('criar_interface')
     def criar_interface(self):
         """Cria a interface principal do quiz."""
         # Barra de progresso
-        self.progress = ttk.Progressbar(self.root, length=700, mode='determinate', maximum=len(self.questoes))
+        self.progress = ttk.Progressbar(self.master, length=700, mode='determinate')
         self.progress.pack(pady=15)
 
         # Frame principal com scroll
-        self.main_frame = tk.Frame(self.root, bg="#1e1e1e")
+        self.main_frame = tk.Frame(self.master, bg="#1e1e1e")
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
         # Canvas e scrollbar para scroll vertical
@@ -109,7 +170,7 @@ class QuizApp:
             self.scrollable_frame, 
             height=6, 
             width=80,
-            font=("Arial", 12),
+            font=FONTE_PERGUNTA,
             bg="#2d2d2d",
             fg="#ffffff",
             wrap=tk.WORD,
@@ -144,7 +205,7 @@ class QuizApp:
             texto_alt = tk.Text(
                 alt_frame,
                 height=2,
-                font=("Arial", 11),
+                font=FONTE_ALTERNATIVA,
                 bg="#2d2d2d",
                 fg="#ffffff",
                 wrap=tk.WORD,
@@ -165,93 +226,126 @@ class QuizApp:
         """Permite scroll com a roda do mouse."""
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
 
+    @rastreado('preparar_questoes')
     def preparar_questoes(self):
         """Prepara e mistura as questões dos dois bancos."""
-        especificas = carregar_questoes('questoesEspecificas.db')
-        gerais = carregar_questoes('questoesGerais.db')
-        random.shuffle(especificas)
-        random.shuffle(gerais)
-
-        num_especificas = int(self.total_questoes * 0.6)
-        num_gerais = self.total_questoes - num_especificas
-
-        selecionadas = especificas[:num_especificas] + gerais[:num_gerais]
-        random.shuffle(selecionadas)
-        return selecionadas
+        # Sorteia só as linhas necessárias em cada banco (60% específicas / 40% gerais),
+        # restritas ao tema quando houver filtro
+        from repositorio import montar_selecao_por_banco
+        return montar_selecao_por_banco(self.total_questoes, 'questoesEspecificas.db', 'questoesGerais.db',
+                                        seed=self.seed, tema=self.tema)
+
+    def montar_layout(self, indice):
+        """Monta o texto e mede as alturas da questão no índice dado (sem tocar nos widgets)."""
+        questao = self.sessao.questoes[indice]
+        _, numero, enunciado, a, b, c, d, fonte, _ = questao
+
+        pergunta = f"Questão {numero}\n\n{enunciado}\n\nFonte: {fonte}"
+        largura = self.medidor.largura_util(self.pergunta_text, FONTE_PERGUNTA)
+        linhas = self.medidor.contar_linhas(pergunta, largura, FONTE_PERGUNTA)
+        altura_pergunta = max(6, min(18, linhas))  # Mínimo 6, máximo 18 linhas
+
+        alternativas = {}
+        for letra, texto in zip('abcd', (a, b, c, d)):
+            widget = self.botoes[letra]['text']
+            largura = self.medidor.largura_util(widget, FONTE_ALTERNATIVA)
+            linhas = self.medidor.contar_linhas(texto, largura, FONTE_ALTERNATIVA)
+            alternativas[letra] = (texto, max(2, min(6, linhas)))  # Mínimo 2, máximo 6 linhas
+
+        contador = f"Questão {indice + 1} de {self.sessao.total}"
+        return LayoutQuestao(questao, contador, pergunta, altura_pergunta, alternativas)
+
+    @rastreado('pre_layout')
+    def _pre_layout(self):
+        """Mede a próxima questão enquanto a atual está na tela."""
+        self._pre_layout_agendado = None
+        proximo = self.sessao.indice + 1
+        # No modo adaptativo a próxima questão só existe depois da resposta atual
+        if proximo < len(self.sessao.questoes):
+            self._proximo_layout = self.montar_layout(proximo)
+
+    @staticmethod
+    def _atualizar_texto(widget, texto, altura):
+        widget.config(state=tk.NORMAL)
+        widget.delete(1.0, tk.END)
+        widget.insert(1.0, texto)
+        # Só reconfigura a altura quando muda, evitando novo cálculo de geometria
+        if int(widget.cget('height')) != altura:
+            widget.config(height=altura, state=tk.DISABLED)
+        else:
+            widget.config(state=tk.DISABLED)
 
     def mostrar_questao(self):
         """Exibe a questão atual na interface."""
-        if self.indice >= len(self.questoes):
+        questao = self.sessao.questao_atual()
+        if questao is None:
             self.finalizar_quiz()
             return
 
-        questao = self.questoes[self.indice]
-        _, numero, enunciado, a, b, c, d, fonte, gabarito = questao
-        self.gabarito_correto = gabarito
-
-        # Atualiza contador
-        self.contador_label.config(text=f"Questão {self.indice + 1} de {len(self.questoes)}")
+        # A última chamada finaliza o quiz com um diálogo; só o desenho da questão entra no trecho
+        with trecho('mostrar_questao'):
+            # Usa o layout preparado durante a questão anterior, se ainda for válido
+            layout = self._proximo_layout
+            self._proximo_layout = None
+            if layout is None or layout.questao is not questao:
+                layout = self.montar_layout(self.sessao.indice)
 
-        # Atualiza pergunta
-        pergunta_completa = f"Questão {numero}\n\n{enunciado}\n\nFonte: {fonte}"
-        self.pergunta_text.config(state=tk.NORMAL)
-        self.pergunta_text.delete(1.0, tk.END)
-        self.pergunta_text.insert(1.0, pergunta_completa)
-        self.pergunta_text.config(state=tk.DISABLED)
+            self.contador_label.config(text=layout.contador)
+            self._atualizar_texto(self.pergunta_text, layout.pergunta, layout.altura_pergunta)
+            for letra, (texto, altura) in layout.alternativas.items():
+                self._atualizar_texto(self.botoes[letra]['text'], texto, altura)
 
-        # Atualiza alternativas
-        alternativas = {'a': a, 'b': b, 'c': c, 'd': d}
-        for letra, texto in alternativas.items():
-            # Atualiza texto da alternativa
-            self.botoes[letra]['text'].config(state=tk.NORMAL)
-            self.botoes[letra]['text'].delete(1.0, tk.END)
-            self.botoes[letra]['text'].insert(1.0, texto)
-            self.botoes[letra]['text'].config(state=tk.DISABLED)
+            # Atualiza barra de progresso
+            self.progress['value'] = self.sessao.indice
 
-            # Ajusta altura do texto baseado no conteúdo
-            linhas = len(texto.split('\n'))
-            altura = max(2, min(6, linhas + 1))  # Mínimo 2, máximo 6 linhas
-            self.botoes[letra]['text'].config(height=altura)
+            # Volta ao topo da página
+            self.canvas.yview_moveto(0)
 
-        # Atualiza barra de progresso
-        self.progress['value'] = self.indice
-
-        # Volta ao topo da página
-        self.canvas.yview_moveto(0)
+            # Prepara a próxima questão quando o Tk estiver ocioso
+            if self._pre_layout_agendado is not None:
+                self.root.after_cancel(self._pre_layout_agendado)
+            self._pre_layout_agendado = self.root.after_idle(self._pre_layout)
 
     def responder(self, resposta):
         """Processa a resposta do usuário."""
-        if resposta == self.gabarito_correto:
-            self.acertos += 1
+        # O diálogo de resultado espera o aluno e fica fora do trecho
+        with trecho('responder'):
+            avaliada = self.sessao.responder(resposta)
+        if avaliada.correta:
             messagebox.showinfo("Resultado", "✅ Correto!")
         else:
-            messagebox.showerror("Resultado", f"❌ Errado. Resposta correta: {self.gabarito_correto.upper()}")
+            messagebox.showerror("Resultado", f"❌ Errado. Resposta correta: {avaliada.gabarito.upper()}")
         self.proxima_questao()
 
     def proxima_questao(self):
         """Avança para a próxima questão."""
-        self.indice += 1
         self.mostrar_questao()
 
     def finalizar_quiz(self):
         """Finaliza o quiz e mostra o resultado."""
-        percentual = (self.acertos / len(self.questoes)) * 100
+        final = self.sessao.resultado()
         resultado = f"Quiz Finalizado!\n\n"
-        resultado += f"Você acertou {self.acertos} de {len(self.questoes)} questões.\n"
-        resultado += f"Percentual de acerto: {percentual:.1f}%"
-        
-        if percentual >= 70:
-            resultado += "\n\n🎉 Parabéns! Excelente desempenho!"
-        elif percentual >= 50:
-            resultado += "\n\n👍 Bom trabalho! Continue estudando!"
-        else:
-            resultado += "\n\n📚 Continue estudando para melhorar!"
+        resultado += f"Você acertou {final.acertos} de {final.total} questões.\n"
+        resultado += f"Percentual de acerto: {final.percentual:.1f}%"
+        resultado += f"\n\n{final.mensagem}"
         
         messagebox.showinfo("Fim do Quiz", resultado)
-        self.root.destroy()
+        self.gerenciador.fechar()
+
+# --------------------- Montagem das Telas ---------------------
+def criar_aplicacao(root):
+    root.title("Quiz TGE APP 2025")
+    centralizar_direita(root, 70, 80)
+    root.configure(bg="#1e1e1e")
+
+    gerenciador = ScreenManager(root)
+    gerenciador.registrar('inicio', lambda frame: TelaInicial(frame, gerenciador))
+    gerenciador.registrar('quiz', lambda frame: QuizApp(frame, gerenciador))
+    gerenciador.mostrar('inicio')
+    return gerenciador
 
 # --------------------- Início do Programa ---------------------
 if __name__ == "__main__":
     root = tk.Tk()
-    app = TelaInicial(root)
+    criar_aplicacao(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,411 @@
+"""
+Repositório de questões
+Uma conexão persistente, somente leitura e ajustada por banco, compartilhada por todas as telas; esquema
+e índices ficam com os importadores
+"""
+
+import random
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from amostragem import COLUNAS_QUESTAO, PROPORCAO_ESPECIFICAS, buscar_por_ids, em_partes, sortear_ids
+from busca import COLUNAS_TEXTO, SQL_IDS_FTS, SQL_IDS_LIKE, TABELA_FTS, expressao_busca
+from fontes import agrupar_por_documento, dividir_cotas, documento_da_fonte, ids_por_posicoes, ler_indice_fontes
+from intercambio import hash_questao
+
+
+BANCO_ESPECIFICAS = 'questoesEspecificas.db'
+BANCO_GERAIS = 'questoesGerais.db'
+
+# Ajustes aplicados a cada conexão aberta; nenhum deles fica gravado no arquivo
+PRAGMAS = (
+    'PRAGMA query_only=ON',
+    'PRAGMA cache_size=-8000',   # ~8 MB de cache de páginas
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+class Questao(NamedTuple):
+    """Linha da tabela questoes, na mesma ordem usada pelas telas"""
+    id: int
+    numero: str
+    enunciado: str
+    alternativa_a: str
+    alternativa_b: str
+    alternativa_c: str
+    alternativa_d: str
+    fonte: str
+    gabarito: str
+
+
+def _fabrica_questao(cursor: sqlite3.Cursor, linha: tuple) -> Questao:
+    return Questao(*linha)
+
+
+def categoria_da_fonte(fonte: Optional[str]) -> str:
+    """Documento citado na fonte ('ICA 100-9 Item 5.3' -> 'ICA 100-9'), compartilhado entre as questões"""
+    return sys.intern(documento_da_fonte(fonte))
+
+
+def _campo_texto(nome: str) -> property:
+    return property(lambda self: getattr(self.questao(), nome), doc=f"{nome}, buscado sob demanda")
+
+
+class QuestaoLeve:
+    """
+    Questão só com o necessário para sortear e corrigir (id, categoria e gabarito).
+
+    Os textos ficam no banco até a questão ir para a tela; carregar_textos busca
+    os de várias questões numa consulta só. Os mesmos atributos de Questao
+    continuam disponíveis, buscando um a um o que não veio em lote.
+    """
+    __slots__ = ('repositorio', 'id', 'categoria', 'gabarito', '_texto')
+
+    def __init__(self, repositorio: 'QuestionRepository', questao_id: int, categoria: str, gabarito: str):
+        self.repositorio = repositorio
+        self.id = questao_id
+        self.categoria = categoria
+        self.gabarito = gabarito
+        self._texto: Optional[Questao] = None
+
+    def __repr__(self) -> str:
+        return f"QuestaoLeve(id={self.id}, categoria={self.categoria!r}, gabarito={self.gabarito!r})"
+
+    @property
+    def carregada(self) -> bool:
+        return self._texto is not None
+
+    def questao(self) -> Questao:
+        """A linha completa, buscando os textos se ainda não vieram"""
+        if self._texto is None:
+            self.repositorio.carregar_textos([self])
+            if self._texto is None:
+                raise LookupError(f"A questão {self.id} não existe mais em {self.repositorio.banco}")
+        return self._texto
+
+    def __iter__(self):
+        """Desempacota como Questao (id, numero, enunciado, ..., fonte, gabarito), buscando os textos"""
+        return iter(self.questao())
+
+    def descarregar(self):
+        """Libera os textos, que voltam a ser buscados se a questão for exibida de novo"""
+        self._texto = None
+
+    numero = _campo_texto('numero')
+    enunciado = _campo_texto('enunciado')
+    alternativa_a = _campo_texto('alternativa_a')
+    alternativa_b = _campo_texto('alternativa_b')
+    alternativa_c = _campo_texto('alternativa_c')
+    alternativa_d = _campo_texto('alternativa_d')
+    fonte = _campo_texto('fonte')
+
+
+class QuestionRepository:
+    """Consultas tipadas sobre um banco de questões"""
+
+    SQL_POR_ID = f'SELECT {COLUNAS_QUESTAO} FROM questoes WHERE id = ?'
+    SQL_POR_FONTE = (
+        f'SELECT {COLUNAS_QUESTAO} FROM questoes '
+        'WHERE fonte >= ? AND fonte < ? ORDER BY fonte, id'
+    )
+    SQL_TODAS = f'SELECT {COLUNAS_QUESTAO} FROM questoes ORDER BY id'
+    SQL_LEVES = 'SELECT id, fonte, gabarito FROM questoes ORDER BY id'
+    SQL_CONTAR = 'SELECT COUNT(*) FROM questoes'
+    # Campos na ordem do hash_questao: (numero, enunciado, a, b, c, d, gabarito, fonte)
+    COLUNAS_CONTEUDO = (
+        'numero, enunciado, alternativa_a, alternativa_b, alternativa_c, alternativa_d, gabarito, fonte'
+    )
+    SQL_CONTEUDO = f'SELECT id, {COLUNAS_CONTEUDO} FROM questoes'
+
+    def __init__(self, banco: str):
+        self.banco = banco
+        # Uma única conexão por banco, somente leitura: abrir o quiz não altera o banco distribuído.
+        # O cache de statements do sqlite3 reaproveita as consultas preparadas entre um quiz e outro
+        self.conn = sqlite3.connect(f'{Path(banco).resolve().as_uri()}?mode=ro', uri=True,
+                                    check_same_thread=False, cached_statements=64)
+        self._lock = threading.Lock()
+        self.tem_fts = False
+        self._documentos: Optional[Dict[str, int]] = None
+        # Ids por documento montados em memória quando o banco não tem o índice de fontes
+        self._por_documento: Optional[Dict[str, List[int]]] = None
+        # Bancos sem a coluna hash (anteriores aos importadores com manifesto) têm os hashes calculados
+        # uma vez e guardados aqui
+        self._hashes: Optional[Dict[int, str]] = None
+        self._configurar()
+        self.tem_hash = any(coluna[1] == 'hash' for coluna in self.conn.execute('PRAGMA table_info(questoes)'))
+
+    def _configurar(self):
+        """Aplica os pragmas e vê se os importadores deixaram o índice de texto pronto"""
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
+        self.tem_fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABELA_FTS,)
+        ).fetchone() is not None
+
+    @contextmanager
+    def conexao(self) -> Iterator[sqlite3.Connection]:
+        """Acesso exclusivo à conexão (somente leitura), para consultas que o repositório não oferece"""
+        with self._lock:
+            yield self.conn
+
+    def _consultar(self, sql: str, parametros: Sequence = ()) -> List[Questao]:
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = _fabrica_questao
+            return cursor.execute(sql, parametros).fetchall()
+
+    def por_id(self, questao_id: int) -> Optional[Questao]:
+        """Busca uma questão pela chave primária"""
+        linhas = self._consultar(self.SQL_POR_ID, (questao_id,))
+        return linhas[0] if linhas else None
+
+    def por_ids(self, ids: Sequence[int]) -> List[Questao]:
+        """Busca várias questões, preservando a ordem dos ids"""
+        with self._lock:
+            return [Questao(*linha) for linha in buscar_por_ids(self.conn, ids)]
+
+    def por_categoria(self, categoria: str) -> List[Questao]:
+        """Questões cuja fonte começa pelo documento informado (ex.: 'ICA 100-37')"""
+        return self._consultar(self.SQL_POR_FONTE, (categoria, categoria + '\uffff'))
+
+    def ids_por_tema(self, tema: str) -> List[int]:
+        """Ids das questões cujo enunciado ou alternativas mencionam o tema, as mais relevantes primeiro"""
+        with self._lock:
+            if self.tem_fts:
+                try:
+                    return [linha[0] for linha in self.conn.execute(SQL_IDS_FTS, (expressao_busca(tema),))]
+                except sqlite3.OperationalError:
+                    # Tabela FTS criada por um SQLite com FTS5 e lida por um sem: fica com o LIKE
+                    self.tem_fts = False
+            cursor = self.conn.execute(SQL_IDS_LIKE, (f'%{tema.strip()}%',) * len(COLUNAS_TEXTO))
+            return [linha[0] for linha in cursor]
+
+    def por_tema(self, tema: str) -> List[Questao]:
+        """Questões que mencionam o tema (ex.: 'espera', 'separação', 'Classe D')"""
+        return self.por_ids(self.ids_por_tema(tema))
+
+    def todas(self) -> List[Questao]:
+        """Todas as questões do banco"""
+        return self._consultar(self.SQL_TODAS)
+
+    def todas_leves(self) -> List[QuestaoLeve]:
+        """Todas as questões do banco sem os textos, que ficam para carregar_textos"""
+        with self._lock:
+            cursor = self.conn.execute(self.SQL_LEVES)
+            return [
+                QuestaoLeve(self, questao_id, categoria_da_fonte(fonte), gabarito)
+                for questao_id, fonte, gabarito in cursor
+            ]
+
+    def carregar_textos(self, leves: Sequence[QuestaoLeve]):
+        """Busca numa consulta só os textos das questões que ainda não os têm"""
+        faltam = [leve for leve in leves if leve._texto is None]
+        if not faltam:
+            return
+        questoes = {questao.id: questao for questao in self.por_ids([leve.id for leve in faltam])}
+        for leve in faltam:
+            leve._texto = questoes.get(leve.id)
+
+    def documentos(self) -> Dict[str, int]:
+        """
+        Questões por documento citado na fonte; o índice de fontes é conferido só na primeira chamada.
+
+        Sem o índice (ou com ele desatualizado) as posições são montadas em memória, com uma
+        leitura de id e fonte do banco inteiro.
+        """
+        with self._lock:
+            if self._documentos is None:
+                self._documentos = ler_indice_fontes(self.conn)
+                if self._documentos is None:
+                    self._por_documento = agrupar_por_documento(self.conn)
+                    self._documentos = {documento: len(ids) for documento, ids in self._por_documento.items()}
+            return self._documentos
+
+    def por_posicoes(self, documento: str, posicoes: Sequence[int]) -> List[Questao]:
+        """Questões nas posições do documento no índice de fontes, na ordem das posições"""
+        self.documentos()
+        with self._lock:
+            if self._por_documento is None:
+                ids = ids_por_posicoes(self.conn, documento, posicoes)
+            else:
+                lista = self._por_documento.get(documento, [])
+                ids = [lista[posicao] for posicao in posicoes if posicao < len(lista)]
+            return [Questao(*linha) for linha in buscar_por_ids(self.conn, ids)]
+
+    def hashes_por_ids(self, ids: Sequence[int]) -> Dict[int, str]:
+        """Hash do conteúdo (hash_questao) de cada id que existe no banco; não muda quando o id muda"""
+        with self._lock:
+            if not self.tem_hash:
+                hashes = self._todos_hashes()
+                return {questao_id: hashes[questao_id] for questao_id in ids if questao_id in hashes}
+            resultado: Dict[int, str] = {}
+            for parte in em_partes(list(ids)):
+                marcadores = ','.join('?' * len(parte))
+                for questao_id, hash_, *conteudo in self.conn.execute(
+                        f'SELECT id, hash, {self.COLUNAS_CONTEUDO} FROM questoes WHERE id IN ({marcadores})',
+                        parte):
+                    # Linha gravada por fora dos importadores pode estar sem hash
+                    resultado[questao_id] = hash_ or hash_questao(conteudo)
+            return resultado
+
+    def ids_por_hashes(self, hashes: Sequence[str]) -> Dict[str, int]:
+        """Id atual de cada hash que ainda existe no banco (o menor, se o conteúdo estiver repetido)"""
+        with self._lock:
+            resultado: Dict[str, int] = {}
+            if not self.tem_hash:
+                procurados = set(hashes)
+                for questao_id, hash_ in sorted(self._todos_hashes().items()):
+                    if hash_ in procurados:
+                        resultado.setdefault(hash_, questao_id)
+                return resultado
+            for parte in em_partes(list(hashes)):
+                marcadores = ','.join('?' * len(parte))
+                for hash_, questao_id in self.conn.execute(
+                        f'SELECT hash, MIN(id) FROM questoes WHERE hash IN ({marcadores}) GROUP BY hash', parte):
+                    resultado[hash_] = questao_id
+            return resultado
+
+    def _todos_hashes(self) -> Dict[int, str]:
+        if self._hashes is None:
+            self._hashes = {
+                linha[0]: hash_questao(linha[1:]) for linha in self.conn.execute(self.SQL_CONTEUDO)
+            }
+        return self._hashes
+
+    def contar(self) -> int:
+        """Quantidade de questões no banco"""
+        with self._lock:
+            return self.conn.execute(self.SQL_CONTAR).fetchone()[0]
+
+    def sortear(self, k: int, rng: random.Random) -> List[Questao]:
+        """Sorteia k questões buscando apenas as linhas escolhidas"""
+        with self._lock:
+            ids = sortear_ids(self.conn, k, rng)
+            return [Questao(*linha) for linha in buscar_por_ids(self.conn, ids)]
+
+    def fechar(self):
+        with self._lock:
+            self.conn.close()
+
+
+# --------------------- Repositórios compartilhados ---------------------
+_repositorios: Dict[str, QuestionRepository] = {}
+_repositorios_lock = threading.Lock()
+
+
+def abrir_repositorio(banco: str) -> QuestionRepository:
+    """Devolve o repositório do banco, abrindo a conexão só na primeira vez"""
+    with _repositorios_lock:
+        repositorio = _repositorios.get(banco)
+        if repositorio is None:
+            repositorio = QuestionRepository(banco)
+            _repositorios[banco] = repositorio
+        return repositorio
+
+
+def fechar_repositorios():
+    """Fecha todas as conexões abertas pelo processo"""
+    with _repositorios_lock:
+        for repositorio in _repositorios.values():
+            repositorio.fechar()
+        _repositorios.clear()
+
+
+def carregar_textos(questoes: Sequence):
+    """Busca os textos das QuestaoLeve da lista, uma consulta por banco; as demais ficam como estão"""
+    por_repositorio: Dict[QuestionRepository, List[QuestaoLeve]] = {}
+    for questao in questoes:
+        if isinstance(questao, QuestaoLeve) and not questao.carregada:
+            por_repositorio.setdefault(questao.repositorio, []).append(questao)
+    for repositorio, leves in por_repositorio.items():
+        repositorio.carregar_textos(leves)
+
+
+def montar_selecao(total_questoes: int,
+                   banco_especificas: str = BANCO_ESPECIFICAS,
+                   banco_gerais: str = BANCO_GERAIS,
+                   seed: Optional[int] = None,
+                   tema: Optional[str] = None) -> List[Questao]:
+    """
+    Monta a seleção do quiz mantendo 60% de específicas e 40% de gerais.
+
+    Com a mesma seed e os mesmos bancos o sorteio é sempre o mesmo.
+    Com um tema, sorteia só entre as questões que o mencionam.
+    """
+    return [questao for _, questao in
+            montar_selecao_por_banco(total_questoes, banco_especificas, banco_gerais, seed, tema)]
+
+
+def montar_selecao_por_banco(total_questoes: int,
+                             banco_especificas: str = BANCO_ESPECIFICAS,
+                             banco_gerais: str = BANCO_GERAIS,
+                             seed: Optional[int] = None,
+                             tema: Optional[str] = None) -> List[Tuple[str, Questao]]:
+    """Mesma seleção de montar_selecao, com o banco de origem de cada questão"""
+    rng = random.Random(seed)
+
+    num_especificas = int(total_questoes * PROPORCAO_ESPECIFICAS)
+    num_gerais = total_questoes - num_especificas
+
+    if tema and tema.strip():
+        return _selecao_por_tema(tema, num_especificas, num_gerais, banco_especificas, banco_gerais, rng)
+
+    especificas = abrir_repositorio(banco_especificas).sortear(num_especificas, rng)
+    gerais = abrir_repositorio(banco_gerais).sortear(num_gerais, rng)
+
+    selecionadas = (
+        [(banco_especificas, questao) for questao in especificas] +
+        [(banco_gerais, questao) for questao in gerais]
+    )
+    rng.shuffle(selecionadas)
+    return selecionadas
+
+
+def montar_prova(cotas: Mapping[str, int],
+                 bancos: Sequence[str] = (BANCO_ESPECIFICAS, BANCO_GERAIS),
+                 seed: Optional[int] = None) -> List[Tuple[str, Questao]]:
+    """
+    Monta uma prova por cotas de documento, ex.: {'ICA 100-37': 12, 'ICA 100-12': 8}.
+
+    Cada cota é sorteada entre as questões do documento em todos os bancos, por posição
+    no índice de fontes: o custo acompanha o tamanho da prova, não o dos bancos.
+    Documento com menos questões que a cota entra com todas as que tem.
+    """
+    rng = random.Random(seed)
+    repositorios = [abrir_repositorio(banco) for banco in bancos]
+    sorteio = dividir_cotas(cotas, [repositorio.documentos() for repositorio in repositorios], rng)
+
+    selecionadas: List[Tuple[str, Questao]] = []
+    for repositorio, posicoes in zip(repositorios, sorteio):
+        for documento, lista in posicoes.items():
+            selecionadas.extend((repositorio.banco, questao) for questao in repositorio.por_posicoes(documento, lista))
+    rng.shuffle(selecionadas)
+    return selecionadas
+
+
+def _selecao_por_tema(tema: str, num_especificas: int, num_gerais: int,
+                      banco_especificas: str, banco_gerais: str,
+                      rng: random.Random) -> List[Tuple[str, Questao]]:
+    """Sorteia entre as questões do tema; se um banco tiver poucas, completa com o outro"""
+    especificas = abrir_repositorio(banco_especificas)
+    gerais = abrir_repositorio(banco_gerais)
+    ids_especificas = especificas.ids_por_tema(tema)
+    ids_gerais = gerais.ids_por_tema(tema)
+
+    total = num_especificas + num_gerais
+    qtd_especificas = min(len(ids_especificas), max(num_especificas, total - len(ids_gerais)))
+    qtd_gerais = min(len(ids_gerais), total - qtd_especificas)
+
+    sorteadas_especificas = especificas.por_ids(rng.sample(ids_especificas, qtd_especificas))
+    sorteadas_gerais = gerais.por_ids(rng.sample(ids_gerais, qtd_gerais))
+
+    selecionadas = (
+        [(banco_especificas, questao) for questao in sorteadas_especificas] +
+        [(banco_gerais, questao) for questao in sorteadas_gerais]
+    )
+    rng.shuffle(selecionadas)
+    return selecionadas
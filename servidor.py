@@ -0,0 +1,313 @@
+"""
+Servidor HTTP/JSON do quiz
+Atende várias turmas ao mesmo tempo com asyncio, mantendo as sessões em memória
+
+Rotas:
+    POST   /sessoes                    {"quantidade": 40, "seed": 123,  -> cria sessão
+                                        "tema": "separação",
+                                        "usuario": "ana",          (usuario => modo revisão)
+                                        "modo": "adaptativo"}      (sorteio | revisao | adaptativo)
+    GET    /sessoes/<id>/questao                                        -> questão atual
+    POST   /sessoes/<id>/resposta      {"resposta": "b"}                -> avalia e avança
+    GET    /sessoes/<id>/resultado                                      -> resumo da sessão
+    DELETE /sessoes/<id>                                                -> encerra sessão
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Dict, Optional, Tuple
+
+from eventos import BANCO_EVENTOS, abrir_log
+from modos import MODO_ADAPTATIVO, MODO_REVISAO, MODO_SORTEIO, NOMES_MODOS
+from repositorio import BANCO_ESPECIFICAS, BANCO_GERAIS, abrir_repositorio
+from sessao import AdaptiveSession, QuizSession
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+QUANTIDADES_VALIDAS = (10, 20, 30, 40, 50)
+MAX_CORPO = 64 * 1024
+SESSAO_EXPIRA_SEGUNDOS = 4 * 60 * 60
+
+STATUS = {
+    200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error',
+}
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+class QuizServer:
+    """Sessões em memória e rotas JSON sobre o motor QuizSession"""
+
+    def __init__(self, banco_especificas: str = BANCO_ESPECIFICAS,
+                 banco_gerais: str = BANCO_GERAIS, threads: int = 4,
+                 banco_eventos: str = BANCO_EVENTOS):
+        self.banco_especificas = banco_especificas
+        self.banco_gerais = banco_gerais
+        # Respostas vão para o log em lotes, sem tocar o disco no event loop
+        self.registro = abrir_log(banco_eventos)
+        # Consultas ao SQLite rodam fora do event loop
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='sqlite')
+        self.sessoes: Dict[str, Tuple[QuizSession, float]] = {}
+
+    # --------------------- Rotas ---------------------
+    async def criar_sessao(self, corpo: dict) -> Tuple[int, dict]:
+        quantidade = corpo.get('quantidade', 40)
+        # 10.0 == 10 e True == 1: só inteiro de verdade
+        if type(quantidade) is not int or quantidade not in QUANTIDADES_VALIDAS:
+            raise ErroHTTP(400, f"quantidade deve ser uma de {list(QUANTIDADES_VALIDAS)}")
+        seed = corpo.get('seed')
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+            raise ErroHTTP(400, "seed deve ser um número inteiro")
+        tema = corpo.get('tema')
+        if tema is not None and not isinstance(tema, str):
+            raise ErroHTTP(400, "tema deve ser um texto")
+        usuario = corpo.get('usuario')
+        if usuario is not None and (not isinstance(usuario, str) or not usuario.strip()):
+            raise ErroHTTP(400, "usuario deve ser um texto não vazio")
+        modo = corpo.get('modo', MODO_REVISAO if usuario else MODO_SORTEIO)
+        if modo not in NOMES_MODOS:
+            raise ErroHTTP(400, f"modo deve ser um de {list(NOMES_MODOS)}")
+        if modo == MODO_REVISAO and not usuario:
+            raise ErroHTTP(400, "o modo revisao exige usuario")
+
+        loop = asyncio.get_running_loop()
+        if modo == MODO_REVISAO:
+            # Repetição espaçada: vencidas do usuário primeiro, depois questões novas
+            sessao = await loop.run_in_executor(
+                self.executor,
+                lambda: QuizSession.revisao(quantidade, usuario, self.banco_especificas, self.banco_gerais,
+                                            seed=seed, registro=self.registro)
+            )
+        elif modo == MODO_ADAPTATIVO:
+            # A primeira sessão de cada banco monta o índice de dificuldade; as outras só o consultam
+            sessao = await loop.run_in_executor(
+                self.executor,
+                lambda: QuizSession.adaptativa(quantidade, self.banco_especificas, self.banco_gerais,
+                                               seed=seed, registro=self.registro)
+            )
+        else:
+            sessao = await loop.run_in_executor(
+                self.executor,
+                lambda: QuizSession.iniciar(quantidade, self.banco_especificas, self.banco_gerais,
+                                            seed=seed, tema=tema, registro=self.registro)
+            )
+        if sessao.total == 0:
+            if tema and modo == MODO_SORTEIO:
+                raise ErroHTTP(404, f"Nenhuma questão encontrada para o tema \"{tema}\"")
+            raise ErroHTTP(404, "Nenhuma questão disponível nos bancos de questões")
+        sessao_id = secrets.token_urlsafe(12)
+        self.sessoes[sessao_id] = (sessao, time.monotonic())
+        return 201, {'sessao': sessao_id, 'total': sessao.total}
+
+    async def obter_questao(self, sessao: QuizSession) -> Tuple[int, dict]:
+        if isinstance(sessao, AdaptiveSession):
+            # A próxima questão é escolhida e buscada no SQLite na hora: fora do event loop
+            loop = asyncio.get_running_loop()
+            questao = await loop.run_in_executor(self.executor, sessao.questao_atual)
+        else:
+            questao = sessao.questao_atual()
+        if questao is None:
+            return 200, {'finalizada': True}
+        return 200, {
+            'finalizada': False,
+            'indice': sessao.indice + 1,
+            'total': sessao.total,
+            'numero': questao.numero,
+            'enunciado': questao.enunciado,
+            'alternativas': {
+                'a': questao.alternativa_a,
+                'b': questao.alternativa_b,
+                'c': questao.alternativa_c,
+                'd': questao.alternativa_d,
+            },
+            'fonte': questao.fonte,
+        }
+
+    async def responder(self, sessao: QuizSession, corpo: dict) -> Tuple[int, dict]:
+        resposta = str(corpo.get('resposta', '')).lower()
+        if resposta not in ('a', 'b', 'c', 'd'):
+            raise ErroHTTP(400, "resposta deve ser a, b, c ou d")
+        if sessao.finalizada:
+            raise ErroHTTP(409, "A sessão já foi finalizada")
+        if sessao.agendadores or isinstance(sessao, AdaptiveSession):
+            # No modo revisão a resposta lê a agenda no SQLite (a gravação vai para a fila do log) e
+            # no adaptativo ela escolhe e busca a próxima questão: fora do event loop
+            loop = asyncio.get_running_loop()
+            avaliada = await loop.run_in_executor(self.executor, sessao.responder, resposta)
+        else:
+            avaliada = sessao.responder(resposta)
+        return 200, {**asdict(avaliada), 'finalizada': sessao.finalizada}
+
+    def resultado(self, sessao: QuizSession) -> Tuple[int, dict]:
+        return 200, asdict(sessao.resultado())
+
+    async def despachar(self, metodo: str, caminho: str, corpo: dict) -> Tuple[int, dict]:
+        partes = [parte for parte in caminho.split('?')[0].split('/') if parte]
+
+        if partes == ['sessoes']:
+            if metodo != 'POST':
+                raise ErroHTTP(405, "Use POST para criar uma sessão")
+            return await self.criar_sessao(corpo)
+
+        if len(partes) < 2 or partes[0] != 'sessoes':
+            raise ErroHTTP(404, "Rota não encontrada")
+
+        sessao_id = partes[1]
+        entrada = self.sessoes.get(sessao_id)
+        if entrada is None:
+            raise ErroHTTP(404, "Sessão não encontrada")
+        sessao = entrada[0]
+        self.sessoes[sessao_id] = (sessao, time.monotonic())
+
+        rota = (metodo, partes[2] if len(partes) > 2 else '')
+        if rota == ('GET', 'questao'):
+            return await self.obter_questao(sessao)
+        if rota == ('POST', 'resposta'):
+            return await self.responder(sessao, corpo)
+        if rota == ('GET', 'resultado'):
+            return self.resultado(sessao)
+        if rota == ('DELETE', ''):
+            del self.sessoes[sessao_id]
+            return 200, {'encerrada': True}
+        raise ErroHTTP(404, "Rota não encontrada")
+
+    # --------------------- HTTP ---------------------
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão, com keep-alive, até o cliente fechar"""
+        try:
+            while True:
+                pedido = await self._ler_pedido(reader)
+                if pedido is None:
+                    break
+                metodo, caminho, corpo, manter = pedido
+
+                try:
+                    status, dados = await self.despachar(metodo, caminho, corpo)
+                except ErroHTTP as e:
+                    status, dados = e.status, {'erro': e.mensagem}
+                except Exception as e:
+                    logger.exception(f"Erro ao atender {metodo} {caminho}")
+                    status, dados = 500, {'erro': str(e)}
+
+                self._escrever_resposta(writer, status, dados, manter)
+                await writer.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ErroHTTP as e:
+            self._escrever_resposta(writer, e.status, {'erro': e.mensagem}, False)
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _ler_pedido(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, dict, bool]]:
+        linha = await reader.readline()
+        if not linha:
+            return None
+        try:
+            metodo, caminho, versao = linha.decode('latin-1').split()
+        except ValueError:
+            raise ErroHTTP(400, "Linha de requisição inválida")
+
+        cabecalhos = {}
+        while True:
+            linha = await reader.readline()
+            if linha in (b'\r\n', b'\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        tamanho = cabecalhos.get('content-length', '') or '0'
+        if not tamanho.isdigit():
+            raise ErroHTTP(400, "Content-Length inválido")
+        tamanho = int(tamanho)
+        if tamanho > MAX_CORPO:
+            raise ErroHTTP(413, "Corpo da requisição muito grande")
+        corpo = {}
+        if tamanho:
+            bruto = await reader.readexactly(tamanho)
+            try:
+                corpo = json.loads(bruto)
+            except ValueError:
+                raise ErroHTTP(400, "JSON inválido")
+            if not isinstance(corpo, dict):
+                raise ErroHTTP(400, "O corpo deve ser um objeto JSON")
+
+        conexao = cabecalhos.get('connection', '').lower()
+        manter = conexao != 'close' if versao == 'HTTP/1.1' else conexao == 'keep-alive'
+        return metodo.upper(), caminho, corpo, manter
+
+    @staticmethod
+    def _escrever_resposta(writer: asyncio.StreamWriter, status: int, dados: dict, manter: bool):
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        cabecalho = (
+            f"HTTP/1.1 {status} {STATUS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corpo)}\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+        )
+        writer.write(cabecalho.encode('latin-1') + corpo)
+
+    # --------------------- Ciclo de vida ---------------------
+    async def limpar_sessoes(self, intervalo: float = 60.0):
+        """Remove periodicamente sessões paradas há mais de SESSAO_EXPIRA_SEGUNDOS"""
+        while True:
+            await asyncio.sleep(intervalo)
+            limite = time.monotonic() - SESSAO_EXPIRA_SEGUNDOS
+            expiradas = [sid for sid, (_, visto) in self.sessoes.items() if visto < limite]
+            for sid in expiradas:
+                del self.sessoes[sid]
+            if expiradas:
+                logger.info(f"{len(expiradas)} sessões expiradas removidas")
+
+    async def executar(self, host: str, porta: int):
+        # Abre as conexões antes do primeiro aluno chegar
+        loop = asyncio.get_running_loop()
+        for banco in (self.banco_especificas, self.banco_gerais):
+            await loop.run_in_executor(self.executor, abrir_repositorio, banco)
+
+        servidor = await asyncio.start_server(self.atender, host, porta, backlog=1024)
+        limpeza = asyncio.create_task(self.limpar_sessoes())
+        logger.info(f"Servidor do quiz em http://{host}:{porta}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            limpeza.cancel()
+            self.executor.shutdown(wait=False)
+            self.registro.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON do Quiz TGE APP 2025.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('--banco-especificas', default=BANCO_ESPECIFICAS)
+    parser.add_argument('--banco-gerais', default=BANCO_GERAIS)
+    parser.add_argument('--threads', type=int, default=4, help="Threads para consultas ao SQLite")
+    parser.add_argument('--banco-eventos', default=BANCO_EVENTOS, help="Banco do log de respostas")
+    args = parser.parse_args(argv)
+
+    servidor = QuizServer(args.banco_especificas, args.banco_gerais, args.threads, args.banco_eventos)
+    try:
+        asyncio.run(servidor.executar(args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
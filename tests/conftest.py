@@ -0,0 +1,42 @@
+"""
+Configuração dos testes
+Os módulos ficam soltos na raiz do projeto e o importador TXT em 'TXT ORIGINAL'; os bancos
+e arquivos de exemplo são copiados para uma pasta temporária antes de qualquer escrita
+"""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+PASTA_TXT = RAIZ / 'TXT ORIGINAL'
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(PASTA_TXT))
+
+TXT_GERAIS = PASTA_TXT / 'TGE APP 2025 GERAIS.txt'
+TXT_ESPECIFICAS = PASTA_TXT / 'TGE APP 2025 ESPECÍFICAS.txt'
+
+
+@pytest.fixture
+def copiar(tmp_path):
+    """Copia um arquivo do projeto para a pasta do teste e devolve o caminho da cópia"""
+    def _copiar(origem: Path, nome: str = None) -> str:
+        destino = tmp_path / (nome or origem.name)
+        shutil.copyfile(origem, destino)
+        return str(destino)
+    return _copiar
+
+
+def editar_primeira_questao(caminho: str, prefixo: str = 'EDITADA ') -> str:
+    """Acrescenta o prefixo ao enunciado da primeira questão do TXT; devolve a primeira linha do novo enunciado"""
+    with open(caminho, encoding='utf-8-sig') as arquivo:
+        linhas = arquivo.read().split('\n')
+    for posicao, linha in enumerate(linhas):
+        if linha.strip().isdigit():
+            linhas[posicao + 1] = prefixo + linhas[posicao + 1].strip()
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                arquivo.write('\n'.join(linhas))
+            return linhas[posicao + 1]
+    raise AssertionError('nenhuma questão no arquivo')
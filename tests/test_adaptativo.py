@@ -0,0 +1,49 @@
+"""Índice de dificuldade: atualização incremental a partir das estatísticas e sorteio sem repetição"""
+
+import random
+import time
+
+from adaptativo import DifficultyIndex, abrir_indice, descartar_indices
+from conftest import RAIZ
+from eventos import AnswerLog, EventoResposta
+from repositorio import abrir_repositorio, fechar_repositorios
+
+
+def _faixas(indice: DifficultyIndex) -> dict:
+    return {chave: sorted(faixa) for chave, faixa in zip(indice.chaves, indice.faixas)}
+
+
+def test_respostas_novas_movem_so_as_questoes_alteradas(copiar, tmp_path):
+    banco = copiar(RAIZ / 'Dados' / 'questoesGerais.db')
+    banco_eventos = str(tmp_path / 'respostas.db')
+    repositorio = abrir_repositorio(banco)
+    log = AnswerLog(banco_eventos)
+    try:
+        indice = abrir_indice(repositorio, banco_eventos)
+        ids = sorted(indice.dificuldades)
+        for questao_id in ids[:5]:
+            for _ in range(4):
+                log.registrar(EventoResposta('s', repositorio.banco, questao_id, 'a', False, 1.0, time.time()))
+        log.descarregar()
+
+        atualizado = abrir_indice(repositorio, banco_eventos)
+        assert atualizado is indice
+        assert all(indice.dificuldades[questao_id] > 0 for questao_id in ids[:5])
+
+        descartar_indices()
+        assert _faixas(abrir_indice(repositorio, banco_eventos)) == _faixas(indice)
+    finally:
+        log.fechar()
+        descartar_indices()
+        fechar_repositorios()
+
+
+def test_escolher_usa_todas_as_questoes_sem_repetir():
+    indice = DifficultyIndex({questao_id: (questao_id % 40) / 10 for questao_id in range(400)})
+    indice.aplicar({questao_id: -3.0 for questao_id in range(0, 400, 7)}, versao=1)
+    rng = random.Random(1)
+    usadas = set()
+    while (questao_id := indice.escolher(1.0, usadas, rng)) is not None:
+        assert questao_id not in usadas
+        usadas.add(questao_id)
+    assert usadas == set(range(400))
@@ -0,0 +1,19 @@
+import sqlite3
+
+from amostragem import COLUNAS_QUESTAO, LIMITE_PARAMETROS, buscar_por_ids
+
+
+def test_buscar_por_ids_acima_do_limite_de_parametros_preserva_a_ordem():
+    conn = sqlite3.connect(':memory:')
+    # Limite padrão das versões do SQLite anteriores à 3.32
+    conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    colunas = COLUNAS_QUESTAO.replace('id,', 'id INTEGER PRIMARY KEY,', 1)
+    conn.execute(f'CREATE TABLE questoes ({colunas})')
+    total = LIMITE_PARAMETROS * 5 + 7
+    conn.executemany('INSERT INTO questoes(id, numero, enunciado) VALUES (?, ?, ?)',
+                     [(i, str(i), f'Questão {i}') for i in range(1, total + 1)])
+
+    ids = list(range(total, 0, -2)) + [total + 100]  # ordem decrescente e um id ausente
+    linhas = buscar_por_ids(conn, ids)
+
+    assert [linha[0] for linha in linhas] == ids[:-1]
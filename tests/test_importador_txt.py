@@ -0,0 +1,109 @@
+"""Reimportação dos TXT: bancos com e sem UNIQUE(numero, fonte), questão editada, índice de fontes"""
+
+import sqlite3
+
+from conftest import PASTA_TXT, TXT_ESPECIFICAS, TXT_GERAIS, editar_primeira_questao
+from fontes import agrupar_por_documento, ler_indice_fontes
+from questoes_refatorado import QuestaoImporter
+
+
+def _contar(banco: str) -> int:
+    with sqlite3.connect(banco) as conn:
+        return conn.execute('SELECT COUNT(*) FROM questoes').fetchone()[0]
+
+
+def test_reimportar_questao_editada_atualiza_indice_de_fontes(copiar, tmp_path):
+    txt = copiar(TXT_GERAIS, 'gerais.txt')
+    banco = str(tmp_path / 'gerais.db')
+    importador = QuestaoImporter(banco)
+    assert importador.importar_arquivo(txt)
+    total = _contar(banco)
+
+    enunciado = editar_primeira_questao(txt)
+    assert importador.importar_arquivo(txt)
+
+    assert _contar(banco) == total
+    conn = sqlite3.connect(banco)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM questoes WHERE enunciado LIKE ?', (enunciado + '%',)).fetchone()[0] == 1
+        quantidades = ler_indice_fontes(conn)
+        assert quantidades == {documento: len(ids) for documento, ids in agrupar_por_documento(conn).items()}
+    finally:
+        conn.close()
+
+
+def _ids(banco: str) -> set:
+    with sqlite3.connect(banco) as conn:
+        return {linha[0] for linha in conn.execute('SELECT id FROM questoes')}
+
+
+def test_primeira_sincronizacao_reaproveita_o_banco_sem_chave(copiar):
+    # Banco distribuído das específicas: sem UNIQUE(numero, fonte), sem hash nem arquivo
+    banco = copiar(PASTA_TXT / 'questoesEspecificas.db', 'especificas.db')
+    txt = copiar(TXT_ESPECIFICAS, 'especificas.txt')
+    antes = _ids(banco)
+    assert QuestaoImporter(banco).importar_arquivo(txt)
+
+    depois = _ids(banco)
+    assert len(depois) == len(antes)
+    # Só a linha que o leitor antigo montou errado foi trocada
+    assert len(antes - depois) == 1
+
+
+def test_questao_editada_em_banco_sem_chave_substitui_a_antiga(copiar):
+    banco = copiar(PASTA_TXT / 'questoesEspecificas.db', 'especificas.db')
+    txt = copiar(TXT_ESPECIFICAS, 'especificas.txt')
+    importador = QuestaoImporter(banco)
+    assert importador.importar_arquivo(txt)
+    antes = _ids(banco)
+
+    enunciado = editar_primeira_questao(txt)
+    assert importador.importar_arquivo(txt)
+
+    depois = _ids(banco)
+    assert len(depois) == len(antes)
+    assert len(antes - depois) == 1
+    with sqlite3.connect(banco) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM questoes WHERE enunciado LIKE ?', (enunciado + '%',)).fetchone()[0] == 1
+
+
+def test_questao_editada_em_banco_com_chave_mantem_o_id(copiar):
+    banco = copiar(PASTA_TXT / 'questoesGerais.db', 'gerais.db')
+    txt = copiar(TXT_GERAIS, 'gerais.txt')
+    importador = QuestaoImporter(banco)
+    assert importador.importar_arquivo(txt)
+    antes = _ids(banco)
+
+    enunciado = editar_primeira_questao(txt)
+    assert importador.importar_arquivo(txt)
+
+    assert _ids(banco) == antes
+    with sqlite3.connect(banco) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM questoes WHERE enunciado LIKE ?', (enunciado + '%',)).fetchone()[0] == 1
+
+
+def test_reimportar_arquivo_inalterado_nao_muda_o_banco(copiar, tmp_path):
+    txt = copiar(TXT_GERAIS, 'gerais.txt')
+    banco = str(tmp_path / 'gerais.db')
+    importador = QuestaoImporter(banco)
+    assert importador.importar_arquivo(txt)
+    antes = _ids(banco)
+
+    with importador.db_manager as cursor:
+        resultado = importador.sincronizar_arquivo(cursor, txt, importador.parser.iter_questoes(txt))
+    assert (resultado.inseridas, resultado.alteradas, resultado.removidas) == (0, 0, 0)
+    assert _ids(banco) == antes
+
+
+def test_importacao_paralela_em_trechos_igual_a_sequencial(copiar, tmp_path):
+    arquivos = [copiar(TXT_GERAIS, 'gerais.txt'), copiar(TXT_ESPECIFICAS, 'especificas.txt')]
+    sequencial = str(tmp_path / 'sequencial.db')
+    paralelo = str(tmp_path / 'paralelo.db')
+    for arquivo in arquivos:
+        assert QuestaoImporter(sequencial).importar_arquivo(arquivo)
+    # Trechos pequenos: cada arquivo é lido em dezenas de partes
+    QuestaoImporter(paralelo).importar_arquivos(arquivos, processos=2, tamanho_trecho=500)
+
+    consulta = 'SELECT numero, enunciado, fonte, hash, arquivo FROM questoes ORDER BY id'
+    with sqlite3.connect(sequencial) as a, sqlite3.connect(paralelo) as b:
+        assert a.execute(consulta).fetchall() == b.execute(consulta).fetchall()
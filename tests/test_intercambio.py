@@ -0,0 +1,86 @@
+"""Importação e exportação em JSONL/CSV: reimportação idempotente, ids preservados, conflitos"""
+
+import sqlite3
+
+import pytest
+
+from conftest import RAIZ
+from intercambio import exportar, importar
+
+BANCOS = ('questoesGerais.db', 'questoesEspecificas.db')
+
+
+def _linhas(banco: str) -> list:
+    with sqlite3.connect(banco) as conn:
+        return conn.execute('SELECT id, hash FROM questoes ORDER BY id').fetchall()
+
+
+@pytest.fixture(params=['jsonl', 'csv'])
+def formato(request):
+    return request.param
+
+
+@pytest.mark.parametrize('nome', BANCOS)
+def test_reimportar_o_mesmo_arquivo_nao_grava_nada(copiar, tmp_path, formato, nome):
+    origem = copiar(RAIZ / 'Dados' / nome)
+    arquivo = str(tmp_path / f'questoes.{formato}')
+    banco = str(tmp_path / 'novo.db')
+    exportacao = exportar(origem, arquivo)
+
+    primeira = importar(arquivo, banco)
+    assert primeira.importadas == exportacao.exportadas
+    antes = _linhas(banco)
+
+    segunda = importar(arquivo, banco)
+    assert segunda.importadas == 0
+    assert segunda.duplicadas == exportacao.exportadas
+    assert _linhas(banco) == antes
+
+
+def _editar_primeira(arquivo: str, formato: str):
+    """Acrescenta 'EDITADA ' ao enunciado da primeira questão do arquivo exportado"""
+    with open(arquivo, encoding='utf-8-sig') as entrada:
+        texto = entrada.read()
+    if formato == 'csv':
+        # O enunciado é o segundo campo da primeira linha de dados
+        cabecalho, primeira, resto = texto.split('\n', 2)
+        numero, demais = primeira.split(',', 1)
+        texto = '\n'.join((cabecalho, f'{numero},EDITADA {demais}', resto))
+    else:
+        texto = texto.replace('"enunciado": "', '"enunciado": "EDITADA ', 1)
+    with open(arquivo, 'w', encoding='utf-8') as saida:
+        saida.write(texto)
+
+
+def test_questao_editada_atualiza_no_lugar(copiar, tmp_path, formato):
+    origem = copiar(RAIZ / 'Dados' / 'questoesGerais.db')
+    arquivo = str(tmp_path / f'questoes.{formato}')
+    banco = str(tmp_path / 'novo.db')
+    exportar(origem, arquivo)
+    importar(arquivo, banco)
+    antes = _linhas(banco)
+
+    _editar_primeira(arquivo, formato)
+    relatorio = importar(arquivo, banco)
+
+    assert relatorio.importadas == 1
+    depois = _linhas(banco)
+    assert [questao_id for questao_id, _ in depois] == [questao_id for questao_id, _ in antes]
+    assert sum(a != b for a, b in zip(antes, depois)) == 1
+
+
+def test_questao_de_outro_arquivo_nao_e_sobrescrita(copiar, tmp_path):
+    origem = copiar(RAIZ / 'Dados' / 'questoesGerais.db')
+    arquivo = str(tmp_path / 'questoes.jsonl')
+    outro = str(tmp_path / 'outro.jsonl')
+    banco = str(tmp_path / 'novo.db')
+    exportar(origem, arquivo)
+    exportar(origem, outro)
+    importar(arquivo, banco)
+    antes = _linhas(banco)
+
+    _editar_primeira(outro, 'jsonl')
+    relatorio = importar(outro, banco)
+
+    assert (relatorio.importadas, relatorio.conflitos) == (0, 1)
+    assert _linhas(banco) == antes
@@ -0,0 +1,110 @@
+"""Servidor HTTP: validação dos pedidos e sessões de ponta a ponta sobre um socket local"""
+
+import asyncio
+import json
+
+import pytest
+
+from adaptativo import descartar_indices
+from conftest import RAIZ
+from eventos import fechar_logs
+from repositorio import fechar_repositorios
+from revisao import fechar_agendas
+from servidor import QuizServer
+
+
+@pytest.fixture
+def servidor(copiar, tmp_path):
+    servidor = QuizServer(copiar(RAIZ / 'Dados' / 'questoesEspecificas.db'),
+                          copiar(RAIZ / 'Dados' / 'questoesGerais.db'),
+                          banco_eventos=str(tmp_path / 'respostas.db'))
+    yield servidor
+    servidor.executor.shutdown()
+    fechar_logs()
+    fechar_agendas()
+    descartar_indices()
+    fechar_repositorios()
+
+
+def _pedir(servidor: QuizServer, pedidos):
+    """Envia os pedidos HTTP brutos, um por conexão, e devolve (status, corpo JSON) de cada um"""
+    async def executar():
+        escuta = await asyncio.start_server(servidor.atender, '127.0.0.1', 0)
+        porta = escuta.sockets[0].getsockname()[1]
+        respostas = []
+        async with escuta:
+            for pedido in pedidos:
+                if callable(pedido):
+                    pedido = pedido(respostas)
+                reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+                writer.write(pedido)
+                await writer.drain()
+                bruto = await reader.read()
+                writer.close()
+                cabecalho, _, corpo = bruto.partition(b'\r\n\r\n')
+                respostas.append((int(cabecalho.split()[1]), json.loads(corpo)))
+        return respostas
+    return asyncio.run(executar())
+
+
+def _http(metodo: str, caminho: str, corpo=None, tamanho=None) -> bytes:
+    dados = b'' if corpo is None else (corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode())
+    tamanho = len(dados) if tamanho is None else tamanho
+    return (f'{metodo} {caminho} HTTP/1.1\r\nHost: teste\r\nConnection: close\r\n'
+            f'Content-Length: {tamanho}\r\n\r\n').encode('latin-1') + dados
+
+
+@pytest.mark.parametrize('corpo', [
+    {'quantidade': 10.0},
+    {'quantidade': True},
+    {'quantidade': '10'},
+    {'quantidade': 15},
+    {'quantidade': 10, 'seed': []},
+    {'quantidade': 10, 'seed': 1.5},
+    {'quantidade': 10, 'seed': True},
+    {'quantidade': 10, 'tema': 3},
+    {'quantidade': 10, 'usuario': '  '},
+    {'quantidade': 10, 'modo': 'outro'},
+    {'quantidade': 10, 'modo': 'revisao'},
+])
+def test_criar_sessao_recusa_parametros_invalidos(servidor, corpo):
+    [(status, resposta)] = _pedir(servidor, [_http('POST', '/sessoes', corpo)])
+    assert status == 400, resposta
+    assert 'erro' in resposta
+
+
+@pytest.mark.parametrize('pedido', [
+    _http('POST', '/sessoes', b'{"quantidade": 10'),
+    _http('POST', '/sessoes', b'[10]'),
+    _http('POST', '/sessoes', b'{}', tamanho='-1'),
+    _http('POST', '/sessoes', b'{}', tamanho='2x'),
+    b'LIXO\r\n\r\n',
+])
+def test_pedido_malformado_recebe_400(servidor, pedido):
+    [(status, _)] = _pedir(servidor, [pedido])
+    assert status == 400
+
+
+def test_tema_sem_questoes_cita_o_tema(servidor):
+    [(status, resposta)] = _pedir(servidor, [
+        _http('POST', '/sessoes', {'quantidade': 10, 'tema': 'zzzz-inexistente'})
+    ])
+    assert status == 404
+    assert 'zzzz-inexistente' in resposta['erro']
+
+
+@pytest.mark.parametrize('modo', ['sorteio', 'adaptativo'])
+def test_sessao_completa(servidor, modo):
+    quantidade = 10
+    pedidos = [_http('POST', '/sessoes', {'quantidade': quantidade, 'seed': 7, 'modo': modo})]
+    for _ in range(quantidade):
+        pedidos.append(lambda respostas: _http('GET', f"/sessoes/{respostas[0][1]['sessao']}/questao"))
+        pedidos.append(lambda respostas: _http('POST', f"/sessoes/{respostas[0][1]['sessao']}/resposta",
+                                               {'resposta': 'a'}))
+    pedidos.append(lambda respostas: _http('GET', f"/sessoes/{respostas[0][1]['sessao']}/resultado"))
+
+    respostas = _pedir(servidor, pedidos)
+    assert respostas[0] == (201, {'sessao': respostas[0][1]['sessao'], 'total': quantidade})
+    assert all(status == 200 for status, _ in respostas[1:])
+    assert respostas[-2][1]['finalizada']
+    assert respostas[-1][1]['total'] == quantidade
@@ -0,0 +1,64 @@
+"""
+A pasta 'Versao final' é distribuída sozinha: leva cópias dos módulos compartilhados da raiz
+que o aplicativo usa. Estes testes garantem que as cópias estão completas e em dia
+"""
+
+import ast
+import shutil
+import subprocess
+import sys
+
+from conftest import RAIZ
+
+PASTA_FINAL = RAIZ / 'Versao final'
+APLICATIVO = PASTA_FINAL / 'QuizTGEapp'
+MODULOS_RAIZ = {caminho.stem for caminho in RAIZ.glob('*.py')}
+
+
+def _dependencias(caminho) -> set:
+    """Módulos da raiz importados pelo arquivo, inclusive os carregados por nome (importlib)"""
+    nomes = set()
+    for no in ast.walk(ast.parse(caminho.read_text(encoding='utf-8'))):
+        if isinstance(no, ast.Import):
+            nomes.update(alias.name.split('.')[0] for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            nomes.add(no.module.split('.')[0])
+        elif isinstance(no, ast.Constant) and isinstance(no.value, str):
+            nomes.add(no.value)
+    return nomes & MODULOS_RAIZ
+
+
+def _modulos_necessarios() -> set:
+    necessarios, pendentes = set(), list(_dependencias(APLICATIVO))
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in necessarios:
+            necessarios.add(nome)
+            pendentes.extend(_dependencias(RAIZ / f'{nome}.py'))
+    return necessarios
+
+
+def test_copias_dos_modulos_identicas_as_da_raiz():
+    necessarios = _modulos_necessarios()
+    assert {'repositorio', 'sessao', 'telas'} <= necessarios
+
+    desatualizados = sorted(
+        nome for nome in necessarios
+        if not (PASTA_FINAL / f'{nome}.py').exists()
+        or (PASTA_FINAL / f'{nome}.py').read_bytes() != (RAIZ / f'{nome}.py').read_bytes()
+    )
+    assert not desatualizados, f"copie para 'Versao final' os módulos: {', '.join(desatualizados)}"
+
+
+def test_aplicativo_importa_fora_do_projeto(tmp_path):
+    pasta = tmp_path / 'Versao final'
+    shutil.copytree(PASTA_FINAL, pasta, ignore=shutil.ignore_patterns('__pycache__'))
+    # -I: sem PYTHONPATH nem site do usuário; só a própria pasta no caminho de busca
+    codigo = (
+        "import runpy, sys; sys.path.insert(0, '.')\n"
+        "runpy.run_path('QuizTGEapp')\n"
+        "import sessao, eventos, repositorio\n"
+    )
+    processo = subprocess.run([sys.executable, '-I', '-c', codigo], cwd=pasta,
+                              capture_output=True, text=True)
+    assert processo.returncode == 0, processo.stderr